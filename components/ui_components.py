@@ -3,6 +3,7 @@ import plotly.graph_objects as go
 import plotly.express as px
 from datetime import datetime
 import pandas as pd
+from utils.indicators import get_indicator_engine
 
 class UIComponents:
     def __init__(self):
@@ -650,13 +651,14 @@ class UIComponents:
             decreasing_line_color='#ff4757'
         ))
         
-        # Add moving averages
-        stock_data['MA20'] = stock_data['Close'].rolling(window=20).mean()
-        stock_data['MA50'] = stock_data['Close'].rolling(window=50).mean()
+        # Add moving averages (kept out of stock_data, which is shared via the cache)
+        moving_averages = get_indicator_engine().compute(stock_data, ['SMA_20', 'SMA_50'])
+        ma20 = moving_averages['SMA_20']
+        ma50 = moving_averages['SMA_50']
         
         fig.add_trace(go.Scatter(
             x=stock_data.index,
-            y=stock_data['MA20'],
+            y=ma20,
             mode='lines',
             name='MA20',
             line=dict(color='#ffa502', width=2)
@@ -664,7 +666,7 @@ class UIComponents:
         
         fig.add_trace(go.Scatter(
             x=stock_data.index,
-            y=stock_data['MA50'],
+            y=ma50,
             mode='lines',
             name='MA50',
             line=dict(color='#3742fa', width=2)
@@ -750,15 +752,14 @@ class UIComponents:
         """Display technical indicators"""
         st.markdown('<h2><span class="emoji-normal">📊</span> <span class="gradient-title">Technical Indicators</span></h2>', unsafe_allow_html=True)
         
+        # Memoized: the fetcher and prediction model reuse the same series
+        indicators = get_indicator_engine().compute(stock_data, ['RSI', 'BB_upper', 'BB_lower'])
+        
         col1, col2 = st.columns(2)
         
         with col1:
-            # RSI Calculation
-            delta = stock_data['Close'].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-            rs = gain / loss
-            rsi = 100 - (100 / (1 + rs))
+            # RSI
+            rsi = indicators['RSI']
             current_rsi = rsi.iloc[-1]
             
             rsi_color = "price-up" if current_rsi < 30 else "price-down" if current_rsi > 70 else "price-neutral"
@@ -773,10 +774,8 @@ class UIComponents:
         
         with col2:
             # Bollinger Bands
-            sma = stock_data['Close'].rolling(window=20).mean()
-            std = stock_data['Close'].rolling(window=20).std()
-            upper_band = sma + (std * 2)
-            lower_band = sma - (std * 2)
+            upper_band = indicators['BB_upper']
+            lower_band = indicators['BB_lower']
             
             current_price = stock_data['Close'].iloc[-1]
             current_upper = upper_band.iloc[-1]
@@ -21,7 +21,9 @@ st.set_page_config(
 from components.auth import Authentication
 from components.ui_components import UIComponents
 from utils.stock_data import StockDataFetcher
-from utils.prediction_model import PredictionModel
+from utils.prediction_model import PredictionModel, forecast_job
+from utils.shared_cache import data_fingerprint
+from utils.job_queue import get_job_queue, DONE, FAILED
 from pages.dashboard_pages import show_market_overview, show_portfolio, show_news, show_analytics
 
 class StockDashboard:
@@ -65,6 +67,9 @@ class StockDashboard:
 
     def show_main_dashboard(self):
         """Display the main dashboard"""
+        # Set again by show_predictions while a forecast job is running
+        st.session_state.forecast_pending = False
+        
         # Welcome message
         st.markdown(f'<h3 class="gradient-text">Welcome, {st.session_state.username}! <span class="emoji-normal">👋</span></h3>', unsafe_allow_html=True)
         
@@ -135,6 +140,11 @@ class StockDashboard:
         
         # Add educational disclaimer at the bottom
         self.ui.display_educational_disclaimer()
+        
+        # Poll a background forecast until it finishes
+        if st.session_state.get('forecast_pending'):
+            time.sleep(1)
+            st.rerun()
 
     def show_sidebar(self):
         """Sidebar with stock selection and filters"""
@@ -183,6 +193,19 @@ class StockDashboard:
         
         st.session_state.time_period = time_periods[selected_period_name]
         
+        # Upstream feed health (throttling, retries, open circuits)
+        with st.sidebar.expander("📡 Data Feed Status"):
+            feed_stats = self.stock_fetcher.get_feed_stats()
+            gateway_stats = feed_stats['gateway']
+            cache_stats = feed_stats['cache']
+            st.write(f"Upstream calls: {gateway_stats['calls']} ({gateway_stats['failures']} failed)")
+            st.write(f"Throttled: {gateway_stats['throttled']} | Retries: {gateway_stats['retries']}")
+            st.write(f"Stale served: {gateway_stats['stale_served']} | Short-circuited: {gateway_stats['short_circuited']}")
+            st.write(f"Rate limit: {gateway_stats['rate_limit']} req/s")
+            if gateway_stats['open_circuits']:
+                st.write(f"Open circuits: {', '.join(map(str, gateway_stats['open_circuits']))}")
+            st.write(f"Cache: {cache_stats['entries']} entries, {cache_stats['hits']} hits / {cache_stats['misses']} misses")
+        
         # Auto-refresh toggle
         auto_refresh = st.sidebar.checkbox("🔄 Auto Refresh (30s)", value=False)
         
@@ -231,13 +254,34 @@ class StockDashboard:
         # predictions are generated and displayed in show_predictions()
 
     def show_predictions(self, stock_data):
-        """Display future price predictions"""
+        """Display future price predictions
+        
+        The forecast runs as a background job; until it finishes the last
+        good forecast for this stock and period is shown, and the page polls.
+        """
         try:
-            predictions = self.predictor.predict_future_prices(
-                stock_data,
-                st.session_state.selected_stock,
-                years_ahead=5
-            )
+            symbol = st.session_state.selected_stock
+            group = ("forecast", symbol, st.session_state.time_period, 5)
+            key = group + (data_fingerprint(stock_data.index, stock_data['Close'].to_numpy()),)
+            
+            job_queue = get_job_queue()
+            job = job_queue.submit(key, forecast_job, stock_data, symbol, 5, group=group)
+            status = job_queue.status(key)
+            
+            if status['status'] == DONE:
+                predictions = job.result
+            else:
+                latest = job_queue.latest(group)
+                predictions = latest[1] if latest is not None else None
+                
+                if status['status'] == FAILED:
+                    st.error(f"Error generating predictions: {status['error']}")
+                else:
+                    st.session_state.forecast_pending = True
+                    label = "Updating forecast" if predictions is not None else "Generating forecast"
+                    st.progress(status['progress'], text=f"{label}: {status['message']} ({status['elapsed']:.0f}s)")
+                    if predictions is None:
+                        return
 
             if predictions is not None:
                 fig_prediction = self.ui.create_prediction_chart(
@@ -1,9 +1,28 @@
+import math
+import time
 import streamlit as st
 import plotly.graph_objects as go
 import plotly.express as px
 from utils.stock_data import StockDataFetcher
+from utils.sector_index import NSE_SECTORS
+from utils.market_snapshot import DEFAULT_UNIVERSE, NIFTY_50
+from utils.backtester import STRATEGIES, DEFAULT_GRIDS
+from utils.walk_forward import summarize
+from utils.portfolio import get_portfolio_manager
 from components.ui_components import UIComponents
 
+# Screener sort choices -> (column, ascending)
+SCREENER_SORTS = {
+    "Change % (high to low)": ('change_pct', False),
+    "Change % (low to high)": ('change_pct', True),
+    "RSI (low to high)": ('rsi', True),
+    "RSI (high to low)": ('rsi', False),
+    "Volume": ('volume', False),
+    "Price": ('price', False)
+}
+
+SCREENER_PAGE_SIZE = 25
+
 def display_educational_disclaimer():
     """Display educational disclaimer at the bottom of the page"""
     st.markdown("---")
@@ -137,31 +156,96 @@ def show_portfolio():
     """Display portfolio tracking page"""
     st.markdown("# 💼 Portfolio Tracker")
     
-    # Portfolio management would be implemented here
-    st.info("Portfolio tracking feature - Coming Soon!")
+    username = st.session_state.get('username') or "guest"
+    manager = get_portfolio_manager()
+    fetcher = StockDataFetcher()
     
-    # Placeholder for portfolio features
     col1, col2 = st.columns(2)
     
     with col1:
         st.markdown("## Add to Portfolio")
         with st.form("add_stock"):
             stock_symbol = st.text_input("Stock Symbol (e.g., RELIANCE.NS)")
+            side = st.radio("Transaction", ["Buy", "Sell"], horizontal=True)
             quantity = st.number_input("Quantity", min_value=1, value=1)
-            buy_price = st.number_input("Buy Price", min_value=0.01, value=100.0)
+            buy_price = st.number_input("Price", min_value=0.01, value=100.0)
+            trade_date = st.date_input("Date")
             
-            if st.form_submit_button("Add Stock"):
-                st.success(f"Added {quantity} shares of {stock_symbol} at ₹{buy_price}")
+            if st.form_submit_button("Add Transaction"):
+                success, message = manager.add_transaction(
+                    username, stock_symbol, side, quantity, buy_price, trade_date
+                )
+                if success:
+                    st.success(message)
+                else:
+                    st.error(message)
+    
+    # Every holding is valued from one batched quote lookup
+    holdings, totals = fetcher.get_portfolio_valuation(username, manager)
     
     with col2:
         st.markdown("## Portfolio Summary")
-        st.markdown("""
+        pnl_class = "price-up" if totals['unrealized_pnl'] >= 0 else "price-down"
+        day_class = "price-up" if totals['day_change'] >= 0 else "price-down"
+        st.markdown(f"""
         <div class="glass-card">
             <h4>Total Portfolio Value</h4>
-            <div class="metric-value">₹1,25,000</div>
-            <div class="price-up">+₹5,000 (+4.17%)</div>
+            <div class="metric-value">₹{totals['value']:,.2f}</div>
+            <div class="{pnl_class}">₹{totals['unrealized_pnl']:+,.2f} ({totals['unrealized_pct']:+.2f}%) unrealized</div>
+            <div class="{day_class}">₹{totals['day_change']:+,.2f} ({totals['day_change_pct']:+.2f}%) today</div>
+            <div>Invested ₹{totals['invested']:,.2f} · Realized P&L ₹{totals['realized_pnl']:+,.2f}</div>
         </div>
         """, unsafe_allow_html=True)
+    
+    if holdings.empty:
+        st.info("No holdings yet - add a transaction to start tracking your portfolio.")
+        return
+    
+    st.markdown("## Holdings")
+    if not holdings['priced'].all():
+        st.warning("Some holdings have no live quote and are shown at cost.")
+    
+    table = holdings.drop(columns=['priced']).rename(columns={
+        'symbol': 'Stock', 'quantity': 'Qty', 'avg_cost': 'Avg Cost (₹)', 'price': 'Price (₹)',
+        'invested': 'Invested (₹)', 'market_value': 'Value (₹)', 'unrealized_pnl': 'Unrealized P&L (₹)',
+        'unrealized_pct': 'P&L %', 'day_change': 'Day Change (₹)', 'weight': 'Weight %',
+        'realized_pnl': 'Realized P&L (₹)'
+    })
+    st.dataframe(table.round(2), use_container_width=True, hide_index=True)
+    
+    fig = px.pie(holdings, names='symbol', values='market_value', title="Allocation")
+    fig.update_layout(paper_bgcolor='rgba(255,255,255,0.9)')
+    st.plotly_chart(fig, use_container_width=True)
+    
+    st.markdown("## ⚠️ Risk")
+    col1, col2 = st.columns(2)
+    with col1:
+        confidence = st.selectbox("Confidence", [0.95, 0.99], format_func=lambda c: f"{c:.0%}")
+    with col2:
+        horizon = st.selectbox("Horizon (days)", [1, 5, 10])
+    
+    risk = fetcher.get_portfolio_risk(username, confidence, horizon, manager=manager)
+    if risk is None:
+        st.info("Not enough price history to estimate risk yet.")
+    else:
+        beta = f"{risk['beta']:.2f}" if risk['beta'] is not None else "n/a"
+        st.markdown(f"""
+        <div class="glass-card">
+            <h4>Value at Risk ({risk['confidence']:.0%}, {risk['horizon']}-day)</h4>
+            <div>Historical VaR ₹{risk['historical_var']:,.2f} · CVaR ₹{risk['historical_cvar']:,.2f}</div>
+            <div>Monte Carlo VaR ₹{risk['monte_carlo_var']:,.2f} · CVaR ₹{risk['monte_carlo_cvar']:,.2f}</div>
+            <div>Volatility {risk['annual_volatility']:.2%} annualized · Beta to NIFTY 50 {beta}</div>
+            <small>Based on {risk['observations']} daily returns</small>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with st.expander("📜 Transactions"):
+        transactions = manager.transactions(username)
+        st.dataframe(
+            [{key: txn[key] for key in ('date', 'side', 'symbol', 'quantity', 'price')} for txn in reversed(transactions)],
+            use_container_width=True,
+            hide_index=True
+        )
 def show_news():
     """Display market news page"""
     st.markdown("# 📰 Market News")
@@ -181,6 +265,8 @@ def show_analytics():
     """Display advanced analytics page"""
     st.markdown("# 📈 Advanced Analytics")
     
+    fetcher = StockDataFetcher()
+    
     st.markdown("## 🎯 Stock Screener")
     
     col1, col2, col3 = st.columns(3)
@@ -194,15 +280,190 @@ def show_analytics():
         rsi_filter = st.selectbox("RSI Filter", ["All", "Oversold (<30)", "Overbought (>70)"])
     
     with col3:
-        sector_filter = st.selectbox("Sector", ["All", "Banking", "IT", "Auto", "Pharma", "FMCG"])
+        sector_filter = st.selectbox("Sector", ["All"] + list(NSE_SECTORS))
+        sort_label = st.selectbox("Sort By", list(SCREENER_SORTS))
     
     if st.button("🔍 Screen Stocks"):
-        st.info("Stock screening results would appear here...")
+        # Filters compile to boolean masks over the screener table
+        filters = [('price', '>=', min_price), ('price', '<=', max_price), ('volume', '>=', min_volume)]
+        if rsi_filter == "Oversold (<30)":
+            filters.append(('rsi', '<', 30))
+        elif rsi_filter == "Overbought (>70)":
+            filters.append(('rsi', '>', 70))
+        if sector_filter != "All":
+            filters.append(('sector', '==', sector_filter))
+        st.session_state.screener_filters = filters
+    
+    # Kept in session state so sorting and paging don't need another click
+    if 'screener_filters' in st.session_state:
+        with st.spinner("Updating screener table..."):
+            table = fetcher.get_screener_table()
+        
+        sort_by, ascending = SCREENER_SORTS[sort_label]
+        start = time.perf_counter()
+        results, total = table.screen(st.session_state.screener_filters, sort_by, ascending, 0, SCREENER_PAGE_SIZE)
+        elapsed = (time.perf_counter() - start) * 1000
+        
+        pages = max(1, math.ceil(total / SCREENER_PAGE_SIZE))
+        page = st.number_input("Page", min_value=1, max_value=pages, value=1) - 1
+        if page > 0:
+            results, total = table.screen(
+                st.session_state.screener_filters, sort_by, ascending, page, SCREENER_PAGE_SIZE
+            )
+        
+        st.caption(f"{total} matches out of {len(table)} symbols · screened in {elapsed:.1f} ms")
+        
+        if results.empty:
+            st.info("No stocks match these filters.")
+        else:
+            results = results.drop(columns=['symbol']).rename(columns={
+                'name': 'Stock', 'sector': 'Sector', 'price': 'Price (₹)', 'change_pct': 'Change %',
+                'volume': 'Volume', 'avg_volume': 'Avg Volume (20d)', 'rsi': 'RSI',
+                'sma_20': 'SMA 20', 'sma_50': 'SMA 50', 'macd': 'MACD', 'macd_histogram': 'MACD Hist.',
+                'bb_upper': 'BB Upper', 'bb_lower': 'BB Lower'
+            })
+            st.dataframe(results.round(2), use_container_width=True, hide_index=True)
     
     # Correlation analysis
     st.markdown("## 🔗 Correlation Analysis")
-    st.info("Correlation matrix between different stocks and indices would be displayed here.")
+    
+    col1, col2 = st.columns([3, 1])
+    
+    with col1:
+        corr_symbols = st.multiselect("Stocks", DEFAULT_UNIVERSE, default=DEFAULT_UNIVERSE[:8])
+    
+    with col2:
+        corr_window = st.slider("Window (sessions)", min_value=20, max_value=250, value=60, step=10)
+    
+    if len(corr_symbols) >= 2:
+        matrix = fetcher.get_correlation_matrix(corr_symbols, window=corr_window)
+        
+        if not matrix.empty:
+            labels = [symbol.replace('.NS', '') for symbol in matrix.columns]
+            fig = px.imshow(
+                matrix.values,
+                x=labels,
+                y=labels,
+                zmin=-1,
+                zmax=1,
+                color_continuous_scale='RdBu',
+                text_auto='.2f'
+            )
+            fig.update_layout(
+                title=dict(
+                    text=f"Daily Return Correlation ({corr_window} sessions)",
+                    font=dict(color='#2c3e50', size=20, family="Arial Black")
+                ),
+                template="plotly_white",
+                paper_bgcolor='rgba(255,255,255,0.9)',
+                plot_bgcolor='rgba(255,255,255,0.8)'
+            )
+            st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.info("Select at least two stocks to compare.")
+    
+    # Pairs for one stock across the whole universe, without the full matrix
+    pair_symbol = st.selectbox("Find stocks correlated with", DEFAULT_UNIVERSE)
+    
+    if st.button("🔍 Find Pairs"):
+        with st.spinner("Scoring the universe..."):
+            most, least = fetcher.get_correlated_pairs(pair_symbol, window=corr_window)
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.markdown("### Most Correlated")
+            for symbol, value in most:
+                st.markdown(f"**{symbol.replace('.NS', '')}** — {value:+.2f}")
+        
+        with col2:
+            st.markdown("### Least Correlated")
+            for symbol, value in least:
+                st.markdown(f"**{symbol.replace('.NS', '')}** — {value:+.2f}")
     
     # Technical analysis
     st.markdown("## 📊 Technical Analysis Tools")
-    st.info("Advanced technical analysis tools and custom indicators would be available here.")
\ No newline at end of file
+    st.markdown("### 🧪 Strategy Backtester")
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        strategy = st.selectbox("Strategy", list(STRATEGIES), format_func=lambda name: name.replace('_', ' ').title())
+        bt_symbols = st.multiselect("Universe", NIFTY_50, default=NIFTY_50)
+    
+    with col2:
+        bt_period = st.selectbox("History", ["1y", "2y", "5y", "10y"], index=3)
+        cost_bps = st.number_input("Commission (bps)", min_value=0.0, value=10.0)
+        slippage_bps = st.number_input("Slippage (bps)", min_value=0.0, value=5.0)
+    
+    with col3:
+        # Defaults are the middle of each sweep grid
+        params = {}
+        for name, values in DEFAULT_GRIDS[strategy].items():
+            params[name] = st.select_slider(name.title(), options=values, value=values[len(values) // 2])
+    
+    col1, col2 = st.columns(2)
+    run_clicked = col1.button("▶️ Run Backtest")
+    sweep_clicked = col2.button("🔁 Sweep Parameters")
+    
+    if bt_symbols and run_clicked:
+        with st.spinner("Backtesting..."):
+            metrics, equity = fetcher.run_backtest(bt_symbols, strategy, params, bt_period, cost_bps, slippage_bps)
+        
+        if metrics is None:
+            st.error("No price history available for the selected universe.")
+        else:
+            st.markdown(f"""
+            <div class="glass-card">
+                <strong>Total return</strong> {metrics['total_return']:+.2%} ·
+                <strong>CAGR</strong> {metrics['cagr']:+.2%} ·
+                <strong>Volatility</strong> {metrics['volatility']:.2%} ·
+                <strong>Sharpe</strong> {metrics['sharpe']:.2f} ·
+                <strong>Max drawdown</strong> {metrics['max_drawdown']:.2%} ·
+                <strong>Trades</strong> {metrics['trades']}
+            </div>
+            """, unsafe_allow_html=True)
+            
+            fig = go.Figure(data=[go.Scatter(x=equity.index, y=equity.values, mode='lines', name='Equity')])
+            fig.update_layout(
+                title="Equal-weight equity curve",
+                template="plotly_white",
+                paper_bgcolor='rgba(255,255,255,0.9)',
+                plot_bgcolor='rgba(255,255,255,0.8)'
+            )
+            st.plotly_chart(fig, use_container_width=True)
+    
+    if bt_symbols and sweep_clicked:
+        grid = DEFAULT_GRIDS[strategy]
+        with st.spinner("Sweeping parameter grid..."):
+            start = time.perf_counter()
+            results = fetcher.run_parameter_sweep(bt_symbols, strategy, grid, bt_period, cost_bps, slippage_bps)
+            elapsed = time.perf_counter() - start
+        
+        st.caption(f"{len(results)} parameter combinations in {elapsed:.1f} s")
+        st.dataframe(results.head(20).round(4), use_container_width=True, hide_index=True)
+    
+    st.markdown("### 🧮 Forecaster Comparison")
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        wf_symbols = st.multiselect("Stocks", NIFTY_50, default=NIFTY_50[:4], key="wf_symbols")
+    
+    with col2:
+        wf_folds = st.slider("Folds", min_value=2, max_value=10, value=5)
+    
+    with col3:
+        wf_mode = st.radio("Training window", ["expanding", "rolling"], horizontal=True)
+    
+    if wf_symbols and st.button("▶️ Compare Forecasters"):
+        with st.spinner("Running walk-forward evaluation..."):
+            start = time.perf_counter()
+            results = fetcher.run_walk_forward(wf_symbols, n_folds=wf_folds, mode=wf_mode)
+            elapsed = time.perf_counter() - start
+        
+        if results.empty:
+            st.error("Not enough price history for the selected stocks.")
+        else:
+            st.caption(f"{len(results)} symbol/model/fold evaluations in {elapsed:.1f} s")
+            st.dataframe(summarize(results).round(4), use_container_width=True)
@@ -0,0 +1,89 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.data_providers import DataProvider
+from utils.ohlcv_store import OHLCVStore, slice_period
+from utils.shared_cache import SharedCache
+from utils.upstream_gateway import UpstreamGateway
+
+
+def make_ohlcv(n=300, seed=0, tz="Asia/Kolkata", end="2026-10-16"):
+    """Daily random-walk OHLCV bars ending at `end`"""
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(end=end, periods=n)
+    if tz is not None:
+        index = index.tz_localize(tz)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    return pd.DataFrame({
+        'Open': close * 0.995,
+        'High': close * 1.01,
+        'Low': close * 0.99,
+        'Close': close,
+        'Volume': rng.integers(100_000, 1_000_000, n).astype(np.float64)
+    }, index=index)
+
+
+class FakeProvider(DataProvider):
+    """Offline provider: history() is tz-aware, download() tz-naive like yf.download"""
+
+    name = "fake"
+
+    def __init__(self, n=300, grouped_misses=()):
+        self.n = n
+        self.grouped_misses = set(grouped_misses)
+        self.history_calls = []
+        self.download_calls = []
+        self.info_calls = []
+        self.minutes = {}  # symbol -> the session's minute bars served for interval="1m"
+
+    def frame(self, symbol, tz="Asia/Kolkata"):
+        return make_ohlcv(self.n, seed=sum(map(ord, symbol)), tz=tz)
+
+    def history(self, symbol, period=None, interval="1d", start=None):
+        self.history_calls.append((symbol, period, start))
+        data = self.minutes[symbol] if interval == "1m" else self.frame(symbol)
+        if start is not None:
+            return data[data.index >= pd.Timestamp(start)]
+        return slice_period(data, period or "1mo", end=data.index[-1])
+
+    def download(self, symbols, period=None, interval="1d", start=None):
+        self.download_calls.append((tuple(symbols), period, start))
+        frames = {}
+        for symbol in symbols:
+            if symbol in self.grouped_misses:
+                continue
+            if interval == "1m":
+                data = self.minutes[symbol]
+                frames[symbol] = data[data.index >= pd.Timestamp(start)] if start is not None else data
+                continue
+            data = self.frame(symbol, tz=None)
+            if start is not None:
+                frames[symbol] = data[data.index >= pd.Timestamp(start).tz_localize(None)]
+            else:
+                frames[symbol] = slice_period(data, period or "1mo", end=data.index[-1])
+        return frames
+
+    def info(self, symbol):
+        self.info_calls.append(symbol)
+        return {'symbol': symbol}
+
+
+@pytest.fixture
+def cache():
+    return SharedCache()
+
+
+@pytest.fixture
+def fetcher_factory(tmp_path, cache):
+    from utils.stock_data import StockDataFetcher
+
+    def build(provider, **kwargs):
+        gateway = UpstreamGateway(rate=1000, burst=1000, max_retries=0, base_delay=0, cache=cache)
+        return StockDataFetcher(store=OHLCVStore(root=str(tmp_path / "store")), cache=cache,
+                                gateway=gateway, provider=provider, **kwargs)
+    return build
@@ -0,0 +1,13 @@
+import pandas as pd
+from conftest import make_ohlcv
+from utils.backtester import sweep
+
+
+def test_pooled_sweep_matches_inline_sweep():
+    close = pd.DataFrame({symbol: make_ohlcv(300, seed=i)['Close'] for i, symbol in enumerate(["A", "B"])})
+    grid = {'fast': [5, 10, 20], 'slow': [30, 50]}
+
+    inline = sweep(close, "sma_crossover", grid, workers=1)
+    pooled = sweep(close, "sma_crossover", grid, workers=2)
+
+    pd.testing.assert_frame_equal(pooled, inline)
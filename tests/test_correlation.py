@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+from conftest import FakeProvider, make_ohlcv
+from utils.correlation import CorrelationEngine, correlation_matrix, daily_returns, top_correlated
+from utils.shared_cache import SharedCache
+
+
+def close_panel(symbols, n=200):
+    return pd.DataFrame({symbol: make_ohlcv(n, seed=i)['Close'] for i, symbol in enumerate(symbols)})
+
+
+def test_top_correlated_matches_the_full_matrix_row():
+    symbols = [f"S{i}.NS" for i in range(8)]
+    returns = daily_returns(close_panel(symbols)).iloc[-60:]
+
+    most, least = top_correlated(returns, "S3.NS", 3)
+
+    row = correlation_matrix(returns)["S3.NS"].drop("S3.NS")
+    assert [symbol for symbol, _ in most] == list(row.sort_values(ascending=False).index[:3])
+    assert [symbol for symbol, _ in least] == list(row.sort_values().index[:3])
+    np.testing.assert_allclose([value for _, value in most], row.sort_values(ascending=False).iloc[:3], atol=1e-12)
+
+
+def test_rolling_matrix_matches_a_fresh_matrix_after_new_bars():
+    symbols = [f"S{i}.NS" for i in range(6)]
+    full = close_panel(symbols)
+    engine = CorrelationEngine(cache=SharedCache())
+
+    engine.matrix(full.iloc[:180], window=60)
+    matrix = engine.matrix(full.iloc[:183], window=60)
+
+    expected = correlation_matrix(daily_returns(full.iloc[:183]).iloc[-60:])
+    np.testing.assert_allclose(matrix.to_numpy(), expected.to_numpy(), atol=1e-10)
+
+
+def test_correlated_pairs_reuse_cached_universe_returns(fetcher_factory, monkeypatch):
+    provider = FakeProvider()
+    fetcher = fetcher_factory(provider)
+    universe = [f"S{i}.NS" for i in range(6)]
+    fetches = []
+    monkeypatch.setattr(fetcher, "default_universe", lambda: fetches.append(1) or universe)
+
+    most, least = fetcher.get_correlated_pairs("S0.NS", k=2)
+    downloads = len(provider.download_calls)
+    again = fetcher.get_correlated_pairs("S1.NS", k=2)
+
+    returns = fetcher.get_universe_returns(60)
+    assert len(returns) == 60
+    assert (most, least) == top_correlated(returns, "S0.NS", 2)
+    assert len(again[0]) == 2
+    assert len(provider.download_calls) == downloads
+    assert len(fetches) == 1
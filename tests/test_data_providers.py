@@ -0,0 +1,51 @@
+import pandas as pd
+import pytest
+from conftest import FakeProvider
+from utils.data_providers import ReplayProvider
+
+
+def record(tmp_path):
+    fake = FakeProvider()
+    recorder = ReplayProvider(root=str(tmp_path), mode="record", inner=fake)
+    recorded = {
+        'history': recorder.history("A.NS", period="1y"),
+        'start': recorder.history("A.NS", start=fake.frame("A.NS").index[-20]),
+        'download': recorder.download(["B.NS", "C.NS"], period="6mo"),
+        'info': recorder.info("A.NS"),
+    }
+    return fake, recorded
+
+
+def test_replay_serves_what_was_recorded_without_the_inner_provider(tmp_path):
+    fake, recorded = record(tmp_path)
+    replay = ReplayProvider(root=str(tmp_path), mode="replay")
+    assert replay.inner is None
+
+    pd.testing.assert_frame_equal(replay.history("A.NS", period="1y"), recorded['history'])
+    pd.testing.assert_frame_equal(replay.history("A.NS", start=fake.frame("A.NS").index[-20]),
+                                  recorded['start'])
+    downloaded = replay.download(["B.NS", "C.NS"], period="6mo")
+    assert set(downloaded) == {"B.NS", "C.NS"}
+    for symbol, data in recorded['download'].items():
+        pd.testing.assert_frame_equal(downloaded[symbol], data)
+    assert replay.info("A.NS") == recorded['info']
+
+
+def test_replay_derives_narrower_requests_from_the_widest_recording(tmp_path):
+    _, recorded = record(tmp_path)
+    replay = ReplayProvider(root=str(tmp_path), mode="replay")
+
+    month = replay.history("A.NS", period="1mo")
+    assert 0 < len(month) < len(recorded['history'])
+    pd.testing.assert_frame_equal(month, recorded['history'].iloc[-len(month):])
+
+
+def test_replay_misses_are_lookup_errors(tmp_path):
+    record(tmp_path)
+    replay = ReplayProvider(root=str(tmp_path), mode="replay")
+
+    with pytest.raises(LookupError):
+        replay.history("Z.NS", period="1y")
+    with pytest.raises(LookupError):
+        replay.info("B.NS")
+    assert set(replay.download(["B.NS", "Z.NS"], period="6mo")) == {"B.NS"}
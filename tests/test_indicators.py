@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import make_ohlcv
+from utils.indicator_kernels import compute_panel_indicators
+from utils.indicators import IndicatorEngine
+from utils.shared_cache import SharedCache
+
+NAMES = ['SMA_20', 'SMA_50', 'EMA_12', 'EMA_26', 'RSI', 'MACD', 'MACD_signal',
+         'MACD_histogram', 'BB_upper', 'BB_lower', 'Volume_SMA']
+
+
+def reference_indicators(data):
+    """The original pandas formulas the engine replaced"""
+    close = data['Close']
+    indicators = {
+        'SMA_20': close.rolling(window=20).mean(),
+        'SMA_50': close.rolling(window=50).mean(),
+        'EMA_12': close.ewm(span=12).mean(),
+        'EMA_26': close.ewm(span=26).mean(),
+    }
+    delta = close.diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+    indicators['RSI'] = 100 - (100 / (1 + gain / loss))
+    indicators['MACD'] = indicators['EMA_12'] - indicators['EMA_26']
+    indicators['MACD_signal'] = indicators['MACD'].ewm(span=9).mean()
+    indicators['MACD_histogram'] = indicators['MACD'] - indicators['MACD_signal']
+    std_20 = close.rolling(window=20).std()
+    indicators['BB_upper'] = indicators['SMA_20'] + std_20 * 2
+    indicators['BB_lower'] = indicators['SMA_20'] - std_20 * 2
+    indicators['Volume_SMA'] = data['Volume'].rolling(window=20).mean()
+    return indicators
+
+
+@pytest.mark.parametrize("name", NAMES)
+def test_engine_matches_pandas_reference(name):
+    data = make_ohlcv(200)
+    computed = IndicatorEngine(cache=SharedCache()).compute(data, NAMES, symbol="A.NS")
+    pd.testing.assert_series_equal(computed[name], reference_indicators(data)[name], check_names=False)
+
+
+def test_memo_is_reused_for_identical_bars():
+    engine = IndicatorEngine(cache=SharedCache())
+    data = make_ohlcv(200)
+    first = engine.compute(data, NAMES, symbol="A.NS")
+    computations = engine.computations
+
+    second = engine.compute(data.copy(), NAMES, symbol="A.NS")
+
+    assert engine.computations == computations
+    assert second['RSI'] is first['RSI']
+
+
+def test_memo_misses_when_the_last_bar_changes():
+    engine = IndicatorEngine(cache=SharedCache())
+    data = make_ohlcv(200)
+    engine.compute(data, ['SMA_20'], symbol="A.NS")
+
+    updated = data.copy()
+    updated.loc[updated.index[-1], 'Close'] *= 1.05
+    sma = engine.compute(updated, ['SMA_20'], symbol="A.NS")['SMA_20']
+
+    assert sma.iloc[-1] == pytest.approx(updated['Close'].iloc[-20:].mean())
+
+
+@pytest.mark.parametrize("name", NAMES)
+def test_panel_kernels_match_pandas_reference(name):
+    frames = {f"S{i}.NS": make_ohlcv(200, seed=i) for i in range(3)}
+    close = pd.DataFrame({symbol: data['Close'] for symbol, data in frames.items()})
+    volume = pd.DataFrame({symbol: data['Volume'] for symbol, data in frames.items()})
+
+    panel = compute_panel_indicators(close, volume)[name]
+
+    for symbol, data in frames.items():
+        expected = reference_indicators(data)[name]
+        np.testing.assert_allclose(panel[symbol].to_numpy(), expected.to_numpy(), rtol=1e-9, atol=1e-9)
+
+
+def test_panel_kernels_warm_up_after_a_late_listing():
+    data = make_ohlcv(200)
+    close = pd.DataFrame({'A': data['Close'], 'LATE': data['Close'].where(np.arange(200) >= 50)})
+
+    panel = compute_panel_indicators(close)
+
+    late = reference_indicators(data.iloc[50:])
+    np.testing.assert_allclose(panel['SMA_20']['LATE'].iloc[50:].to_numpy(), late['SMA_20'].to_numpy(), rtol=1e-9)
+    assert panel['SMA_20']['LATE'].iloc[:69].isna().all()
@@ -0,0 +1,86 @@
+import threading
+import time
+import numpy as np
+import pandas as pd
+from conftest import FakeProvider
+from utils.intraday_buffer import IntradayBuffer
+
+
+class AlwaysOpen:
+    """Calendar stub: upstream always has newer bars"""
+
+    def has_new_data_since(self, timestamp, now=None):
+        return True
+
+
+def minute_bars(n, start="2026-10-16 09:15", seed=0):
+    index = pd.date_range(start, periods=n, freq="min", tz="Asia/Kolkata")
+    close = 100 + np.cumsum(np.random.default_rng(seed).normal(0, 0.1, n))
+    return pd.DataFrame({'Open': close, 'High': close + 0.05, 'Low': close - 0.05,
+                         'Close': close, 'Volume': np.full(n, 1000.0)}, index=index)
+
+
+def forming(bars, n, close):
+    """The first n bars, with the last one still forming at `close`"""
+    bars = bars.iloc[:n].copy()
+    bars.iloc[-1, bars.columns.get_loc('Close')] = close
+    return bars
+
+
+def test_overlapping_tails_replace_the_forming_bar(fetcher_factory):
+    session = minute_bars(60)
+    provider = FakeProvider()
+    buffer = IntradayBuffer(calendar=AlwaysOpen(), min_refresh=0)
+    fetcher = fetcher_factory(provider, intraday=buffer)
+
+    provider.minutes["A.NS"] = forming(session, 30, close=-1.0)
+    assert fetcher.get_real_time_price("A.NS") == -1.0
+
+    provider.minutes["A.NS"] = session.iloc[:45]
+    assert fetcher.get_real_time_price("A.NS") == session['Close'].iloc[44]
+
+    held = buffer.get_bars("A.NS")
+    pd.testing.assert_frame_equal(held, session.iloc[:45], check_freq=False)
+    assert held.index.is_unique
+    # The top-up asked only for bars from the last held one onwards
+    assert provider.history_calls[-1] == ("A.NS", None, session.index[29])
+
+
+def test_grouped_refresh_merges_each_symbol_tail(fetcher_factory):
+    sessions = {symbol: minute_bars(40, seed=i) for i, symbol in enumerate(["A.NS", "B.NS"])}
+    provider = FakeProvider()
+    buffer = IntradayBuffer(calendar=AlwaysOpen(), min_refresh=0)
+    fetcher = fetcher_factory(provider, intraday=buffer)
+
+    provider.minutes = {symbol: forming(bars, 20, close=-1.0) for symbol, bars in sessions.items()}
+    fetcher.get_real_time_prices(list(sessions))
+    provider.minutes = {"A.NS": sessions["A.NS"].iloc[:30], "B.NS": sessions["B.NS"]}
+    prices = fetcher.get_real_time_prices(list(sessions))
+
+    assert prices == {"A.NS": sessions["A.NS"]['Close'].iloc[29], "B.NS": sessions["B.NS"]['Close'].iloc[-1]}
+    pd.testing.assert_frame_equal(buffer.get_bars("B.NS"), sessions["B.NS"], check_freq=False)
+
+
+def test_concurrent_refreshes_do_not_duplicate_bars():
+    session = minute_bars(200)
+    buffer = IntradayBuffer(calendar=AlwaysOpen(), min_refresh=0)
+    served = {'rows': 10}
+    lock = threading.Lock()
+
+    def fetch_bars(symbol, start):
+        with lock:
+            served['rows'] = min(served['rows'] + 5, len(session))
+            bars = session.iloc[:served['rows']]
+        time.sleep(0.001)
+        return bars if start is None else bars[bars.index >= start]
+
+    threads = [threading.Thread(target=lambda: [buffer.refresh("A.NS", fetch_bars) for _ in range(10)])
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    held = buffer.get_bars("A.NS")
+    assert held.index.is_unique and held.index.is_monotonic_increasing
+    pd.testing.assert_frame_equal(held, session.iloc[:len(held)], check_freq=False)
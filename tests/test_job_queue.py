@@ -0,0 +1,78 @@
+import os
+import time
+from concurrent import futures
+import pytest
+from utils.job_queue import JobQueue, report_progress, DONE, FAILED
+
+
+def add(a, b):
+    return a + b
+
+
+def fail(message):
+    raise ValueError(message)
+
+
+def wait_for_file(path):
+    report_progress(0.5, "Halfway")
+    while not os.path.exists(path):
+        time.sleep(0.01)
+    return "released"
+
+
+@pytest.fixture
+def queue():
+    queue = JobQueue(max_workers=1)
+    yield queue
+    queue.shutdown()
+
+
+def wait(queue, key, timeout=60):
+    job = queue.get(key)
+    futures.wait([job.future], timeout=timeout)
+    # The done callback runs just after the future resolves
+    deadline = time.time() + timeout
+    while not job.finished and time.time() < deadline:
+        time.sleep(0.01)
+    return job
+
+
+def test_identical_submissions_share_one_job(queue):
+    first = queue.submit("sum", add, 2, 3, group="g")
+    second = queue.submit("sum", add, 2, 3, group="g")
+    assert second is first
+
+    job = wait(queue, "sum")
+    assert job.status == DONE and job.result == 5
+    assert queue.submit("sum", add, 2, 3, group="g") is first
+    assert queue.latest("g")[1] == 5
+    assert queue.stats()[DONE] == 1
+
+
+def test_progress_is_reported_through_the_manager(queue, tmp_path):
+    release = str(tmp_path / "release")
+    queue.submit("slow", wait_for_file, release)
+
+    deadline = time.time() + 60
+    while queue.status("slow")['message'] != "Halfway" and time.time() < deadline:
+        time.sleep(0.05)
+    status = queue.status("slow")
+    assert (status['progress'], status['message']) == (0.5, "Halfway")
+
+    open(release, "w").close()
+    job = wait(queue, "slow")
+    assert job.result == "released"
+    assert queue.status("slow")['progress'] == 1.0
+
+
+def test_errors_are_reported_and_failed_jobs_retried(queue):
+    failed = queue.submit("bad", fail, "boom")
+    wait(queue, "bad")
+    status = queue.status("bad")
+    assert status['status'] == FAILED
+    assert status['error'] == "ValueError: boom"
+
+    retried = queue.submit("bad", fail, "again")
+    assert retried is not failed
+    wait(queue, "bad")
+    assert queue.status("bad")['error'] == "ValueError: again"
@@ -0,0 +1,74 @@
+from datetime import date, datetime
+import pandas as pd
+import pytest
+from utils.market_calendar import IST, NSECalendar
+
+CALENDAR = NSECalendar()
+
+
+def ist(*args):
+    return IST.localize(datetime(*args))
+
+
+def test_weekday_during_the_session():
+    now = ist(2026, 10, 16, 11, 0)  # Friday
+
+    assert CALENDAR.is_open(now)
+    assert CALENDAR.cache_ttl(300, now) == 300
+    assert CALENDAR.has_new_data_since(now.timestamp(), now)
+
+
+def test_after_the_close_waits_for_the_next_open():
+    now = ist(2026, 10, 16, 18, 0)  # Friday evening
+
+    assert not CALENDAR.is_open(now)
+    assert CALENDAR.next_open(now) == ist(2026, 10, 19, 9, 15)
+    assert CALENDAR.cache_ttl(300, now) == (ist(2026, 10, 19, 9, 15) - now).total_seconds()
+    assert CALENDAR.last_close(now) == ist(2026, 10, 16, 16, 0)
+
+
+def test_weekend_is_closed_and_has_no_new_data():
+    now = ist(2026, 10, 17, 12, 0)  # Saturday
+    refreshed = ist(2026, 10, 16, 16, 30).timestamp()
+
+    assert not CALENDAR.is_trading_day(now.date())
+    assert not CALENDAR.is_open(now)
+    assert not CALENDAR.has_new_data_since(refreshed, now)
+    assert CALENDAR.has_new_data_since(ist(2026, 10, 16, 15, 0).timestamp(), now)
+
+
+def test_listed_holiday_is_skipped():
+    now = ist(2026, 10, 20, 11, 0)  # Tuesday, listed holiday
+
+    assert not CALENDAR.is_trading_day(now.date())
+    assert not CALENDAR.is_open(now)
+    assert CALENDAR.next_open(now) == ist(2026, 10, 21, 9, 15)
+    days = CALENDAR.trading_days(after="2026-10-16", periods=3)
+    assert list(days.date) == [date(2026, 10, 19), date(2026, 10, 21), date(2026, 10, 22)]
+
+
+def test_special_session_replaces_the_holiday():
+    # 2025-10-21 is a holiday with a Muhurat session in the afternoon
+    assert CALENDAR.is_open(ist(2025, 10, 21, 14, 0))
+    assert not CALENDAR.is_open(ist(2025, 10, 21, 11, 0))
+
+
+@pytest.mark.parametrize("minute, second, expected_open", [(59, 59, True), (0, 0, False)])
+def test_ttl_boundary_at_the_close(minute, second, expected_open):
+    # Bars settle until 16:00 (close plus grace); only then does the TTL stretch to the next open
+    hour = 15 if minute == 59 else 16
+    now = ist(2026, 10, 16, hour, minute, second)
+
+    assert CALENDAR.is_open(now) is expected_open
+    ttl = CALENDAR.cache_ttl(300, now)
+    if expected_open:
+        assert ttl == 300
+    else:
+        assert ttl == (ist(2026, 10, 19, 9, 15) - now).total_seconds()
+
+
+def test_naive_and_utc_times_are_read_as_the_same_instant():
+    utc = pd.Timestamp("2026-10-16 05:30", tz="UTC")  # 11:00 IST
+
+    assert CALENDAR.is_open(utc)
+    assert CALENDAR.is_open(pd.Timestamp("2026-10-16 11:00"))
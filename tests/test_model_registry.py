@@ -0,0 +1,59 @@
+import os
+import time
+from utils.model_registry import ModelRegistry
+from utils.shared_cache import SharedCache
+
+
+def make_registry(tmp_path, **kwargs):
+    return ModelRegistry(root=str(tmp_path / "models"), cache=SharedCache(), **kwargs)
+
+
+def stored_files(tmp_path):
+    return sorted(os.listdir(tmp_path / "models" / "A.NS"))
+
+
+def test_fits_on_different_data_coexist(tmp_path):
+    registry = make_registry(tmp_path)
+    params = {'n_estimators': 10}
+    registry.put("A.NS", "random_forest", params, "fp-1", "model-1")
+    registry.put("A.NS", "random_forest", params, "fp-2", "model-2")
+
+    assert registry.get("A.NS", "random_forest", params, "fp-1") == "model-1"
+    assert registry.get("A.NS", "random_forest", params, "fp-2") == "model-2"
+    assert len(stored_files(tmp_path)) == 2
+
+    # A fresh process finds both on disk
+    reloaded = make_registry(tmp_path)
+    assert reloaded.get("A.NS", "random_forest", params, "fp-1") == "model-1"
+    assert reloaded.stats()['loads'] == 1
+
+
+def test_old_versions_are_evicted_from_disk(tmp_path):
+    registry = make_registry(tmp_path, max_versions=2)
+    params = {'n_estimators': 10}
+    for i in range(4):
+        registry.put("A.NS", "random_forest", params, f"fp-{i}", f"model-{i}")
+        path = registry._path("A.NS", "random_forest", params, f"fp-{i}")
+        os.utime(path, (time.time() + i, time.time() + i))
+    registry.put("A.NS", "random_forest", {'n_estimators': 20}, "fp-0", "other")
+
+    assert len(stored_files(tmp_path)) == 3
+    fresh = make_registry(tmp_path)
+    assert fresh.get("A.NS", "random_forest", params, "fp-0") is None
+    assert fresh.get("A.NS", "random_forest", params, "fp-3") == "model-3"
+    assert fresh.get("A.NS", "random_forest", {'n_estimators': 20}, "fp-0") == "other"
+
+
+def test_get_or_fit_fits_once_per_fingerprint(tmp_path):
+    registry = make_registry(tmp_path)
+    fits = []
+
+    def fit():
+        fits.append(1)
+        return f"model-{len(fits)}"
+
+    assert registry.get_or_fit("A.NS", "linear", {}, "fp-1", fit) == "model-1"
+    assert registry.get_or_fit("A.NS", "linear", {}, "fp-1", fit) == "model-1"
+    assert registry.get_or_fit("A.NS", "linear", {}, "fp-2", fit) == "model-2"
+    assert registry.get_or_fit("A.NS", "linear", {}, "fp-1", fit) == "model-1"
+    assert len(fits) == 2
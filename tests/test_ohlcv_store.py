@@ -0,0 +1,49 @@
+import pandas as pd
+from conftest import make_ohlcv
+from utils.ohlcv_store import OHLCVStore, slice_period
+
+
+def test_append_replaces_overlapping_bars(tmp_path):
+    store = OHLCVStore(root=str(tmp_path))
+    data = make_ohlcv(60)
+    store.save("A.NS", "1d", data.iloc[:50], covered_from=data.index[0])
+
+    update = data.iloc[48:].copy()
+    update.loc[update.index[0], 'Close'] = -1.0
+    merged = store.append("A.NS", "1d", update)
+
+    assert len(merged) == 60
+    assert merged.index.is_monotonic_increasing and merged.index.is_unique
+    assert merged['Close'].iloc[48] == -1.0
+    pd.testing.assert_frame_equal(store.load("A.NS", "1d"), merged, check_freq=False)
+    assert store.last_timestamp("A.NS", "1d") == data.index[-1]
+    assert store.load_meta("A.NS", "1d")['covered_from'] == data.index[0]
+
+
+def test_append_converts_to_the_stored_timezone(tmp_path):
+    store = OHLCVStore(root=str(tmp_path))
+    data = make_ohlcv(30)
+    store.save("A.NS", "1d", data.iloc[:20])
+
+    merged = store.append("A.NS", "1d", data.iloc[20:].tz_convert("UTC"))
+
+    assert str(merged.index.tz) == "Asia/Kolkata"
+    assert len(merged) == 30
+
+
+def test_missing_partition_loads_as_none(tmp_path):
+    store = OHLCVStore(root=str(tmp_path))
+    assert store.load("NONE.NS") is None
+    assert store.load_meta("NONE.NS") == {}
+    assert store.last_timestamp("NONE.NS") is None
+
+
+def test_slice_period_by_calendar_and_by_sessions():
+    data = make_ohlcv(300)
+    end = data.index[-1]
+
+    month = slice_period(data, "1mo", end=end)
+    assert month.index[0] >= end - pd.DateOffset(months=1)
+    assert month.index[-1] == end
+    assert len(slice_period(data, "5d")) == 5
+    assert slice_period(data, "max") is data
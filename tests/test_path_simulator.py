@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+from utils.path_simulator import PathSimulator, TRADING_DAYS, log_returns
+
+
+@pytest.mark.parametrize("method", ["gbm", "bootstrap"])
+def test_same_seed_same_bands_whatever_the_block_size(method):
+    returns = np.random.default_rng(1).normal(0.0005, 0.02, 500)
+    kwargs = dict(s0=100.0, horizon=300, paths=500, method=method, mu=0.1, sigma=0.3, returns=returns)
+    small, small_terminal = PathSimulator(seed=7, block_days=17).bands(**kwargs)
+    large, large_terminal = PathSimulator(seed=7, block_days=300).bands(**kwargs)
+
+    pd.testing.assert_frame_equal(small, large)
+    np.testing.assert_allclose(small_terminal, large_terminal)
+
+
+def test_bands_match_quantiles_of_the_simulated_paths():
+    simulator = PathSimulator(seed=3, block_days=50)
+    prices = simulator.simulate(50.0, 120, paths=400, mu=0.05, sigma=0.25)
+    bands, terminal = simulator.bands(50.0, 120, paths=400, mu=0.05, sigma=0.25)
+
+    # Quantiles are interpolated on log prices, so only approximately equal
+    np.testing.assert_allclose(bands.to_numpy(), np.quantile(prices, [0.05, 0.25, 0.5, 0.75, 0.95], axis=0).T,
+                               rtol=1e-4)
+    np.testing.assert_allclose(terminal, prices[:, -1])
+
+
+def test_gbm_recovers_drift_and_volatility():
+    mu, sigma = 0.12, 0.3
+    prices = PathSimulator(seed=11).simulate(100.0, TRADING_DAYS, paths=20_000, mu=mu, sigma=sigma)
+
+    daily = np.diff(np.log(prices), axis=1)
+    assert daily.std() * np.sqrt(TRADING_DAYS) == pytest.approx(sigma, rel=0.01)
+    # One year out the log return is N(mu - sigma^2 / 2, sigma^2)
+    annual = np.log(prices[:, -1] / 100.0)
+    assert annual.mean() == pytest.approx(mu - 0.5 * sigma ** 2, abs=0.01)
+    assert annual.std() == pytest.approx(sigma, rel=0.02)
+
+
+def test_bootstrap_only_replays_historical_returns():
+    close = 100 * np.exp(np.cumsum(np.random.default_rng(5).normal(0.001, 0.015, 250)))
+    returns = log_returns(close)
+    prices = PathSimulator(seed=2).simulate(close[-1], 60, paths=2_000, method="bootstrap", returns=returns)
+
+    daily = np.diff(np.log(prices), axis=1)
+    assert np.isin(np.round(daily, 10), np.round(returns, 10)).all()
+    assert daily.mean() == pytest.approx(returns.mean(), abs=0.001)
+
+    with pytest.raises(ValueError):
+        PathSimulator().simulate(100.0, 10, method="bootstrap", returns=[])
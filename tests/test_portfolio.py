@@ -0,0 +1,71 @@
+from datetime import datetime
+import numpy as np
+import pytest
+from utils.market_snapshot import MarketSnapshot
+from utils.portfolio import PortfolioManager, fifo_lots, uncovered_sell
+
+
+def txn(symbol, side, quantity, price, date, created_at="0"):
+    return {"symbol": symbol, "side": side, "quantity": quantity, "price": price,
+            "date": date, "created_at": created_at}
+
+
+def test_fifo_sells_close_the_oldest_lots_first():
+    lots, realized = fifo_lots([
+        txn("A.NS", "BUY", 10, 100.0, "2026-01-02"),
+        txn("A.NS", "BUY", 10, 120.0, "2026-01-05"),
+        txn("A.NS", "SELL", 15, 130.0, "2026-01-09"),
+    ])
+
+    assert lots == [("A.NS", 5, 120.0)]
+    assert realized["A.NS"] == pytest.approx(10 * 30.0 + 5 * 10.0)
+
+
+def test_fifo_orders_by_date_not_by_entry():
+    lots, realized = fifo_lots([
+        txn("A.NS", "SELL", 5, 150.0, "2026-02-01"),
+        txn("A.NS", "BUY", 10, 100.0, "2026-01-02"),
+    ])
+
+    assert lots == [("A.NS", 5, 100.0)]
+    assert realized["A.NS"] == pytest.approx(250.0)
+
+
+def test_uncovered_sell_is_found_in_date_order():
+    sell = txn("A.NS", "SELL", 5, 150.0, "2026-01-01")
+    assert uncovered_sell([txn("A.NS", "BUY", 10, 100.0, "2026-01-02"), sell]) is sell
+    assert uncovered_sell([txn("A.NS", "BUY", 10, 100.0, "2025-12-31"), sell]) is None
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = PortfolioManager(portfolios_file=str(tmp_path / "portfolios.json"))
+    day = datetime(2026, 1, 2)
+    manager.add_transaction("alice", "A", "BUY", 10, 100.0, date=day)
+    manager.add_transaction("alice", "UNQUOTED", "BUY", 5, 50.0, date=day)
+    manager.add_transaction("alice", "UNQUOTED", "BUY", 5, 70.0, date=datetime(2026, 1, 5))
+    manager.add_transaction("alice", "UNQUOTED", "SELL", 3, 80.0, date=datetime(2026, 1, 6))
+    manager.add_transaction("bob", "UNQUOTED", "BUY", 20, 500.0, date=day)
+    manager.add_transaction("bob", "A", "BUY", 4, 90.0, date=day)
+    return manager
+
+
+def test_sell_beyond_holdings_is_rejected(manager):
+    ok, _ = manager.add_transaction("alice", "A", "SELL", 11, 120.0, date=datetime(2026, 1, 7))
+    assert not ok
+    assert manager.holdings_quantity("alice") == {"A.NS": 10, "UNQUOTED.NS": 7}
+
+
+def test_value_and_value_all_agree(manager):
+    snapshot = MarketSnapshot()
+    snapshot.update(["A.NS"], np.array([110.0]), np.array([105.0]))
+
+    everyone = manager.value_all(snapshot)
+    for username in ("alice", "bob"):
+        _, totals = manager.value(username, snapshot)
+        row = everyone.loc[username]
+        for column in ('value', 'invested', 'day_change', 'realized_pnl'):
+            assert row[column] == pytest.approx(totals[column]), (username, column)
+
+    # Unquoted lots stay at their own cost, not an average over every user
+    assert everyone.loc["alice", "value"] == pytest.approx(10 * 110.0 + 2 * 50.0 + 5 * 70.0)
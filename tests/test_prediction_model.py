@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+from conftest import make_ohlcv
+from utils.market_calendar import NSE_CALENDAR
+from utils.prediction_model import PredictionModel
+
+
+@pytest.fixture(scope="module")
+def fitted():
+    pytest.importorskip("sklearn")
+    model = PredictionModel()
+    features = model.prepare_features(make_ohlcv(400)).select_dtypes(include=[np.number])
+    target = features['Close'].shift(-1).dropna()
+    X = features.iloc[:-1].fillna(features.mean())
+    model.rf_model.set_params(n_estimators=20, random_state=0)
+    model.rf_model.fit(X, target)
+    return model, X.iloc[-1:].copy()
+
+
+def test_batched_forecast_matches_recursive_forecast(fitted):
+    model, last_features = fitted
+    future_dates = NSE_CALENDAR.trading_days(after=last_features.index[-1], periods=300)
+
+    batched = model.batched_forecast(last_features, future_dates)
+    recursive = model.recursive_forecast(last_features, future_dates)
+
+    np.testing.assert_allclose(batched, recursive, rtol=1e-12)
+
+
+def test_batched_forecast_starts_from_any_close(fitted):
+    model, last_features = fitted
+    future_dates = NSE_CALENDAR.trading_days(after=last_features.index[-1], periods=60)
+
+    for close in (10.0, 95.5, 1e4):
+        shifted = last_features.assign(Close=close)
+        np.testing.assert_allclose(
+            model.batched_forecast(shifted, future_dates),
+            model.recursive_forecast(shifted, future_dates),
+            rtol=1e-12
+        )
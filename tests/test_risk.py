@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import make_ohlcv
+from utils.correlation import daily_returns
+from utils.risk import CovarianceCache, RiskEngine
+
+
+def returns_panel(symbols, n=120):
+    close = pd.DataFrame({symbol: make_ohlcv(n, seed=i)['Close'] for i, symbol in enumerate(symbols)})
+    return daily_returns(close)
+
+
+def test_covariance_cache_extends_and_slices():
+    returns = returns_panel(["A", "B", "C"])
+    cache = CovarianceCache()
+
+    cache.get(returns[["A", "B"]])
+    mean, covariance = cache.get(returns[["C", "A"]])
+
+    np.testing.assert_allclose(covariance, np.cov(returns[["C", "A"]].to_numpy().T), atol=1e-15)
+    np.testing.assert_allclose(mean, returns[["C", "A"]].mean().to_numpy())
+    assert cache.builds == 2
+
+
+def test_covariance_cache_rebuilds_when_values_change_on_the_same_dates():
+    returns = returns_panel(["A", "B"])
+    cache = CovarianceCache()
+    cache.get(returns)
+
+    revised = returns.copy()
+    revised.iloc[-1, 0] += 0.05
+    _, covariance = cache.get(revised)
+
+    np.testing.assert_allclose(covariance, np.cov(revised.to_numpy().T), atol=1e-15)
+    assert cache.builds == 2
+
+
+def test_historical_and_monte_carlo_share_the_horizon_convention():
+    symbols = ["A", "B", "C"]
+    close = pd.DataFrame({symbol: make_ohlcv(300, seed=i)['Close'] for i, symbol in enumerate(symbols)})
+    exposures = {"A": 1e5, "B": 2e5, "C": 5e4}
+    engine = RiskEngine(covariance_cache=CovarianceCache())
+
+    one_day = engine.compute(close, exposures, horizon=1)
+    ten_day = engine.compute(close, exposures, horizon=10)
+
+    for name in ('historical_var', 'historical_cvar', 'monte_carlo_var', 'monte_carlo_cvar'):
+        assert ten_day[name] == pytest.approx(one_day[name] * np.sqrt(10)), name
@@ -0,0 +1,57 @@
+import time
+import pandas as pd
+import pytest
+from conftest import FakeProvider
+from utils.market_snapshot import MarketSnapshot
+from utils.screener import ScreenerTable
+
+
+@pytest.fixture
+def table(monkeypatch):
+    table = ScreenerTable()
+    monkeypatch.setattr("utils.stock_data.get_screener_table", lambda: table)
+    return table
+
+
+def test_known_symbols_are_topped_up_from_their_last_date(fetcher_factory, table):
+    provider = FakeProvider()
+    fetcher = fetcher_factory(provider)
+    fetcher.get_screener_table(["A.NS", "B.NS"])
+    assert provider.download_calls == [(("A.NS", "B.NS"), "1y", None)]
+
+    last = table.last_dates(["A.NS"])["A.NS"]
+    table.expires[:] = 0
+    fetcher.get_screener_table(["A.NS", "B.NS"])
+
+    assert provider.download_calls[-1] == (("A.NS", "B.NS"), None, last.normalize())
+    assert table.last_dates(["B.NS"])["B.NS"] == last
+
+
+def test_symbols_idle_past_the_top_up_window_are_reloaded(fetcher_factory, table, cache):
+    provider = FakeProvider()
+    fetcher = fetcher_factory(provider)
+    fetcher.get_screener_table(["A.NS", "B.NS"])
+    full = table.close.copy()
+
+    # A.NS only holds bars up to a month ago
+    table.close.loc[table.close.index[-22]:, "A.NS"] = float("nan")
+    table.expires[:] = 0
+    cache.clear()
+    fetcher.get_screener_table(["A.NS", "B.NS"])
+
+    calls = provider.download_calls[1:]
+    assert (("A.NS",), "1y", None) in calls
+    assert any(symbols == ("B.NS",) and period is None for symbols, period, _ in calls)
+    pd.testing.assert_frame_equal(table.close, full, check_freq=False)
+
+
+@pytest.mark.parametrize("registry", [MarketSnapshot, ScreenerTable])
+def test_symbol_registry_expiry(registry):
+    table = registry()
+    table.add_symbols(["A.NS", "B.NS", "A.NS"])
+    assert len(table) == 2 and list(table.positions(["B.NS", "Z.NS"])) == [1, -1]
+
+    table.touch(["B.NS", "C.NS"], ttl=60)
+    assert table.stale_symbols() == ["A.NS"]
+    assert table.stale_symbols(["C.NS", "Z.NS"]) == ["Z.NS"]
+    assert table.stale_symbols(now=time.time() + 120) == ["A.NS", "B.NS", "C.NS"]
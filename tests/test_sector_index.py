@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+from utils.market_snapshot import MarketSnapshot
+from utils.sector_index import SectorIndex
+
+
+class GrowingSnapshot(MarketSnapshot):
+    """Another session adds symbols between the matrix build and the change read"""
+
+    def change_pct(self):
+        self.add_symbols([f"NEW{len(self)}.NS"])
+        return super().change_pct()
+
+
+def quoted(snapshot_class=MarketSnapshot):
+    snapshot = snapshot_class()
+    snapshot.update(["A.NS", "B.NS", "C.NS"], np.array([110.0, 95.0, 100.0]), np.array([100.0, 100.0, 100.0]))
+    return snapshot
+
+
+def test_weighted_basket_changes():
+    index = SectorIndex(sectors={"Two": ["A.NS", "B.NS"], "Unquoted": ["X.NS"]})
+    index.add_basket("Weighted", ["A.NS", "B.NS"], weights=[3.0, 1.0])
+
+    performance = index.compute(quoted())
+
+    assert performance["Two"] == pytest.approx(2.5)
+    assert performance["Weighted"] == pytest.approx((3 * 10 - 5) / 4)
+    assert "Unquoted" not in performance
+
+
+def test_snapshot_growing_during_compute_is_tolerated():
+    index = SectorIndex(sectors={"Two": ["A.NS", "B.NS"]})
+    snapshot = quoted(GrowingSnapshot)
+
+    for _ in range(3):
+        assert index.compute(snapshot)["Two"] == pytest.approx(2.5)
@@ -0,0 +1,73 @@
+import threading
+import time
+import numpy as np
+import pandas as pd
+from utils.shared_cache import SharedCache, data_fingerprint
+
+
+def test_entry_bound_evicts_least_recently_used():
+    cache = SharedCache(max_entries=3)
+    for key in "abc":
+        cache.set(key, key)
+    cache.get("a")
+    cache.set("d", "d")
+
+    assert cache.get("b") is None
+    assert [cache.get(key) for key in "acd"] == ["a", "c", "d"]
+    assert cache.evictions == 1
+
+
+def test_byte_bound_evicts_and_skips_oversized_values():
+    cache = SharedCache(max_bytes=20_000)
+    cache.set("a", np.zeros(1000))
+    cache.set("b", np.zeros(1000))
+    cache.set("c", np.zeros(1000))
+
+    assert cache.get("a") is None
+    assert cache.stats()['bytes'] <= 20_000
+
+    cache.set("huge", np.zeros(10_000))
+    assert cache.get("huge") is None
+    assert cache.get("c") is not None
+
+
+def test_expired_entries_are_stale_not_gone():
+    cache = SharedCache()
+    cache.set("a", 1, ttl=0.01)
+    time.sleep(0.02)
+
+    assert cache.get("a") is None
+    assert cache.get_stale("a") == 1
+
+
+def test_get_or_load_runs_one_load_for_concurrent_callers():
+    cache = SharedCache()
+    calls = []
+    started = threading.Event()
+
+    def loader():
+        calls.append(1)
+        started.wait(1)
+        return "value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load("k", loader))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    started.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["value"] * 4
+    assert len(calls) == 1
+
+
+def test_data_fingerprint_tracks_values():
+    index = pd.bdate_range("2026-01-01", periods=5)
+    values = np.arange(5.0)
+    changed = values.copy()
+    changed[-1] += 1
+
+    assert data_fingerprint(index, values) == data_fingerprint(index, values.copy())
+    assert data_fingerprint(index, values) != data_fingerprint(index, changed)
@@ -0,0 +1,53 @@
+from conftest import FakeProvider
+
+
+def test_close_panel_mixes_grouped_and_retried_symbols(fetcher_factory):
+    # B.NS is missing from the grouped (tz-naive) download and comes back tz-aware from history()
+    provider = FakeProvider(grouped_misses={"B.NS"})
+    fetcher = fetcher_factory(provider)
+
+    panel, failures = fetcher.get_close_panel(["A.NS", "B.NS", "C.NS"], period="1mo")
+
+    assert failures == {}
+    assert list(panel.columns) == ["A.NS", "B.NS", "C.NS"]
+    assert str(panel.index.tz) == "Asia/Kolkata"
+    assert [call[0] for call in provider.history_calls] == ["B.NS"]
+    # Same dates for both paths, so nothing is misaligned into NaN rows
+    assert not panel.isna().any().any()
+
+
+def test_cached_and_fresh_symbols_share_a_timezone(fetcher_factory):
+    provider = FakeProvider(grouped_misses={"B.NS"})
+    fetcher = fetcher_factory(provider)
+    fetcher.get_close_panel(["B.NS"], period="1mo")
+
+    panels, failures = fetcher.get_ohlcv_panels(["A.NS", "B.NS"], period="1mo")
+
+    assert failures == {}
+    assert not panels["Close"].isna().any().any()
+    assert not panels["Volume"].isna().any().any()
+
+
+def test_universe_sized_batch_is_one_cache_entry(fetcher_factory, cache):
+    provider = FakeProvider()
+    fetcher = fetcher_factory(provider)
+    fetcher.get_batch_stock_data(["KEEP.NS"], period="1mo")
+    symbols = [f"S{i}.NS" for i in range(fetcher.batch_cache_threshold * 3)]
+
+    data, failures = fetcher.get_batch_stock_data(symbols, period="1mo")
+    again, _ = fetcher.get_batch_stock_data(symbols, period="1mo")
+
+    assert failures == {}
+    assert list(data) == symbols and list(again) == symbols
+    assert len(provider.download_calls) == 2
+    assert cache.stats()['entries'] == 2
+    assert cache.get(fetcher._cache_key("KEEP.NS", "1mo", "1d")) is not None
+
+
+def test_stock_info_is_served_from_the_cache(fetcher_factory):
+    provider = FakeProvider()
+    fetcher = fetcher_factory(provider)
+
+    assert fetcher.get_stock_info("A.NS") == {'symbol': "A.NS"}
+    assert fetcher.get_stock_info("A.NS") == {'symbol': "A.NS"}
+    assert provider.info_calls == ["A.NS"]
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import make_ohlcv
+from utils.indicators import IndicatorEngine
+from utils.shared_cache import SharedCache
+from utils.streaming_indicators import (DEFAULT_TOLERANCE, RSI, LiveIndicatorBook, StreamingIndicatorSet,
+                                        verify_against_batch)
+
+NAMES = ['SMA_20', 'SMA_50', 'EMA_12', 'EMA_26', 'RSI', 'MACD', 'MACD_signal',
+         'MACD_histogram', 'BB_upper', 'BB_lower', 'Volume_SMA']
+
+
+def wilder_rsi_reference(closes, period):
+    """RSI from ewm(alpha=1/period, adjust=False) smoothing seeded with the first simple average"""
+    delta = np.diff(closes)
+    averages = []
+    for values in (np.where(delta > 0, delta, 0.0), np.where(delta < 0, -delta, 0.0)):
+        seeded = np.r_[values[:period].mean(), values[period:]]
+        averages.append(pd.Series(seeded).ewm(alpha=1 / period, adjust=False).mean().to_numpy())
+    gain, loss = averages
+    return 100 - (100 / (1 + gain / loss))
+
+
+@pytest.mark.parametrize("seed_bars", [60, 150])
+def test_streamed_values_match_batch_indicators(seed_bars):
+    data = make_ohlcv(300)
+    batch = IndicatorEngine(cache=SharedCache()).compute(data, NAMES, symbol="A.NS")
+
+    ok, errors = verify_against_batch(data, batch, seed_bars=seed_bars)
+
+    assert ok, errors
+    assert max(errors.values()) <= DEFAULT_TOLERANCE
+
+
+@pytest.mark.parametrize("seed_bars", [5, 40])
+def test_wilder_rsi_matches_ewm_reference(seed_bars):
+    closes = make_ohlcv(200)['Close'].to_numpy()
+    reference = wilder_rsi_reference(closes, 14)
+    rsi = RSI(14, method="wilder")
+    rsi.seed(closes[:seed_bars])
+
+    for i in range(seed_bars, len(closes)):
+        value = rsi.update(closes[i])
+        if i >= 14:
+            assert value == pytest.approx(reference[i - 14], rel=1e-10)
+        else:
+            assert np.isnan(value)
+
+
+def test_unknown_rsi_method_is_rejected():
+    with pytest.raises(ValueError):
+        RSI(14, method="ema")
+
+
+def test_update_bars_skips_bars_already_seen():
+    data = make_ohlcv(120)
+    state = StreamingIndicatorSet()
+    state.seed(data.iloc[:100])
+
+    state.update_bars(data.iloc[90:110])
+    overlapped = state.update_bars(data.iloc[95:])
+
+    reference = StreamingIndicatorSet()
+    reference.seed(data.iloc[:100])
+    for timestamp, row in data.iloc[100:].iterrows():
+        expected = reference.update(row['Close'], row['Volume'], timestamp)
+
+    assert overlapped == pytest.approx(expected)
+    assert state.last_timestamp == data.index[-1]
+
+
+def test_live_book_seeds_once_then_streams():
+    data = make_ohlcv(120)
+    book = LiveIndicatorBook()
+    book.update("A.NS", data.iloc[:100])
+    values = book.update("A.NS", data)
+
+    expected = StreamingIndicatorSet().seed(data)
+    assert values == pytest.approx(expected, rel=1e-9)
+    assert book.update("A.NS", data.iloc[:0]) is None
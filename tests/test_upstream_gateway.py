@@ -0,0 +1,66 @@
+import pytest
+from utils.shared_cache import SharedCache
+from utils.upstream_gateway import UpstreamGateway, CircuitOpenError, is_transient_error
+
+
+class Flaky:
+    def __init__(self, errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+def make_gateway(**kwargs):
+    return UpstreamGateway(rate=1000, burst=1000, base_delay=0, cache=SharedCache(), **kwargs)
+
+
+@pytest.mark.parametrize("error, transient", [
+    (TimeoutError("read timed out"), True),
+    (ConnectionError("reset by peer"), True),
+    (Exception("429 Client Error: Too Many Requests"), True),
+    (Exception("HTTP Error 503: Service Unavailable"), True),
+    (Exception("HTTP Error 404: Not Found"), False),
+    (KeyError("Close"), False),
+    (ValueError("No timezone found, symbol may be delisted"), False),
+])
+def test_transient_error_classification(error, transient):
+    assert is_transient_error(error) is transient
+
+
+def test_transient_errors_are_retried():
+    gateway = make_gateway(max_retries=3)
+    fn = Flaky([TimeoutError(), ConnectionError()])
+
+    assert gateway.call("A.NS", fn) == "ok"
+    assert fn.calls == 3
+    assert gateway.stats()['retries'] == 2
+
+
+def test_permanent_errors_fail_fast():
+    gateway = make_gateway(max_retries=3)
+    fn = Flaky([ValueError("symbol may be delisted")])
+
+    with pytest.raises(ValueError):
+        gateway.call("A.NS", fn)
+    assert fn.calls == 1
+    assert gateway.stats()['retries'] == 0
+
+
+def test_open_circuit_is_per_key_and_serves_stale():
+    gateway = make_gateway(max_retries=0, failure_threshold=1)
+    gateway.cache.set("A.NS_1mo", "stale")
+
+    with pytest.raises(TimeoutError):
+        gateway.call("download:a", Flaky([TimeoutError()]))
+    assert gateway.is_blocked("download:a")
+    assert not gateway.is_blocked("download:b")
+    assert gateway.call("download:b", Flaky([])) == "ok"
+
+    with pytest.raises(CircuitOpenError):
+        gateway.call("download:a", Flaky([]))
+    assert gateway.call("download:a", Flaky([]), stale_key="A.NS_1mo") == "stale"
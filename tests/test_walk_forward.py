@@ -0,0 +1,32 @@
+import pandas as pd
+import pytest
+from conftest import make_ohlcv
+from utils.walk_forward import summarize, walk_forward, walk_forward_folds
+
+MODELS = {"last_close": ("last_close", {}), "linear": ("linear", {})}
+
+
+def test_folds_are_consecutive_and_never_look_ahead():
+    folds = walk_forward_folds(1200, n_folds=5, mode="rolling", train_size=200)
+
+    assert len(folds) == 5
+    for (train, test), (_, next_test) in zip(folds, folds[1:]):
+        assert train.stop == test.start and train.stop - train.start == 200
+        assert test.stop == next_test.start
+    assert folds[-1][1].stop == 1200
+
+
+def test_pooled_run_matches_inline_run():
+    pytest.importorskip("sklearn")
+    frames = {f"S{i}.NS": make_ohlcv(400, seed=i) for i in range(2)}
+
+    inline = walk_forward(frames, MODELS, n_folds=3, workers=1)
+    pooled = walk_forward(frames, MODELS, n_folds=3, workers=2)
+
+    metrics = ['symbol', 'model', 'fold', 'train_rows', 'test_rows', 'MSE', 'RMSE', 'MAE', 'MAPE']
+    pd.testing.assert_frame_equal(pooled[metrics], inline[metrics])
+    assert (inline[['fit_seconds', 'predict_seconds']] >= 0).all().all()
+
+    summary = summarize(inline)
+    assert list(summary.index) == sorted(summary.index, key=lambda model: summary.loc[model, 'RMSE'])
+    assert (summary['folds'] == 6).all()
@@ -0,0 +1,195 @@
+import os
+import itertools
+import numpy as np
+import pandas as pd
+from utils import indicator_kernels as kernels
+from utils.job_queue import spawn_pool
+
+TRADING_DAYS = 252
+
+
+def _hold(entries, exits):
+    """Position from entry/exit events: 1 after an entry until the next exit"""
+    state = np.where(entries, 1.0, np.where(exits, 0.0, np.nan))
+    state = pd.DataFrame(state).ffill().to_numpy()
+    return np.nan_to_num(state, nan=0.0)
+
+
+def sma_crossover(close, fast=20, slow=50, indicator=None):
+    """Long while the fast SMA is above the slow SMA"""
+    indicator = indicator or _compute
+    with np.errstate(invalid='ignore'):
+        return (indicator(kernels.rolling_mean, close, fast) > indicator(kernels.rolling_mean, close, slow)).astype(np.float64)
+
+
+def macd_crossover(close, fast=12, slow=26, signal=9, indicator=None):
+    """Long while MACD is above its signal line"""
+    indicator = indicator or _compute
+    line, signal_line, _ = indicator(kernels.macd, close, fast, slow, signal)
+    with np.errstate(invalid='ignore'):
+        return (line > signal_line).astype(np.float64)
+
+
+def rsi_reversion(close, period=14, lower=30, upper=70, indicator=None):
+    """Buy when RSI drops below `lower`, sell when it rises above `upper`"""
+    indicator = indicator or _compute
+    rsi = indicator(kernels.rsi, close, period)
+    with np.errstate(invalid='ignore'):
+        return _hold(rsi < lower, rsi > upper)
+
+
+def bollinger_reversion(close, window=20, k=2, indicator=None):
+    """Buy below the lower band, sell once price is back above the middle band"""
+    indicator = indicator or _compute
+    _, lower = indicator(kernels.bollinger, close, window, k)
+    middle = indicator(kernels.rolling_mean, close, window)
+    with np.errstate(invalid='ignore'):
+        return _hold(close < lower, close > middle)
+
+
+STRATEGIES = {
+    "sma_crossover": sma_crossover,
+    "macd_crossover": macd_crossover,
+    "rsi_reversion": rsi_reversion,
+    "bollinger_reversion": bollinger_reversion
+}
+
+
+# Parameter grids offered for sweeps on the Analytics page
+DEFAULT_GRIDS = {
+    "sma_crossover": {'fast': list(range(5, 55, 5)), 'slow': list(range(60, 260, 20))},
+    "macd_crossover": {'fast': [8, 10, 12, 16], 'slow': [21, 26, 30, 40], 'signal': [5, 7, 9, 12]},
+    "rsi_reversion": {'period': [7, 10, 14, 21], 'lower': [20, 25, 30, 35], 'upper': [65, 70, 75, 80]},
+    "bollinger_reversion": {'window': [10, 15, 20, 30, 40], 'k': [1.5, 2, 2.5, 3]}
+}
+
+
+def _compute(fn, close, *params):
+    return fn(close, *params)
+
+
+def backtest(close, positions, cost_bps=10.0, slippage_bps=5.0):
+    """Simulate target positions over a (date x symbol) close array
+
+    Positions decided on a bar's close are held from the next bar. Every
+    change in position pays commission plus slippage on the traded amount.
+    Symbols are equally weighted among those with a price on each day.
+    Returns (portfolio daily returns, per-symbol net returns, turnover).
+    """
+    close = np.asarray(close, dtype=np.float64)
+    positions = np.nan_to_num(np.asarray(positions, dtype=np.float64))
+
+    returns = np.zeros_like(close)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns[1:] = close[1:] / close[:-1] - 1
+    tradable = np.isfinite(returns)
+    returns = np.where(tradable, returns, 0.0)
+
+    held = np.zeros_like(positions)
+    held[1:] = positions[:-1]
+    turnover = np.abs(np.diff(held, axis=0, prepend=0.0))
+    net = held * returns - turnover * (cost_bps + slippage_bps) / 10_000
+
+    listed = ~np.isnan(close)
+    counts = listed.sum(axis=1)
+    portfolio = np.divide(np.where(listed, net, 0.0).sum(axis=1), counts, out=np.zeros(len(close)), where=counts > 0)
+
+    return portfolio, net, turnover
+
+
+def performance(daily_returns, turnover=None):
+    """Summary metrics for a series of daily portfolio returns"""
+    daily_returns = np.asarray(daily_returns, dtype=np.float64)
+    equity = np.cumprod(1 + daily_returns)
+    years = len(daily_returns) / TRADING_DAYS
+    volatility = daily_returns.std(ddof=1) * np.sqrt(TRADING_DAYS) if len(daily_returns) > 1 else 0.0
+    drawdown = equity / np.maximum.accumulate(equity) - 1 if len(equity) else np.zeros(1)
+
+    metrics = {
+        'total_return': float(equity[-1] - 1) if len(equity) else 0.0,
+        'cagr': float(equity[-1] ** (1 / years) - 1) if years > 0 and equity[-1] > 0 else 0.0,
+        'volatility': float(volatility),
+        'sharpe': float(daily_returns.mean() * TRADING_DAYS / volatility) if volatility > 0 else 0.0,
+        'max_drawdown': float(drawdown.min())
+    }
+    if turnover is not None:
+        metrics['trades'] = int(np.count_nonzero(turnover))
+    return metrics
+
+
+def run_strategy(close, strategy, params=None, cost_bps=10.0, slippage_bps=5.0, indicator=None):
+    """Backtest one strategy/parameter set; returns (metrics, equity curve)"""
+    params = params or {}
+    values = close.to_numpy(dtype=np.float64) if isinstance(close, pd.DataFrame) else np.asarray(close, dtype=np.float64)
+    positions = STRATEGIES[strategy](values, indicator=indicator, **params)
+    portfolio, _, turnover = backtest(values, positions, cost_bps, slippage_bps)
+
+    equity = np.cumprod(1 + portfolio)
+    if isinstance(close, pd.DataFrame):
+        equity = pd.Series(equity, index=close.index)
+    return performance(portfolio, turnover), equity
+
+
+def parameter_grid(grid):
+    """Every combination of a {param: [values]} grid, as a list of dicts"""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+# Per-worker state for sweeps, so the close panel is sent once per process
+_worker_close = None
+_worker_indicators = {}
+
+
+def _init_worker(close):
+    global _worker_close, _worker_indicators
+    _worker_close = close
+    _worker_indicators = {}
+
+
+def _memo_indicator(fn, close, *params):
+    """Indicator arrays shared by every combination a worker runs"""
+    key = (fn.__name__,) + params
+    if key not in _worker_indicators:
+        _worker_indicators[key] = fn(close, *params)
+    return _worker_indicators[key]
+
+
+def _run_chunk(strategy, combos, cost_bps, slippage_bps):
+    rows = []
+    for params in combos:
+        if params.get('fast', 0) >= params.get('slow', np.inf):
+            continue
+        metrics, _ = run_strategy(_worker_close, strategy, params, cost_bps, slippage_bps, indicator=_memo_indicator)
+        rows.append({**params, **metrics})
+    return rows
+
+
+def sweep(close, strategy, grid, cost_bps=10.0, slippage_bps=5.0, workers=None, chunks_per_worker=4):
+    """Backtest every parameter combination of `grid` across a process pool
+
+    The close panel goes to each worker once (pool initializer), and each
+    worker memoizes indicator arrays, so e.g. an SMA window is computed once
+    per worker however many combinations use it. Combinations with
+    fast >= slow are skipped. Returns a DataFrame sorted by Sharpe ratio.
+    """
+    values = close.to_numpy(dtype=np.float64) if isinstance(close, pd.DataFrame) else np.asarray(close, dtype=np.float64)
+    combos = parameter_grid(grid)
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        _init_worker(values)
+        rows = _run_chunk(strategy, combos, cost_bps, slippage_bps)
+    else:
+        # Contiguous chunks keep combinations sharing indicators together
+        size = max(1, -(-len(combos) // (workers * chunks_per_worker)))
+        chunks = [combos[i:i + size] for i in range(0, len(combos), size)]
+        with spawn_pool(workers, initializer=_init_worker, initargs=(values,)) as executor:
+            results = executor.map(_run_chunk, itertools.repeat(strategy), chunks,
+                                    itertools.repeat(cost_bps), itertools.repeat(slippage_bps))
+            rows = [row for chunk in results for row in chunk]
+
+    results = pd.DataFrame(rows)
+    if results.empty:
+        return results
+    return results.sort_values('sharpe', ascending=False, ignore_index=True)
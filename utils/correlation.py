@@ -0,0 +1,242 @@
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from utils.shared_cache import get_shared_cache
+
+# Default rows of the correlation matrix computed per block
+DEFAULT_BLOCK_SIZE = 256
+
+
+def daily_returns(close):
+    """Simple returns of a (date x symbol) close panel
+
+    Missing returns (holidays, suspensions, late listings) count as 0, so
+    every symbol has a value on every row of the window.
+    """
+    return close.pct_change(fill_method=None).iloc[1:].fillna(0.0)
+
+
+def standardize(returns):
+    """Columns scaled so that Z.T @ Z is the correlation matrix
+
+    Constant columns (no variance in the window) become all-zero and so
+    correlate 0 with everything.
+    """
+    values = np.asarray(returns, dtype=np.float64)
+    centred = values - values.mean(axis=0)
+    norms = np.sqrt((centred * centred).sum(axis=0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = np.where(norms > 0, centred / norms, 0.0)
+    return z
+
+
+def iter_correlation_blocks(returns, block_size=DEFAULT_BLOCK_SIZE, dtype=np.float64):
+    """Yield (row slice, block) pieces of the correlation matrix
+
+    Only one (block_size x symbols) block exists at a time, so consumers
+    that reduce each block never hold the full matrix.
+    """
+    z = standardize(returns)
+    n = z.shape[1]
+    for start in range(0, n, block_size):
+        rows = slice(start, min(start + block_size, n))
+        block = z[:, rows].T @ z
+        np.clip(block, -1.0, 1.0, out=block)
+        yield rows, block.astype(dtype, copy=False)
+
+
+def correlation_matrix(returns, block_size=DEFAULT_BLOCK_SIZE, dtype=np.float64):
+    """Full correlation matrix of a returns panel, assembled block by block"""
+    columns = returns.columns if isinstance(returns, pd.DataFrame) else None
+    n = np.asarray(returns).shape[1]
+    matrix = np.empty((n, n), dtype=dtype)
+    for rows, block in iter_correlation_blocks(returns, block_size, dtype):
+        matrix[rows] = block
+    np.fill_diagonal(matrix, 1.0)
+
+    if columns is not None:
+        return pd.DataFrame(matrix, index=columns, columns=columns)
+    return matrix
+
+
+def top_correlated(returns, symbol, k=5):
+    """Most and least correlated symbols for one symbol, without the full matrix
+
+    A single matrix-vector product Z.T @ z_i gives that symbol's row.
+    Returns two lists of (symbol, correlation), most correlated first and
+    least correlated (most negative) first.
+    """
+    columns = list(returns.columns)
+    position = columns.index(symbol)
+    z = standardize(returns)
+    row = np.clip(z.T @ z[:, position], -1.0, 1.0)
+    row[position] = np.nan
+
+    return _top_k(row, columns, k)
+
+
+def _top_k(row, columns, k):
+    candidates = np.flatnonzero(~np.isnan(row))
+    if len(candidates) == 0:
+        return [], []
+
+    k = min(k, len(candidates))
+    values = row[candidates]
+    most = candidates[np.argpartition(-values, k - 1)[:k]]
+    most = most[np.argsort(-row[most])]
+    least = candidates[np.argpartition(values, k - 1)[:k]]
+    least = least[np.argsort(row[least])]
+
+    return (
+        [(columns[i], float(row[i])) for i in most],
+        [(columns[i], float(row[i])) for i in least]
+    )
+
+
+class RollingCorrelation:
+    """Sliding-window correlation maintained from running sums
+
+    Keeps the window's returns plus sum(x) and sum(x x^T), so each new row
+    costs one rank-1 add and one rank-1 remove (O(symbols^2)) instead of a
+    full O(window x symbols^2) recomputation. The sums are rebuilt from the
+    window every `resync_every` updates to stop floating-point drift.
+    """
+
+    def __init__(self, symbols, window, resync_every=None):
+        self.symbols = list(symbols)
+        self.window = window
+        self.resync_every = resync_every or window * 4
+        self.rows = np.empty((0, len(self.symbols)))
+        self.index = pd.Index([])
+        self.sum = np.zeros(len(self.symbols))
+        self.cross = np.zeros((len(self.symbols), len(self.symbols)))
+        self._updates = 0
+
+    @property
+    def last_date(self):
+        return self.index[-1] if len(self.index) else None
+
+    def seed(self, returns):
+        """Start from the last `window` rows of a returns panel"""
+        returns = returns[self.symbols].iloc[-self.window:]
+        self.rows = returns.to_numpy(dtype=np.float64)
+        self.index = returns.index
+        self._resync()
+
+    def update(self, returns):
+        """Slide the window over new return rows"""
+        returns = returns[self.symbols]
+        for date, row in zip(returns.index, returns.to_numpy(dtype=np.float64)):
+            if len(self.rows) == self.window:
+                old = self.rows[0]
+                self.sum -= old
+                self.cross -= np.outer(old, old)
+                self.rows = self.rows[1:]
+                self.index = self.index[1:]
+
+            self.sum += row
+            self.cross += np.outer(row, row)
+            self.rows = np.vstack([self.rows, row])
+            self.index = self.index.append(pd.Index([date]))
+
+            self._updates += 1
+            if self._updates % self.resync_every == 0:
+                self._resync()
+
+    def revise_last(self, row):
+        """Replace the newest row, e.g. when today's still-forming bar moved"""
+        old = self.rows[-1]
+        self.sum += row - old
+        self.cross += np.outer(row, row) - np.outer(old, old)
+        self.rows[-1] = row
+
+    def _resync(self):
+        self.sum = self.rows.sum(axis=0)
+        self.cross = self.rows.T @ self.rows
+
+    def matrix(self):
+        """Current correlation matrix as a DataFrame"""
+        n = len(self.rows)
+        covariance = self.cross - np.outer(self.sum, self.sum) / n
+        std = np.sqrt(np.maximum(np.diag(covariance), 0.0))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            matrix = covariance / np.outer(std, std)
+        matrix = np.clip(np.where(np.isfinite(matrix), matrix, 0.0), -1.0, 1.0)
+        np.fill_diagonal(matrix, 1.0)
+        return pd.DataFrame(matrix, index=self.symbols, columns=self.symbols)
+
+
+class CorrelationEngine:
+    """Correlation service over cached close panels
+
+    Matrices are cached in the shared cache per (universe, window, last
+    date) and rolling windows per (universe, window) are advanced with new
+    bars instead of being rebuilt.
+    """
+
+    def __init__(self, cache=None, block_size=DEFAULT_BLOCK_SIZE, max_rolling=8):
+        self.cache = cache if cache is not None else get_shared_cache()
+        self.block_size = block_size
+        self.max_rolling = max_rolling  # Rolling windows kept, least recently used dropped
+        self._rolling = OrderedDict()
+        self._lock = threading.Lock()
+
+    def matrix(self, close, window=60, ttl=None):
+        """Correlation matrix of the last `window` returns of a close panel"""
+        returns = daily_returns(close)
+        if returns.empty:
+            return pd.DataFrame()
+
+        key = ("correlation", self._universe_key(close.columns), window, returns.index[-1])
+        return self.cache.get_or_load(key, lambda: self._rolling_matrix(returns, window), ttl=ttl)
+
+    def _rolling_matrix(self, returns, window):
+        key = (self._universe_key(returns.columns), window)
+        with self._lock:
+            rolling = self._rolling.get(key)
+            if rolling is None or rolling.last_date is None or rolling.last_date not in returns.index:
+                # No usable state: compute blockwise and start a new rolling window
+                rolling = RollingCorrelation(returns.columns, window)
+                rolling.seed(returns)
+                self._rolling[key] = rolling
+                while len(self._rolling) > self.max_rolling:
+                    self._rolling.popitem(last=False)
+                return correlation_matrix(returns.iloc[-window:], self.block_size)
+
+            self._rolling.move_to_end(key)
+
+            # The newest bar may have moved since it was added (live session)
+            latest = returns.loc[rolling.last_date, rolling.symbols].to_numpy(dtype=np.float64)
+            if not np.array_equal(latest, rolling.rows[-1]):
+                rolling.revise_last(latest)
+
+            new_rows = returns.iloc[returns.index.get_loc(rolling.last_date) + 1:]
+            rolling.update(new_rows)
+            return rolling.matrix()
+
+    def top_pairs(self, close, symbol, k=5, window=60):
+        """(most, least) correlated symbols for `symbol` over the last `window` returns"""
+        returns = daily_returns(close).iloc[-window:]
+        if returns.empty or symbol not in returns.columns:
+            return [], []
+        return top_correlated(returns, symbol, k)
+
+    def _universe_key(self, symbols):
+        symbols = list(symbols)
+        digest = hashlib.md5("|".join(symbols).encode()).hexdigest()
+        return f"{len(symbols)}:{digest}"
+
+
+_correlation_engine = None
+_correlation_engine_lock = threading.Lock()
+
+
+def get_correlation_engine():
+    """Process-wide CorrelationEngine instance"""
+    global _correlation_engine
+    with _correlation_engine_lock:
+        if _correlation_engine is None:
+            _correlation_engine = CorrelationEngine()
+        return _correlation_engine
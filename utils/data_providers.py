@@ -0,0 +1,245 @@
+import os
+import re
+import glob
+import time
+import random
+import hashlib
+import threading
+import pandas as pd
+import yfinance as yf
+from utils.ohlcv_store import slice_period
+
+
+def align_timezones(frames):
+    """Give every frame in {symbol: DataFrame} the same index timezone
+
+    Grouped downloads and per-symbol history calls can disagree (one
+    tz-naive, the other exchange-local), and panels built from a mix fail
+    to join. Naive indexes are localized to, and other aware ones
+    converted to, the timezone of the first tz-aware frame.
+    """
+    tz = next((frame.index.tz for frame in frames.values()
+               if isinstance(frame.index, pd.DatetimeIndex) and frame.index.tz is not None), None)
+    if tz is None:
+        return frames
+
+    aligned = {}
+    for symbol, frame in frames.items():
+        if isinstance(frame.index, pd.DatetimeIndex):
+            if frame.index.tz is None:
+                frame = frame.tz_localize(tz)
+            elif str(frame.index.tz) != str(tz):
+                frame = frame.tz_convert(tz)
+        aligned[symbol] = frame
+    return aligned
+
+
+class DataProvider:
+    """Interface StockDataFetcher delegates every upstream request to"""
+
+    name = "base"
+
+    def history(self, symbol, period=None, interval="1d", start=None):
+        """OHLCV bars for one symbol, by `period` or from `start`"""
+        raise NotImplementedError
+
+    def download(self, symbols, period=None, interval="1d", start=None):
+        """Bars for many symbols in one request, as a dict of symbol -> DataFrame"""
+        stocks_data = {}
+        for symbol in symbols:
+            data = self.history(symbol, period=period, interval=interval, start=start)
+            if data is not None and not data.empty:
+                stocks_data[symbol] = data
+        return stocks_data
+
+    def info(self, symbol):
+        """Company/instrument metadata dict"""
+        raise NotImplementedError
+
+
+class YFinanceProvider(DataProvider):
+    """Live Yahoo Finance data via yfinance"""
+
+    name = "yfinance"
+
+    def history(self, symbol, period=None, interval="1d", start=None):
+        ticker = yf.Ticker(symbol)
+        if start is not None:
+            return ticker.history(start=start, interval=interval)
+        return ticker.history(period=period, interval=interval)
+
+    def download(self, symbols, period=None, interval="1d", start=None):
+        raw = yf.download(
+            symbols,
+            period=period,
+            start=start,
+            interval=interval,
+            group_by="ticker",
+            auto_adjust=True,
+            actions=True,
+            # Exchange-local timestamps, like Ticker.history
+            ignore_tz=False,
+            threads=True,
+            progress=False
+        )
+
+        if raw is None or raw.empty:
+            return {}
+
+        stocks_data = {}
+
+        if isinstance(raw.columns, pd.MultiIndex):
+            available = raw.columns.get_level_values(0)
+            for symbol in symbols:
+                if symbol not in available:
+                    continue
+                data = raw[symbol].dropna(how='all')
+                if not data.empty:
+                    stocks_data[symbol] = data
+        elif len(symbols) == 1:
+            data = raw.dropna(how='all')
+            if not data.empty:
+                stocks_data[symbols[0]] = data
+
+        return stocks_data
+
+    def info(self, symbol):
+        return yf.Ticker(symbol).info
+
+
+class ReplayProvider(DataProvider):
+    """Record/replay provider for offline, reproducible performance runs
+
+    In "record" mode every response from the wrapped provider is saved under
+    `root`. In "replay" mode responses are served from those files only,
+    after a seeded synthetic latency, so the same run always sees the same
+    data and timings without any network access.
+    """
+
+    name = "replay"
+
+    def __init__(self, root="replay_data", mode="replay", inner=None, latency=0.0, jitter=0.0, seed=42):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown replay mode: {mode}")
+
+        self.root = root
+        self.mode = mode
+        self.inner = inner if inner is not None else (YFinanceProvider() if mode == "record" else None)
+        self.latency = latency  # Seconds added to every replayed request
+        self.jitter = jitter  # Extra uniform [0, jitter) seconds
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._loaded = {}  # path -> recording, so replays don't re-read files
+        os.makedirs(root, exist_ok=True)
+
+    def history(self, symbol, period=None, interval="1d", start=None):
+        if self.mode == "record":
+            data = self.inner.history(symbol, period=period, interval=interval, start=start)
+            self._save(self._history_path(symbol, interval, period, start), data)
+            return data
+
+        self._sleep()
+        return self._replay_history(symbol, period, interval, start)
+
+    def download(self, symbols, period=None, interval="1d", start=None):
+        if self.mode == "record":
+            stocks_data = self.inner.download(symbols, period=period, interval=interval, start=start)
+            for symbol, data in stocks_data.items():
+                self._save(self._history_path(symbol, interval, period, start), data)
+            return stocks_data
+
+        # One grouped request costs one latency, like the live provider
+        self._sleep()
+        stocks_data = {}
+        for symbol in symbols:
+            try:
+                data = self._replay_history(symbol, period, interval, start)
+            except LookupError:
+                continue
+            if data is not None and not data.empty:
+                stocks_data[symbol] = data
+        return stocks_data
+
+    def info(self, symbol):
+        path = os.path.join(self.root, f"info__{self._safe(symbol)}.pkl")
+        if self.mode == "record":
+            info = self.inner.info(symbol)
+            self._save(path, info)
+            return info
+
+        self._sleep()
+        if not os.path.exists(path):
+            raise LookupError(f"No recorded info for {symbol}")
+        return self._read(path)
+
+    def _replay_history(self, symbol, period, interval, start):
+        exact = self._history_path(symbol, interval, period, start)
+        if os.path.exists(exact):
+            return self._read(exact)
+
+        # Otherwise derive the answer from the widest recording we hold
+        pattern = os.path.join(self.root, f"history__{self._safe(symbol)}__{interval}__*.pkl")
+        recordings = [self._read(path) for path in glob.glob(pattern)]
+        recordings = [data for data in recordings if data is not None and not data.empty]
+        if not recordings:
+            raise LookupError(f"No recorded {interval} history for {symbol}")
+
+        widest = max(recordings, key=len)
+        if start is not None:
+            return widest.iloc[widest.index.searchsorted(pd.Timestamp(start)):]
+        return slice_period(widest, period, end=widest.index[-1])
+
+    def _history_path(self, symbol, interval, period, start):
+        if start is not None:
+            request = "start-" + hashlib.md5(str(pd.Timestamp(start)).encode()).hexdigest()[:12]
+        else:
+            request = period or "default"
+        return os.path.join(self.root, f"history__{self._safe(symbol)}__{interval}__{request}.pkl")
+
+    def _read(self, path):
+        if path not in self._loaded:
+            self._loaded[path] = pd.read_pickle(path)
+        return self._loaded[path]
+
+    def _save(self, path, obj):
+        if obj is None:
+            return
+        tmp_path = f"{path}.tmp"
+        pd.to_pickle(obj, tmp_path)
+        os.replace(tmp_path, path)
+
+    def _sleep(self):
+        with self._lock:
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _safe(self, symbol):
+        return re.sub(r"[^A-Za-z0-9_.\-]", "_", symbol)
+
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def get_provider():
+    """Process-wide provider chosen by environment variables
+
+    STOCK_DATA_PROVIDER: "yfinance" (default), "record" or "replay"
+    STOCK_REPLAY_DIR: recording directory (default "replay_data")
+    STOCK_REPLAY_LATENCY_MS / STOCK_REPLAY_JITTER_MS: synthetic latency
+    """
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            name = os.environ.get("STOCK_DATA_PROVIDER", "yfinance").lower()
+            if name in ("record", "replay"):
+                _provider = ReplayProvider(
+                    root=os.environ.get("STOCK_REPLAY_DIR", "replay_data"),
+                    mode=name,
+                    latency=float(os.environ.get("STOCK_REPLAY_LATENCY_MS", "0")) / 1000,
+                    jitter=float(os.environ.get("STOCK_REPLAY_JITTER_MS", "0")) / 1000
+                )
+            else:
+                _provider = YFinanceProvider()
+        return _provider
@@ -0,0 +1,247 @@
+import time
+import numpy as np
+import pandas as pd
+
+try:
+    from scipy.signal import lfilter
+    LFILTER_AVAILABLE = True
+except ImportError:
+    LFILTER_AVAILABLE = False
+
+# Indicators produced by compute_panel_indicators, named like calculate_technical_indicators
+PANEL_INDICATORS = [
+    'SMA_20', 'SMA_50', 'EMA_12', 'EMA_26',
+    'RSI',
+    'MACD', 'MACD_signal', 'MACD_histogram',
+    'BB_upper', 'BB_lower',
+    'Volume_SMA'
+]
+
+# Vectorized indicator kernels over (time x symbols) arrays.
+#
+# Every column is an independent series. Rolling windows that contain a NaN
+# are NaN (pandas rolling semantics), so leading NaNs before a symbol's first
+# bar simply delay its warm-up; EMAs follow pandas ewm(adjust=True,
+# ignore_na=False). On a column without NaNs the results match the
+# per-Series pandas indicators.
+
+
+def _as_array(values):
+    values = np.asarray(values, dtype=np.float64)
+    return values.reshape(-1, 1) if values.ndim == 1 else values
+
+
+def rolling_mean(values, window):
+    """Rolling mean per column, NaN until `window` valid values are in the window"""
+    values = _as_array(values)
+    return _rolling_sums(values, window)[0] / window
+
+
+def rolling_std(values, window):
+    """Rolling sample standard deviation per column"""
+    values = _as_array(values)
+    total, total_sq = _rolling_sums(values, window, squares=True)
+    variance = (total_sq - total * total / window) / (window - 1)
+    return np.sqrt(np.maximum(variance, 0.0))
+
+
+def _rolling_sums(values, window, squares=False):
+    """Windowed sums via cumulative sums, with NaN-containing windows masked"""
+    rows, cols = values.shape
+    valid = ~np.isnan(values)
+
+    # Centre each column first so the cumulative sums stay small and exact
+    with np.errstate(invalid='ignore'):
+        offset = np.nanmean(values, axis=0) if rows else np.zeros(cols)
+    offset = np.where(np.isnan(offset), 0.0, offset)
+    centred = np.where(valid, values - offset, 0.0)
+
+    def windowed(array):
+        cumulative = np.vstack([np.zeros((1, cols)), np.cumsum(array, axis=0)])
+        out = np.full((rows, cols), np.nan)
+        if rows >= window:
+            out[window - 1:] = cumulative[window:] - cumulative[:-window]
+        return out
+
+    missing = windowed((~valid).astype(np.float64))
+    full = missing == 0
+
+    total = windowed(centred)
+    if not squares:
+        sums = np.where(full, total + offset * window, np.nan)
+        return (sums,)
+
+    total_sq = windowed(centred * centred)
+    return np.where(full, total, np.nan), np.where(full, total_sq, np.nan)
+
+
+def ema(values, span):
+    """Exponential moving average per column, like Series.ewm(span=span).mean()
+
+    With adjust=True and ignore_na=False the EMA is the ratio of two
+    decayed sums, sum(decay^k * x) / sum(decay^k * observed), where missing
+    values contribute to neither. Both sums are one linear recurrence.
+    """
+    values = _as_array(values)
+    decay = 1 - 2 / (span + 1)
+    observed = ~np.isnan(values)
+    numerator = _decayed_sum(np.where(observed, values, 0.0), decay)
+    denominator = _decayed_sum(observed.astype(np.float64), decay)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator > 0, numerator / denominator, np.nan)
+
+
+def _decayed_sum(values, decay):
+    """y[t] = x[t] + decay * y[t-1] down each column"""
+    if LFILTER_AVAILABLE:
+        return lfilter([1.0], [1.0, -decay], values, axis=0)
+
+    out = np.empty_like(values)
+    carry = np.zeros(values.shape[1])
+    for i in range(len(values)):
+        carry = values[i] + decay * carry
+        out[i] = carry
+    return out
+
+
+def rsi(values, period=14):
+    """RSI per column from the simple rolling mean of gains and losses"""
+    values = _as_array(values)
+    delta = np.full(values.shape, np.nan)
+    delta[1:] = values[1:] - values[:-1]
+
+    # A symbol's first bar has no change, like diff() filled with 0
+    first_bar = ~np.isnan(values)
+    first_bar[1:] &= np.isnan(values[:-1])
+    delta[first_bar] = 0.0
+
+    gain = rolling_mean(np.where(delta > 0, delta, np.where(np.isnan(delta), np.nan, 0.0)), period)
+    loss = rolling_mean(np.where(delta < 0, -delta, np.where(np.isnan(delta), np.nan, 0.0)), period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 100 - (100 / (1 + gain / loss))
+
+
+def macd(values, fast=12, slow=26, signal=9):
+    """(MACD, signal, histogram) per column"""
+    line = ema(values, fast) - ema(values, slow)
+    signal_line = ema(line, signal)
+    return line, signal_line, line - signal_line
+
+
+def bollinger(values, window=20, k=2):
+    """(upper, lower) Bollinger Bands per column"""
+    mean = rolling_mean(values, window)
+    std = rolling_std(values, window)
+    return mean + (std * k), mean - (std * k)
+
+
+def compute_panel_indicators(close, volume=None):
+    """All dashboard indicators for every column of a (date x symbol) close panel
+
+    Returns {name: DataFrame} aligned with `close` when it is a DataFrame,
+    otherwise {name: ndarray}. Volume_SMA is included when a volume panel
+    with the same shape is given.
+    """
+    values = _as_array(close)
+    fast = ema(values, 12)
+    slow = ema(values, 26)
+    line = fast - slow
+    signal_line = ema(line, 9)
+    mean_20 = rolling_mean(values, 20)
+    std_20 = rolling_std(values, 20)
+
+    indicators = {
+        'SMA_20': mean_20,
+        'SMA_50': rolling_mean(values, 50),
+        'EMA_12': fast,
+        'EMA_26': slow,
+        'RSI': rsi(values, 14),
+        'MACD': line,
+        'MACD_signal': signal_line,
+        'MACD_histogram': line - signal_line,
+        'BB_upper': mean_20 + (std_20 * 2),
+        'BB_lower': mean_20 - (std_20 * 2)
+    }
+    if volume is not None:
+        indicators['Volume_SMA'] = rolling_mean(volume, 20)
+
+    if isinstance(close, pd.DataFrame):
+        return {
+            name: pd.DataFrame(array, index=close.index, columns=close.columns)
+            for name, array in indicators.items()
+        }
+    return indicators
+
+
+def benchmark(n_symbols=500, n_bars=252, repeat=3, seed=0):
+    """Compare kernel throughput with the per-Series pandas path
+
+    Runs both on a synthetic random-walk panel and returns a dict with the
+    best timings, symbols per second and the largest relative difference.
+    """
+    from utils.indicators import IndicatorEngine
+    from utils.shared_cache import SharedCache
+
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=n_bars)
+    columns = [f"SYM{i}.NS" for i in range(n_symbols)]
+    close = pd.DataFrame(
+        100 * np.exp(np.cumsum(rng.normal(0, 0.02, (n_bars, n_symbols)), axis=0)),
+        index=index, columns=columns
+    )
+    volume = pd.DataFrame(rng.integers(10_000, 1_000_000, (n_bars, n_symbols)).astype(np.float64),
+                          index=index, columns=columns)
+
+    # Unnamed frames are never memoized, so every pass really recomputes
+    engine = IndicatorEngine(cache=SharedCache())
+
+    def per_series():
+        return {
+            symbol: engine.compute(pd.DataFrame({'Close': close[symbol], 'Volume': volume[symbol]}), PANEL_INDICATORS)
+            for symbol in columns
+        }
+
+    def timed(fn):
+        best, result = float("inf"), None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = fn()
+            best = min(best, time.perf_counter() - start)
+        return best, result
+
+    kernel_time, kernel_result = timed(lambda: compute_panel_indicators(close, volume))
+    series_time, series_result = timed(per_series)
+
+    max_error = 0.0
+    for name in PANEL_INDICATORS:
+        expected = pd.DataFrame({symbol: series_result[symbol][name] for symbol in columns}).to_numpy()
+        actual = kernel_result[name].to_numpy()
+        both = ~np.isnan(expected) & ~np.isnan(actual)
+        if (np.isnan(expected) != np.isnan(actual)).any():
+            max_error = float("inf")
+        elif both.any():
+            scale = np.maximum(1.0, np.abs(expected[both]))
+            max_error = max(max_error, float(np.max(np.abs(actual[both] - expected[both]) / scale)))
+
+    return {
+        'symbols': n_symbols,
+        'bars': n_bars,
+        'kernel_seconds': kernel_time,
+        'per_series_seconds': series_time,
+        'kernel_symbols_per_second': n_symbols / kernel_time,
+        'per_series_symbols_per_second': n_symbols / series_time,
+        'speedup': series_time / kernel_time,
+        'max_relative_error': max_error
+    }
+
+
+if __name__ == "__main__":
+    # python -m utils.indicator_kernels
+    for n_symbols in (100, 500, 2000):
+        result = benchmark(n_symbols=n_symbols)
+        print(
+            f"{result['symbols']:>5} symbols x {result['bars']} bars: "
+            f"kernels {result['kernel_seconds'] * 1000:.1f} ms, "
+            f"per-Series {result['per_series_seconds'] * 1000:.1f} ms "
+            f"({result['speedup']:.1f}x, max rel. error {result['max_relative_error']:.2e})"
+        )
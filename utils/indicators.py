@@ -0,0 +1,131 @@
+import re
+import threading
+from utils.shared_cache import get_shared_cache, data_fingerprint
+
+# Parameterised indicator names, e.g. SMA_20, EMA_12, RSI_14
+_PARAMETERISED = re.compile(r"^(SMA|EMA|STD|RSI|gain|loss|Volume_SMA)_(\d+)$")
+
+# Short names and the parameterised node they stand for
+ALIASES = {
+    "RSI": "RSI_14",
+    "Volume_SMA": "Volume_SMA_20",
+    "Volatility": "STD_20",
+}
+
+
+class IndicatorEngine:
+    """Computes technical indicators as a dependency graph with memoization
+
+    Each indicator is a node with named dependencies, so intermediates such
+    as the price diff, rolling means and rolling std are computed once per
+    frame no matter how many indicators use them. Results are memoized in
+    the shared cache per (symbol, interval, first bar, fingerprint), where
+    the fingerprint covers the last bar, the bar count and the Close/Volume
+    values, so the fetcher, the UI and the prediction model all read the
+    same Series objects while a still-forming bar that changes gets fresh
+    values. The first bar is part of the key because EMA and warm-up values
+    depend on where the frame starts. Returned Series are shared and must
+    not be modified in place.
+    """
+
+    def __init__(self, cache=None):
+        self.cache = cache if cache is not None else get_shared_cache()
+        self.computations = 0  # Node evaluations, for checking memo hits
+
+    def compute(self, data, names, symbol=None, interval=None):
+        """Return {name: Series} for the requested indicator names"""
+        computed = self._memo(data, symbol, interval)
+        before = len(computed)
+
+        for name in names:
+            self._resolve(name, data, computed)
+
+        if len(computed) != before:
+            self._store(data, symbol, interval, computed)
+
+        return {name: computed[name] for name in names}
+
+    def _resolve(self, name, data, computed):
+        if name in computed:
+            return computed[name]
+
+        deps, fn = self._node(name)
+        inputs = [self._resolve(dep, data, computed) for dep in deps]
+        self.computations += 1
+        computed[name] = fn(data, *inputs)
+        return computed[name]
+
+    def _node(self, name):
+        """(dependencies, function) for an indicator name"""
+        if name in ALIASES:
+            return [ALIASES[name]], lambda data, value: value
+
+        match = _PARAMETERISED.match(name)
+        if match:
+            kind, window = match.group(1), int(match.group(2))
+            if kind == "SMA":
+                return [], lambda data: data['Close'].rolling(window=window).mean()
+            if kind == "EMA":
+                return [], lambda data: data['Close'].ewm(span=window).mean()
+            if kind == "STD":
+                return [], lambda data: data['Close'].rolling(window=window).std()
+            if kind == "Volume_SMA":
+                return [], lambda data: data['Volume'].rolling(window=window).mean()
+            if kind == "gain":
+                return ["diff"], lambda data, delta: (delta.where(delta > 0, 0)).rolling(window=window).mean()
+            if kind == "loss":
+                return ["diff"], lambda data, delta: (-delta.where(delta < 0, 0)).rolling(window=window).mean()
+            if kind == "RSI":
+                return [f"gain_{window}", f"loss_{window}"], lambda data, gain, loss: 100 - (100 / (1 + gain / loss))
+
+        if name == "diff":
+            return [], lambda data: data['Close'].diff()
+        if name == "MACD":
+            return ["EMA_12", "EMA_26"], lambda data, fast, slow: fast - slow
+        if name == "MACD_signal":
+            return ["MACD"], lambda data, macd: macd.ewm(span=9).mean()
+        if name == "MACD_histogram":
+            return ["MACD", "MACD_signal"], lambda data, macd, signal: macd - signal
+        if name == "BB_upper":
+            return ["SMA_20", "STD_20"], lambda data, sma, std: sma + (std * 2)
+        if name == "BB_lower":
+            return ["SMA_20", "STD_20"], lambda data, sma, std: sma - (std * 2)
+        if name == "BB_width":
+            return ["BB_upper", "BB_lower"], lambda data, upper, lower: upper - lower
+        if name == "BB_position":
+            return ["BB_lower", "BB_width"], lambda data, lower, width: (data['Close'] - lower) / width
+
+        raise KeyError(f"Unknown indicator: {name}")
+
+    def _memo_key(self, data, symbol, interval):
+        symbol = symbol or data.attrs.get('symbol')
+        if symbol is None or data.empty:
+            return None
+        interval = interval or data.attrs.get('interval', "1d")
+        columns = [column for column in ('Close', 'Volume') if column in data.columns]
+        return ("indicators", symbol, interval, data.index[0], data_fingerprint(data.index, data[columns].to_numpy()))
+
+    def _memo(self, data, symbol, interval):
+        key = self._memo_key(data, symbol, interval)
+        if key is None:
+            return {}
+        computed = self.cache.get(key)
+        return dict(computed) if computed is not None else {}
+
+    def _store(self, data, symbol, interval, computed):
+        key = self._memo_key(data, symbol, interval)
+        if key is not None:
+            self.cache.set(key, computed)
+
+
+_indicator_engine = None
+_indicator_engine_lock = threading.Lock()
+
+
+def get_indicator_engine():
+    """Process-wide IndicatorEngine instance"""
+    global _indicator_engine
+    with _indicator_engine_lock:
+        if _indicator_engine is None:
+            _indicator_engine = IndicatorEngine()
+        return _indicator_engine
@@ -0,0 +1,135 @@
+import time
+import threading
+import pandas as pd
+from utils.market_calendar import NSE_CALENDAR
+
+
+class IntradayBuffer:
+    """In-memory buffer of the current session's minute bars per symbol
+
+    The first refresh of a symbol loads the whole session; after that only
+    bars from the last held timestamp onwards are requested, and the last
+    (still forming) bar is replaced by its newer version.
+    """
+
+    def __init__(self, calendar=None, min_refresh=15):
+        self.calendar = calendar if calendar is not None else NSE_CALENDAR
+        self.min_refresh = min_refresh  # Seconds between upstream polls per symbol
+        self._bars = {}
+        self._last_refresh = {}
+        self._lock = threading.Lock()
+        self._symbol_locks = {}
+        self.bars_fetched = 0
+
+    def refresh(self, symbol, fetch_bars):
+        """Bring a symbol's bars up to date
+
+        `fetch_bars(symbol, start)` must return minute bars from `start`
+        onwards, or the whole latest session when `start` is None.
+        """
+        with self._symbol_lock(symbol):
+            if not self._needs_refresh(symbol):
+                return self._bars.get(symbol)
+
+            start = self._tail_start(symbol)
+            new_bars = fetch_bars(symbol, start)
+            return self._merge(symbol, new_bars)
+
+    def refresh_many(self, symbols, fetch_many):
+        """Bring several symbols up to date with one grouped request
+
+        `fetch_many(symbols, start)` must return a dict of symbol -> bars
+        covering everything from `start` (None for the whole session).
+        """
+        due = [symbol for symbol in dict.fromkeys(symbols) if self._needs_refresh(symbol)]
+        if not due:
+            return
+
+        # One request from the oldest tail covers every due symbol
+        starts = [self._tail_start(symbol) for symbol in due]
+        start = None if any(s is None for s in starts) else min(starts)
+
+        fetched = fetch_many(due, start)
+        for symbol in due:
+            with self._symbol_lock(symbol):
+                self._merge(symbol, fetched.get(symbol))
+
+    def get_bars(self, symbol):
+        """Minute bars held for a symbol's latest session, or None"""
+        return self._bars.get(symbol)
+
+    def latest_quote(self, symbol):
+        """Last traded price and bar time from the buffer, without fetching"""
+        bars = self._bars.get(symbol)
+        if bars is None or bars.empty:
+            return None
+
+        return {
+            'price': bars['Close'].iloc[-1],
+            'time': bars.index[-1],
+            'open': bars['Open'].iloc[0],
+            'high': bars['High'].max(),
+            'low': bars['Low'].min(),
+            'volume': bars['Volume'].sum()
+        }
+
+    def _needs_refresh(self, symbol):
+        last = self._last_refresh.get(symbol)
+        if last is None or symbol not in self._bars:
+            return True
+        if time.time() - last < self.min_refresh:
+            return False
+        return self.calendar.has_new_data_since(last)
+
+    def _tail_start(self, symbol):
+        bars = self._bars.get(symbol)
+        if bars is None or bars.empty:
+            return None
+        return bars.index[-1]
+
+    def _merge(self, symbol, new_bars):
+        self._last_refresh[symbol] = time.time()
+        held = self._bars.get(symbol)
+
+        if new_bars is None or new_bars.empty:
+            return held
+
+        with self._lock:
+            self.bars_fetched += len(new_bars)
+
+        if held is None or held.empty:
+            merged = new_bars
+        else:
+            # Newer bars overwrite the held tail from their first timestamp on
+            new_bars = new_bars[new_bars.index >= held.index[-1]]
+            if new_bars.empty:
+                merged = held
+            else:
+                keep = held.iloc[:held.index.searchsorted(new_bars.index[0])]
+                merged = pd.concat([keep, new_bars])
+
+        # Keep only the most recent session
+        session_start = merged.index[-1].normalize()
+        merged = merged.iloc[merged.index.searchsorted(session_start):]
+
+        self._bars[symbol] = merged
+        return merged
+
+    def _symbol_lock(self, symbol):
+        with self._lock:
+            if symbol not in self._symbol_locks:
+                self._symbol_locks[symbol] = threading.Lock()
+            return self._symbol_locks[symbol]
+
+
+_intraday_buffer = None
+_intraday_buffer_lock = threading.Lock()
+
+
+def get_intraday_buffer():
+    """Process-wide IntradayBuffer instance"""
+    global _intraday_buffer
+    with _intraday_buffer_lock:
+        if _intraday_buffer is None:
+            _intraday_buffer = IntradayBuffer()
+        return _intraday_buffer
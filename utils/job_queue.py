@@ -0,0 +1,220 @@
+import time
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# Spawned workers avoid forking Streamlit's threads
+_SPAWN = multiprocessing.get_context("spawn")
+
+# Set in a worker process while a job runs, read by report_progress
+_current_progress = None
+_current_key = None
+
+
+def spawn_pool(workers, initializer=None, initargs=()):
+    """Process pool whose workers are spawned rather than forked"""
+    return ProcessPoolExecutor(max_workers=workers, mp_context=_SPAWN,
+                               initializer=initializer, initargs=initargs)
+
+
+def report_progress(fraction, message=""):
+    """Report progress of the running job; a no-op outside a job"""
+    if _current_progress is not None:
+        try:
+            _current_progress[_current_key] = (float(fraction), message)
+        except Exception:
+            # Progress is best effort; a closed manager must not fail the job
+            pass
+
+
+def _run_job(key, progress, fn, args, kwargs):
+    global _current_progress, _current_key
+    _current_progress, _current_key = progress, key
+    try:
+        report_progress(0.0, "Started")
+        return fn(*args, **kwargs)
+    finally:
+        _current_progress, _current_key = None, None
+
+
+class Job:
+    """One submitted job and, once finished, its result or error"""
+
+    def __init__(self, key, group):
+        self.key = key
+        self.group = group
+        self.status = QUEUED
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.finished_at = None
+        self.future = None
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED)
+
+
+class JobQueue:
+    """Background jobs on a process pool, shared by every session
+
+    Jobs are identified by a key; submitting a key that is queued, running
+    or already done returns the existing job instead of starting another,
+    so sessions asking for the same forecast share one run. Jobs may call
+    report_progress(); progress goes through a multiprocessing manager.
+    The latest successful result per group (e.g. one symbol's forecast,
+    whatever the data) is kept so callers can show it while a newer job
+    runs.
+    """
+
+    def __init__(self, max_workers=None, history=64):
+        self.max_workers = max_workers or min(2, multiprocessing.cpu_count())
+        self.history = history
+        self._jobs = OrderedDict()
+        self._latest = {}
+        self._executor = None
+        self._manager = None
+        self._progress = None
+        self._lock = threading.Lock()
+
+    def _ensure_pool(self):
+        # Caller holds the lock
+        if self._executor is None:
+            if self._manager is None:
+                self._manager = _SPAWN.Manager()
+                self._progress = self._manager.dict()
+            self._executor = spawn_pool(self.max_workers)
+        return self._executor
+
+    def submit(self, key, fn, *args, group=None, **kwargs):
+        """Run fn(*args, **kwargs) in the pool unless job `key` already exists
+
+        `fn` must be importable (module level) and its arguments picklable.
+        Failed jobs are retried on the next submit.
+        """
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and job.status != FAILED:
+                self._jobs.move_to_end(key)
+                return job
+
+            job = Job(key, group)
+            try:
+                job.future = self._ensure_pool().submit(_run_job, key, self._progress, fn, args, kwargs)
+            except (BrokenProcessPool, RuntimeError):
+                # A worker died; start a fresh pool and try once more
+                self._executor = None
+                job.future = self._ensure_pool().submit(_run_job, key, self._progress, fn, args, kwargs)
+
+            self._jobs[key] = job
+            self._trim()
+
+        job.future.add_done_callback(lambda future, job=job: self._finish(job, future))
+        return job
+
+    def _finish(self, job, future):
+        try:
+            result = future.result()
+        except Exception as e:
+            with self._lock:
+                job.error = f"{type(e).__name__}: {e}"
+                job.status = FAILED
+                job.finished_at = time.time()
+                if isinstance(e, BrokenProcessPool):
+                    self._executor = None
+            return
+
+        with self._lock:
+            job.result = result
+            job.status = DONE
+            job.finished_at = time.time()
+            if job.group is not None:
+                self._latest[job.group] = (job.finished_at, result)
+
+    def _trim(self):
+        # Caller holds the lock; only finished jobs are dropped
+        finished = [key for key, job in self._jobs.items() if job.finished]
+        while len(self._jobs) > self.history and finished:
+            key = finished.pop(0)
+            self._jobs.pop(key, None)
+            if self._progress is not None:
+                self._progress.pop(key, None)
+
+    def get(self, key):
+        """The job for `key`, or None"""
+        with self._lock:
+            return self._jobs.get(key)
+
+    def latest(self, group):
+        """(finished_at, result) of the newest successful job in `group`, or None"""
+        with self._lock:
+            return self._latest.get(group)
+
+    def status(self, key):
+        """{'status', 'progress', 'message', 'error', 'elapsed'} for a job, or None"""
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None:
+                return None
+            if job.status == QUEUED and job.future is not None and job.future.running():
+                job.status = RUNNING
+
+        progress, message = 0.0, ""
+        if job.finished:
+            progress, message = 1.0, "Finished" if job.status == DONE else "Failed"
+        elif self._progress is not None:
+            try:
+                progress, message = self._progress.get(key, (0.0, "Waiting for a worker"))
+            except Exception:
+                pass
+
+        end = job.finished_at or time.time()
+        return {
+            'status': job.status,
+            'progress': progress,
+            'message': message,
+            'error': job.error,
+            'elapsed': end - job.submitted_at
+        }
+
+    def stats(self):
+        """Job counts by state"""
+        with self._lock:
+            counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+            for job in self._jobs.values():
+                state = RUNNING if job.status == QUEUED and job.future is not None and job.future.running() else job.status
+                counts[state] += 1
+            counts['workers'] = self.max_workers
+            return counts
+
+    def shutdown(self):
+        """Stop the pool and the progress manager"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+            if self._manager is not None:
+                self._manager.shutdown()
+                self._manager = None
+                self._progress = None
+
+
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    """Process-wide JobQueue shared by every session"""
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            _job_queue = JobQueue()
+        return _job_queue
@@ -0,0 +1,136 @@
+from datetime import date, datetime, time, timedelta
+import pandas as pd
+import pytz
+
+IST = pytz.timezone("Asia/Kolkata")
+
+# Regular NSE equity session
+MARKET_OPEN = time(9, 15)
+MARKET_CLOSE = time(15, 30)
+
+# Upstream bars keep settling for a while after the bell
+CLOSE_GRACE = timedelta(minutes=30)
+
+# NSE trading holidays (weekday closures only). Update yearly from the
+# exchange's holiday circular.
+NSE_HOLIDAYS = {
+    # 2024
+    date(2024, 1, 22), date(2024, 1, 26), date(2024, 3, 8), date(2024, 3, 25),
+    date(2024, 3, 29), date(2024, 4, 11), date(2024, 4, 17), date(2024, 5, 1),
+    date(2024, 5, 20), date(2024, 6, 17), date(2024, 7, 17), date(2024, 8, 15),
+    date(2024, 10, 2), date(2024, 11, 1), date(2024, 11, 15), date(2024, 11, 20),
+    date(2024, 12, 25),
+    # 2025
+    date(2025, 2, 26), date(2025, 3, 14), date(2025, 3, 31), date(2025, 4, 10),
+    date(2025, 4, 14), date(2025, 4, 18), date(2025, 5, 1), date(2025, 8, 15),
+    date(2025, 8, 27), date(2025, 10, 2), date(2025, 10, 21), date(2025, 10, 22),
+    date(2025, 11, 5), date(2025, 12, 25),
+    # 2026
+    date(2026, 1, 26), date(2026, 3, 3), date(2026, 3, 26), date(2026, 3, 31),
+    date(2026, 4, 3), date(2026, 4, 14), date(2026, 5, 1), date(2026, 5, 28),
+    date(2026, 6, 26), date(2026, 9, 14), date(2026, 10, 2), date(2026, 10, 20),
+    date(2026, 11, 10), date(2026, 11, 24), date(2026, 12, 25),
+}
+
+# Sessions outside the regular timetable: Muhurat trading and weekend
+# special sessions. These replace the regular session for that date.
+NSE_SPECIAL_SESSIONS = {
+    date(2024, 1, 20): [(time(9, 15), time(10, 0)), (time(11, 30), time(12, 30))],
+    date(2024, 3, 2): [(time(9, 15), time(10, 0)), (time(11, 30), time(12, 30))],
+    date(2024, 11, 1): [(time(18, 0), time(19, 0))],
+    date(2025, 2, 1): [(MARKET_OPEN, MARKET_CLOSE)],
+    date(2025, 10, 21): [(time(13, 45), time(14, 45))],
+}
+
+
+class NSECalendar:
+    """NSE session calendar used for cache expiry and trading-day indexes"""
+
+    def __init__(self, holidays=None, special_sessions=None):
+        self.holidays = set(NSE_HOLIDAYS if holidays is None else holidays)
+        self.special_sessions = dict(NSE_SPECIAL_SESSIONS if special_sessions is None else special_sessions)
+        self._business_day = pd.offsets.CustomBusinessDay(holidays=sorted(self.holidays))
+
+    def now(self):
+        """Current time in IST"""
+        return datetime.now(IST)
+
+    def sessions(self, day):
+        """List of (open, close) IST datetimes for a calendar date"""
+        if day in self.special_sessions:
+            hours = self.special_sessions[day]
+        elif day.weekday() < 5 and day not in self.holidays:
+            hours = [(MARKET_OPEN, MARKET_CLOSE)]
+        else:
+            return []
+
+        return [
+            (IST.localize(datetime.combine(day, start)), IST.localize(datetime.combine(day, end)))
+            for start, end in hours
+        ]
+
+    def is_trading_day(self, day):
+        """Whether the exchange holds any session on `day`"""
+        return bool(self.sessions(day))
+
+    def is_open(self, now=None):
+        """Whether a session is running (including the post-close grace window)"""
+        now = self._to_ist(now)
+        return any(start <= now < end + CLOSE_GRACE for start, end in self.sessions(now.date()))
+
+    def next_open(self, now=None):
+        """Start of the next session strictly after `now`"""
+        now = self._to_ist(now)
+        day = now.date()
+        for _ in range(30):
+            for start, _end in self.sessions(day):
+                if start > now:
+                    return start
+            day += timedelta(days=1)
+        # No known session within a month - check back tomorrow
+        return now + timedelta(days=1)
+
+    def last_close(self, now=None):
+        """End (plus grace) of the most recent session finished before `now`"""
+        now = self._to_ist(now)
+        day = now.date()
+        for _ in range(30):
+            for _start, end in reversed(self.sessions(day)):
+                if end + CLOSE_GRACE <= now:
+                    return end + CLOSE_GRACE
+            day -= timedelta(days=1)
+        return now - timedelta(days=30)
+
+    def cache_ttl(self, open_ttl=300, now=None):
+        """Seconds a quote fetched at `now` stays valid
+
+        Short while the market is trading; otherwise valid until the next
+        session opens.
+        """
+        now = self._to_ist(now)
+        if self.is_open(now):
+            return open_ttl
+        return max(open_ttl, (self.next_open(now) - now).total_seconds())
+
+    def has_new_data_since(self, timestamp, now=None):
+        """Whether upstream bars can have changed since the epoch `timestamp`"""
+        now = self._to_ist(now)
+        if self.is_open(now):
+            return True
+        return self.last_close(now).timestamp() > timestamp
+
+    def trading_days(self, after, periods):
+        """The next `periods` NSE trading dates strictly after `after`"""
+        start = pd.Timestamp(after).normalize() + pd.Timedelta(days=1)
+        return pd.date_range(start=start, periods=periods, freq=self._business_day)
+
+    def _to_ist(self, now):
+        if now is None:
+            return self.now()
+        now = pd.Timestamp(now)
+        if now.tzinfo is None:
+            return IST.localize(now.to_pydatetime())
+        return now.tz_convert(IST).to_pydatetime()
+
+
+NSE_CALENDAR = NSECalendar()
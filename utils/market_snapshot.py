@@ -0,0 +1,236 @@
+import os
+import time
+import threading
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+
+# Popular large caps used when no NSE equity list is available locally
+DEFAULT_UNIVERSE = [
+    "RELIANCE.NS", "TCS.NS", "HDFCBANK.NS", "INFY.NS", "ICICIBANK.NS",
+    "SBIN.NS", "BHARTIARTL.NS", "ITC.NS", "KOTAKBANK.NS", "HINDUNILVR.NS",
+    "LT.NS", "AXISBANK.NS", "MARUTI.NS", "ASIANPAINT.NS", "WIPRO.NS"
+]
+
+# Current NIFTY 50 constituents (membership changes over time)
+NIFTY_50 = [
+    "ADANIENT.NS", "ADANIPORTS.NS", "APOLLOHOSP.NS", "ASIANPAINT.NS", "AXISBANK.NS",
+    "BAJAJ-AUTO.NS", "BAJFINANCE.NS", "BAJAJFINSV.NS", "BEL.NS", "BPCL.NS",
+    "BHARTIARTL.NS", "BRITANNIA.NS", "CIPLA.NS", "COALINDIA.NS", "DRREDDY.NS",
+    "EICHERMOT.NS", "GRASIM.NS", "HCLTECH.NS", "HDFCBANK.NS", "HDFCLIFE.NS",
+    "HEROMOTOCO.NS", "HINDALCO.NS", "HINDUNILVR.NS", "ICICIBANK.NS", "ITC.NS",
+    "INDUSINDBK.NS", "INFY.NS", "JSWSTEEL.NS", "KOTAKBANK.NS", "LT.NS",
+    "M&M.NS", "MARUTI.NS", "NTPC.NS", "NESTLEIND.NS", "ONGC.NS",
+    "POWERGRID.NS", "RELIANCE.NS", "SBILIFE.NS", "SHRIRAMFIN.NS", "SBIN.NS",
+    "SUNPHARMA.NS", "TCS.NS", "TATACONSUM.NS", "TATAMOTORS.NS", "TATASTEEL.NS",
+    "TECHM.NS", "TITAN.NS", "TRENT.NS", "ULTRACEMCO.NS", "WIPRO.NS"
+]
+
+
+def load_nse_universe(path=None):
+    """All NSE equity symbols (with the .NS suffix)
+
+    Reads the exchange's EQUITY_L.csv (SYMBOL / SERIES columns) from `path`,
+    the NSE_EQUITY_LIST environment variable or data/EQUITY_L.csv, keeping
+    the EQ series. Falls back to DEFAULT_UNIVERSE when no list is found.
+    """
+    path = path or os.environ.get("NSE_EQUITY_LIST", os.path.join("data", "EQUITY_L.csv"))
+    if not os.path.exists(path):
+        return list(DEFAULT_UNIVERSE)
+
+    return list(_read_equity_list(path, os.path.getmtime(path)))
+
+
+@lru_cache(maxsize=4)
+def _read_equity_list(path, mtime):
+    try:
+        equities = pd.read_csv(path)
+        equities.columns = [column.strip().upper() for column in equities.columns]
+        if "SERIES" in equities.columns:
+            equities = equities[equities["SERIES"].str.strip() == "EQ"]
+        return tuple(f"{symbol.strip()}.NS" for symbol in equities["SYMBOL"])
+    except Exception as e:
+        print(f"Error reading NSE equity list {path}: {str(e)}")
+        return tuple(DEFAULT_UNIVERSE)
+
+
+def last_two_closes(panel):
+    """Last and previous valid close per column of a (date x symbol) panel"""
+    values = panel.to_numpy(dtype=np.float64)
+    rows, cols = values.shape
+    last = np.full(cols, np.nan)
+    prev = np.full(cols, np.nan)
+    if rows == 0:
+        return last, prev
+
+    valid = ~np.isnan(values)
+    columns = np.arange(cols)
+
+    last_pos = rows - 1 - np.argmax(valid[::-1], axis=0)
+    has_last = valid[last_pos, columns]
+    last[has_last] = values[last_pos, columns][has_last]
+
+    valid[last_pos, columns] = False
+    prev_pos = rows - 1 - np.argmax(valid[::-1], axis=0)
+    has_prev = valid[prev_pos, columns] & has_last
+    prev[has_prev] = values[prev_pos, columns][has_prev]
+
+    return last, prev
+
+
+class SymbolRegistry:
+    """Append-only symbol universe with a position and an expiry per symbol
+
+    Subclasses keep their per-symbol arrays in the same order and extend
+    them in _grow(), which add_symbols() calls under the lock.
+    """
+
+    def __init__(self, lock=None):
+        self.symbols = np.array([], dtype=object)
+        self.expires = np.array([], dtype=np.float64)  # Per-symbol expiry (epoch seconds)
+        self._positions = {}
+        self._lock = lock if lock is not None else threading.Lock()
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def add_symbols(self, symbols):
+        """Grow the universe; existing entries are kept"""
+        with self._lock:
+            new = [symbol for symbol in dict.fromkeys(symbols) if symbol not in self._positions]
+            if not new:
+                return
+
+            start = len(self.symbols)
+            self._positions.update({symbol: start + i for i, symbol in enumerate(new)})
+            self.symbols = np.concatenate([self.symbols, np.array(new, dtype=object)])
+            self.expires = np.concatenate([self.expires, np.zeros(len(new))])
+            self._grow(new)
+
+    def _grow(self, new):
+        pass
+
+    def positions(self, symbols):
+        """Array positions of `symbols` (-1 for unknown ones)"""
+        return np.array([self._positions.get(symbol, -1) for symbol in symbols], dtype=np.int64)
+
+    def stale_symbols(self, symbols=None, now=None):
+        """Symbols whose entries have expired (unknown symbols count as stale)"""
+        now = time.time() if now is None else now
+        if symbols is None:
+            with self._lock:
+                all_symbols, expires = self.symbols, self.expires
+            return list(all_symbols[expires <= now])
+        positions = self.positions(symbols)
+        known = positions >= 0
+        stale = np.ones(len(positions), dtype=bool)
+        stale[known] = self.expires[positions[known]] <= now
+        return [symbol for symbol, is_stale in zip(symbols, stale) if is_stale]
+
+    def touch(self, symbols, ttl):
+        """Push back expiry without changing the data (e.g. after a failed fetch)"""
+        self.add_symbols(symbols)
+        with self._lock:
+            self.expires[self.positions(symbols)] = time.time() + ttl
+
+
+class MarketSnapshot(SymbolRegistry):
+    """Cross-sectional last/previous close arrays for a whole symbol universe
+
+    Quotes live in flat NumPy arrays indexed by symbol position, so change %
+    and top/bottom-N over thousands of symbols are single vectorized passes.
+    Individual symbols can be refreshed without touching the rest.
+    """
+
+    def __init__(self, symbols=None):
+        self.last = np.array([], dtype=np.float64)
+        self.prev = np.array([], dtype=np.float64)
+        super().__init__()
+        if symbols:
+            self.add_symbols(symbols)
+
+    def _grow(self, new):
+        self.last = np.concatenate([self.last, np.full(len(new), np.nan)])
+        self.prev = np.concatenate([self.prev, np.full(len(new), np.nan)])
+
+    def update(self, symbols, last, prev=None, ttl=None):
+        """Write new quotes for `symbols`; prev=None keeps the stored previous close"""
+        self.add_symbols(symbols)
+        with self._lock:
+            positions = self.positions(symbols)
+            self.last[positions] = last
+            if prev is not None:
+                self.prev[positions] = prev
+            if ttl is not None:
+                self.expires[positions] = time.time() + ttl
+
+    def update_from_panel(self, panel, ttl=None):
+        """Refresh from a (date x symbol) close panel"""
+        if panel is None or panel.empty:
+            return
+        last, prev = last_two_closes(panel)
+        self.update(list(panel.columns), last, prev, ttl=ttl)
+
+    def apply_prices(self, prices):
+        """Apply live last prices (symbol -> price), e.g. from the intraday buffer"""
+        if not prices:
+            return
+        self.update(list(prices.keys()), np.fromiter(prices.values(), dtype=np.float64, count=len(prices)))
+
+    def change_pct(self):
+        """Percent change from previous close for every symbol (NaN if unknown)"""
+        # One consistent read; add_symbols swaps both arrays for longer ones
+        with self._lock:
+            last, prev = self.last, self.prev
+        with np.errstate(divide='ignore', invalid='ignore'):
+            change = (last - prev) / prev * 100
+        change[~np.isfinite(change)] = np.nan
+        return change
+
+    def top_movers(self, n=5, symbols=None):
+        """Top-n gainers and losers as lists of dicts, each sorted by descending change
+
+        Uses argpartition, so only the 2n selected entries are ever sorted.
+        """
+        change = self.change_pct()
+        candidates = np.flatnonzero(~np.isnan(change))
+        if symbols is not None:
+            positions = self.positions(symbols)
+            candidates = np.intersect1d(candidates, positions[positions >= 0])
+
+        if len(candidates) == 0:
+            return [], []
+
+        k = min(n, len(candidates))
+        values = change[candidates]
+
+        top = candidates[np.argpartition(-values, k - 1)[:k]]
+        top = top[np.argsort(-change[top])]
+        bottom = candidates[np.argpartition(values, k - 1)[:k]]
+        bottom = bottom[np.argsort(-change[bottom])]
+
+        return self._rows(top, change), self._rows(bottom, change)
+
+    def _rows(self, positions, change):
+        return [
+            {
+                'symbol': self.symbols[i],
+                'name': self.symbols[i].replace('.NS', ''),
+                'current_price': self.last[i],
+                'change_pct': change[i]
+            }
+            for i in positions
+        ]
+
+
+_market_snapshot = None
+_market_snapshot_lock = threading.Lock()
+
+
+def get_market_snapshot():
+    """Process-wide MarketSnapshot instance"""
+    global _market_snapshot
+    with _market_snapshot_lock:
+        if _market_snapshot is None:
+            _market_snapshot = MarketSnapshot()
+        return _market_snapshot
@@ -0,0 +1,150 @@
+import sys
+import json
+import importlib.util
+import subprocess
+import threading
+import numpy as np
+
+# Model backends by name. Each entry is a factory plus the top-level modules
+# it needs; nothing is imported until the factory is first called, so
+# importing this module (or prediction_model) never loads sklearn or
+# TensorFlow.
+MODEL_BACKENDS = {}
+
+_backends_lock = threading.Lock()
+
+
+def register_backend(name, factory, requires=()):
+    """Register `factory(**params)` as model backend `name`
+
+    `requires` lists the modules the factory imports, so availability can
+    be checked without importing them.
+    """
+    with _backends_lock:
+        MODEL_BACKENDS[name] = {'factory': factory, 'requires': tuple(requires)}
+
+
+def backend_available(name):
+    """Whether a backend is registered and its frameworks are installed"""
+    backend = MODEL_BACKENDS.get(name)
+    if backend is None:
+        return False
+    return all(importlib.util.find_spec(module) is not None for module in backend['requires'])
+
+
+def available_backends():
+    """Names of the registered backends whose frameworks are installed"""
+    return [name for name in MODEL_BACKENDS if backend_available(name)]
+
+
+def create_model(name, **params):
+    """Build a new, unfitted model from a registered backend"""
+    backend = MODEL_BACKENDS.get(name)
+    if backend is None:
+        raise ValueError(f"Unknown model backend: {name}")
+    if not backend_available(name):
+        raise ImportError(f"Model backend '{name}' needs {', '.join(backend['requires'])}, which is not installed")
+    return backend['factory'](**params)
+
+
+def _random_forest(**params):
+    from sklearn.ensemble import RandomForestRegressor
+    return RandomForestRegressor(**params)
+
+
+def _linear(**params):
+    from sklearn.linear_model import LinearRegression
+    return LinearRegression(**params)
+
+
+def _min_max_scaler(**params):
+    from sklearn.preprocessing import MinMaxScaler
+    return MinMaxScaler(**params)
+
+
+class LastCloseRegressor:
+    """Naive baseline: tomorrow's close is today's close"""
+
+    def __init__(self, close_column=0):
+        self.close_column = close_column
+
+    def fit(self, X, y=None):
+        return self
+
+    def predict(self, X):
+        return np.asarray(X, dtype=np.float64)[:, self.close_column]
+
+
+def _last_close(**params):
+    return LastCloseRegressor(**params)
+
+
+def _lstm(input_shape, units=50, dropout=0.2):
+    """Stacked three-layer LSTM regressor, compiled with Adam/MSE"""
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.layers import LSTM, Dense, Dropout
+
+    model = Sequential([
+        LSTM(units, return_sequences=True, input_shape=input_shape),
+        Dropout(dropout),
+        LSTM(units, return_sequences=True),
+        Dropout(dropout),
+        LSTM(units),
+        Dropout(dropout),
+        Dense(25),
+        Dense(1)
+    ])
+
+    model.compile(optimizer='adam', loss='mean_squared_error')
+    return model
+
+
+register_backend("random_forest", _random_forest, requires=("sklearn",))
+register_backend("linear", _linear, requires=("sklearn",))
+register_backend("min_max_scaler", _min_max_scaler, requires=("sklearn",))
+register_backend("lstm", _lstm, requires=("tensorflow",))
+register_backend("last_close", _last_close)
+
+
+_FOOTPRINT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+for module in sys.argv[1:]:
+    __import__(module)
+seconds = time.perf_counter() - start
+rss_kb = 0
+with open('/proc/self/status') as f:
+    for line in f:
+        if line.startswith('VmRSS:'):
+            rss_kb = int(line.split()[1])
+print(json.dumps({'seconds': seconds, 'rss_mb': rss_kb / 1024, 'loaded': sorted(m for m in ('sklearn', 'tensorflow') if m in sys.modules)}))
+"""
+
+
+def import_footprint(*modules):
+    """Import time and resident memory of importing `modules` in a fresh interpreter
+
+    Returns {'seconds', 'rss_mb', 'loaded'} where `loaded` lists which of
+    sklearn/TensorFlow ended up imported. RSS is read from /proc (Linux).
+    """
+    output = subprocess.run(
+        [sys.executable, "-c", _FOOTPRINT_SCRIPT, *modules],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    # python -m utils.model_backends
+    cases = [
+        ("interpreter", ()),
+        ("utils.prediction_model", ("utils.prediction_model",)),
+        ("+ sklearn", ("utils.prediction_model", "sklearn.ensemble")),
+    ]
+    if backend_available("lstm"):
+        cases.append(("+ tensorflow", ("utils.prediction_model", "sklearn.ensemble", "tensorflow")))
+
+    for label, modules in cases:
+        result = import_footprint(*modules)
+        print(f"{label:<24} {result['seconds'] * 1000:8.1f} ms  {result['rss_mb']:7.1f} MB  loaded: {', '.join(result['loaded']) or '-'}")
+    print(f"Available backends: {', '.join(available_backends())}")
@@ -0,0 +1,160 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+import joblib
+from utils.shared_cache import get_shared_cache, data_fingerprint
+
+
+def params_key(params):
+    """Stable string for a hyperparameter dict"""
+    return json.dumps(params or {}, sort_keys=True, default=str)
+
+
+class ModelRegistry:
+    """Fitted models (and their scalers) persisted with joblib
+
+    A model is identified by (symbol, model type, hyperparameters) and each
+    fit by its training-data fingerprint, so every fit has its own file and
+    sessions working on different data do not overwrite each other. The
+    `max_versions` newest fits per model are kept on disk and the most
+    recently used fits in memory. Models are only refit when new data or
+    new parameters arrive.
+    """
+
+    def __init__(self, root="model_store", max_in_memory=16, max_versions=3, cache=None):
+        self.root = root
+        self.max_in_memory = max_in_memory
+        self.max_versions = max_versions
+        self.cache = cache if cache is not None else get_shared_cache()
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.loads = 0
+        self.fits = 0
+
+    def _prefix(self, symbol, model_type, params):
+        """Path prefix shared by every fit of one model"""
+        digest = hashlib.md5(params_key(params).encode()).hexdigest()[:12]
+        safe_symbol = symbol.replace("/", "_").replace("^", "_")
+        return os.path.join(self.root, safe_symbol, f"{model_type}-{digest}-")
+
+    def _path(self, symbol, model_type, params, fingerprint):
+        digest = hashlib.md5(fingerprint.encode()).hexdigest()[:12]
+        return f"{self._prefix(symbol, model_type, params)}{digest}.joblib"
+
+    def get(self, symbol, model_type, params, fingerprint):
+        """The stored artifact for this fit, or None if it is not stored"""
+        path = self._path(symbol, model_type, params, fingerprint)
+        with self._lock:
+            entry = self._memory.get(path)
+            if entry is not None and entry['fingerprint'] == fingerprint:
+                self._memory.move_to_end(path)
+                self.hits += 1
+                return entry['artifact']
+
+        if not os.path.exists(path):
+            return None
+        try:
+            entry = joblib.load(path)
+        except Exception as e:
+            # An unreadable file is treated as missing and overwritten on the next fit
+            print(f"Error loading model {path}: {str(e)}")
+            return None
+        if entry.get('fingerprint') != fingerprint or entry.get('params') != params_key(params):
+            return None
+
+        self._remember(path, entry)
+        with self._lock:
+            self.loads += 1
+        return entry['artifact']
+
+    def put(self, symbol, model_type, params, fingerprint, artifact):
+        """Store a fitted artifact, dropping all but the newest fits of the model"""
+        path = self._path(symbol, model_type, params, fingerprint)
+        entry = {
+            'symbol': symbol,
+            'model_type': model_type,
+            'params': params_key(params),
+            'fingerprint': fingerprint,
+            'artifact': artifact
+        }
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        joblib.dump(entry, tmp_path)
+        os.replace(tmp_path, path)
+
+        self._remember(path, entry)
+        self._evict_versions(self._prefix(symbol, model_type, params), path)
+
+    def _evict_versions(self, prefix, current):
+        """Delete all but `current` and the newest other files of one model"""
+        directory, name = os.path.split(prefix)
+        try:
+            paths = [
+                os.path.join(directory, file) for file in os.listdir(directory)
+                if file.startswith(name) and file.endswith(".joblib")
+            ]
+            paths.sort(key=lambda path: (path == current, os.path.getmtime(path)), reverse=True)
+        except OSError:
+            return
+
+        for path in paths[self.max_versions:]:
+            try:
+                os.remove(path)
+            except OSError:
+                # Already removed by a concurrent put
+                pass
+
+    def get_or_fit(self, symbol, model_type, params, fingerprint, fit):
+        """Stored artifact for the key, or `fit()` run once and stored
+
+        Concurrent sessions asking for the same stale model share one fit.
+        """
+        artifact = self.get(symbol, model_type, params, fingerprint)
+        if artifact is not None:
+            return artifact
+
+        def fit_and_store():
+            artifact = self.get(symbol, model_type, params, fingerprint)
+            if artifact is None:
+                artifact = fit()
+                self.put(symbol, model_type, params, fingerprint, artifact)
+                with self._lock:
+                    self.fits += 1
+            return artifact
+
+        key = ("model", self._path(symbol, model_type, params, fingerprint))
+        return self.cache.single_flight(key, fit_and_store)
+
+    def _remember(self, path, entry):
+        with self._lock:
+            self._memory[path] = entry
+            self._memory.move_to_end(path)
+            while len(self._memory) > self.max_in_memory:
+                self._memory.popitem(last=False)
+
+    def stats(self):
+        """Counters for monitoring reuse"""
+        with self._lock:
+            return {
+                'in_memory': len(self._memory),
+                'hits': self.hits,
+                'loads': self.loads,
+                'fits': self.fits
+            }
+
+
+_model_registry = None
+_model_registry_lock = threading.Lock()
+
+
+def get_model_registry():
+    """Process-wide ModelRegistry shared by every session"""
+    global _model_registry
+    with _model_registry_lock:
+        if _model_registry is None:
+            _model_registry = ModelRegistry()
+        return _model_registry
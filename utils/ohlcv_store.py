@@ -0,0 +1,192 @@
+import os
+import json
+import threading
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+# Calendar length of each yfinance period string
+PERIOD_OFFSETS = {
+    "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2),
+    "5y": pd.DateOffset(years=5),
+    "10y": pd.DateOffset(years=10),
+}
+
+# Periods yfinance counts in trading days rather than calendar time
+PERIOD_BARS = {
+    "1d": 1,
+    "2d": 2,
+    "5d": 5,
+}
+
+# Lower bound used for "max" history
+MAX_HISTORY_START = pd.Timestamp("1900-01-01", tz="UTC")
+
+
+def period_start(period, end):
+    """Earliest timestamp a period can reach back to when it ends at `end`
+
+    Day-count periods get a conservative calendar window wide enough to hold
+    that many sessions across weekends and holidays; slice_period trims them
+    to the exact bar count.
+    """
+    if period in PERIOD_OFFSETS:
+        return end - PERIOD_OFFSETS[period]
+    if period in PERIOD_BARS:
+        return end - pd.Timedelta(days=2 * PERIOD_BARS[period] + 5)
+    if period == "ytd":
+        return end.normalize().replace(month=1, day=1)
+    return MAX_HISTORY_START
+
+
+def slice_period(data, period, end=None):
+    """Return the rows of `data` that fall inside `period`
+
+    The index is sorted, so the result is a positional slice (a view on
+    the cached frame) rather than a boolean-mask copy.
+    """
+    if data is None or data.empty:
+        return data
+
+    if period in PERIOD_BARS:
+        # Walk back over the tail only; N sessions never need more bars
+        # than N days of minute data
+        tail = data.index[-PERIOD_BARS[period] * 1500:]
+        last_days = tail.normalize().unique()[-PERIOD_BARS[period]:]
+        start = last_days[0]
+    elif period in PERIOD_OFFSETS or period == "ytd":
+        if end is None:
+            end = pd.Timestamp.now(tz=data.index.tz)
+        start = period_start(period, end)
+    else:
+        return data
+
+    return data.iloc[data.index.searchsorted(start):]
+
+
+class OHLCVStore:
+    """On-disk columnar store of OHLCV bars, one partition per symbol/interval
+
+    Each partition is a Parquet file (pickle if pyarrow is missing) holding the
+    full history fetched so far, plus a small JSON sidecar recording how far
+    back the history is complete and when it was last refreshed.
+    """
+
+    def __init__(self, root="data_store"):
+        self.root = root
+        self.extension = "parquet" if PARQUET_AVAILABLE else "pkl"
+        self._lock = threading.RLock()
+
+    def _partition_dir(self, interval):
+        return os.path.join(self.root, interval)
+
+    def _data_path(self, symbol, interval):
+        return os.path.join(self._partition_dir(interval), f"{symbol}.{self.extension}")
+
+    def _meta_path(self, symbol, interval):
+        return os.path.join(self._partition_dir(interval), f"{symbol}.meta.json")
+
+    def load(self, symbol, interval="1d"):
+        """Load the stored bars for a symbol, or None if nothing is stored"""
+        path = self._data_path(symbol, interval)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            if PARQUET_AVAILABLE:
+                return pd.read_parquet(path)
+            return pd.read_pickle(path)
+        except Exception as e:
+            # A corrupt partition is treated as missing and rebuilt on next save
+            print(f"Error reading stored data for {symbol}: {str(e)}")
+            return None
+
+    def load_meta(self, symbol, interval="1d"):
+        """Load partition metadata (covered_from, updated_at)"""
+        path = self._meta_path(symbol, interval)
+        if not os.path.exists(path):
+            return {}
+
+        try:
+            with open(path, 'r') as f:
+                meta = json.load(f)
+        except Exception:
+            return {}
+
+        if meta.get('covered_from'):
+            meta['covered_from'] = pd.Timestamp(meta['covered_from'])
+        return meta
+
+    def save(self, symbol, interval, data, covered_from=None, updated_at=None):
+        """Replace a partition with `data` and update its metadata"""
+        os.makedirs(self._partition_dir(interval), exist_ok=True)
+        path = self._data_path(symbol, interval)
+        tmp_path = f"{path}.tmp"
+
+        with self._lock:
+            if PARQUET_AVAILABLE:
+                data.to_parquet(tmp_path)
+            else:
+                data.to_pickle(tmp_path)
+            os.replace(tmp_path, path)
+
+            meta = {
+                'covered_from': covered_from.isoformat() if covered_from is not None else None,
+                'updated_at': updated_at,
+                'rows': len(data)
+            }
+            with open(self._meta_path(symbol, interval), 'w') as f:
+                json.dump(meta, f, indent=2)
+
+    def append(self, symbol, interval, new_data, covered_from=None, updated_at=None):
+        """Merge newer bars into a partition and return the full history
+
+        Bars that overlap the stored tail (e.g. today's still-forming bar)
+        are replaced by the newer values.
+        """
+        with self._lock:
+            stored = self.load(symbol, interval)
+
+            if stored is None or stored.empty:
+                merged = new_data
+            elif new_data is None or new_data.empty:
+                merged = stored
+            else:
+                if stored.index.tz is not None and new_data.index.tz is not None:
+                    new_data = new_data.tz_convert(stored.index.tz)
+                merged = pd.concat([stored, new_data])
+                merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+
+            if covered_from is None:
+                covered_from = self.load_meta(symbol, interval).get('covered_from')
+
+            self.save(symbol, interval, merged, covered_from=covered_from, updated_at=updated_at)
+            return merged
+
+    def last_timestamp(self, symbol, interval="1d"):
+        """Timestamp of the newest stored bar, or None"""
+        data = self.load(symbol, interval)
+        if data is None or data.empty:
+            return None
+        return data.index[-1]
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_default_store():
+    """Process-wide OHLCVStore instance rooted at ./data_store"""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = OHLCVStore()
+        return _default_store
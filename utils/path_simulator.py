@@ -0,0 +1,123 @@
+import time
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+
+# Quantiles reported by PathSimulator.bands
+DEFAULT_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+def log_returns(close):
+    """Daily log returns of a price series, without NaNs"""
+    close = np.asarray(close, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.diff(np.log(close))
+    return returns[np.isfinite(returns)]
+
+
+class PathSimulator:
+    """Seeded Monte Carlo price paths, GBM or bootstrapped from history
+
+    Paths are generated day-block by day-block: each block is one
+    (paths x block_days) draw whose cumulative sum continues from the
+    previous block's last column. simulate() assembles the blocks into
+    the full (paths x horizon) array; bands() reduces each block to
+    per-day quantiles as it goes, so its memory is bounded by
+    paths x block_days. Draws are taken day by day across all paths, so
+    for one seed both describe the same paths whatever block_days is.
+    """
+
+    def __init__(self, seed=42, dtype=np.float64, block_days=126):
+        self.seed = seed
+        self.dtype = dtype
+        self.block_days = block_days
+
+    def _log_paths(self, horizon, paths, method, mu, sigma, returns):
+        """Yield (day slice, block of cumulative log returns) over the horizon"""
+        rng = np.random.default_rng(self.seed)
+        level = np.zeros((paths, 1), dtype=self.dtype)
+
+        if method == "gbm":
+            # mu and sigma are annual; Ito drift correction on the daily step
+            drift = self.dtype((mu - 0.5 * sigma ** 2) / TRADING_DAYS)
+            scale = self.dtype(sigma / np.sqrt(TRADING_DAYS))
+        elif method == "bootstrap":
+            returns = np.asarray(returns, dtype=self.dtype)
+            if len(returns) == 0:
+                raise ValueError("Bootstrap simulation needs historical returns")
+        else:
+            raise ValueError(f"Unknown simulation method: {method}")
+
+        for start in range(0, horizon, self.block_days):
+            days = min(self.block_days, horizon - start)
+            # Draw (days x paths) so the stream order doesn't depend on the block size
+            if method == "gbm":
+                steps = rng.standard_normal((days, paths), dtype=self.dtype).T
+                steps *= scale
+                steps += drift
+            else:
+                steps = returns[rng.integers(0, len(returns), (days, paths)).T]
+
+            np.cumsum(steps, axis=1, out=steps)
+            steps += level
+            level = steps[:, -1:].copy()
+            yield slice(start, start + days), steps
+
+    def simulate(self, s0, horizon, paths=10_000, method="gbm", mu=0.0, sigma=0.2, returns=None):
+        """(paths x horizon) array of simulated prices starting from s0
+
+        GBM uses annual drift `mu` and volatility `sigma`; "bootstrap" draws
+        daily log returns with replacement from `returns`.
+        """
+        prices = np.empty((paths, horizon), dtype=self.dtype)
+        for days, block in self._log_paths(horizon, paths, method, mu, sigma, returns):
+            np.exp(block, out=prices[:, days])
+        prices *= self.dtype(s0)
+        return prices
+
+    def bands(self, s0, horizon, paths=10_000, method="gbm", mu=0.0, sigma=0.2, returns=None,
+              quantiles=DEFAULT_QUANTILES, index=None):
+        """Per-day price quantiles and the terminal price distribution
+
+        Returns (bands, terminal): bands is a DataFrame with one column per
+        quantile (index `index` if given, else day number) and terminal the
+        (paths,) array of final prices. Quantiles are taken on log prices,
+        which exp() maps monotonically onto prices.
+        """
+        quantiles = np.asarray(quantiles, dtype=np.float64)
+        out = np.empty((horizon, len(quantiles)))
+        terminal = None
+        for days, block in self._log_paths(horizon, paths, method, mu, sigma, returns):
+            out[days] = np.quantile(block, quantiles, axis=0).T
+            terminal = block[:, -1]
+
+        bands = pd.DataFrame(
+            s0 * np.exp(out),
+            index=index if index is not None else np.arange(1, horizon + 1),
+            columns=[f"q{round(q * 100):02d}" for q in quantiles]
+        )
+        terminal = s0 * np.exp(terminal.astype(np.float64)) if terminal is not None else np.empty(0)
+        return bands, terminal
+
+
+def benchmark(paths=10_000, horizon=1260, repeat=3, seed=0):
+    """Timings of simulate() and bands() for GBM and bootstrap, float64 and float32"""
+    returns = np.random.default_rng(seed).normal(0.0004, 0.02, 2500)
+    results = []
+    for dtype in (np.float64, np.float32):
+        simulator = PathSimulator(seed=seed, dtype=dtype)
+        for method in ("gbm", "bootstrap"):
+            for name, fn in (("simulate", simulator.simulate), ("bands", simulator.bands)):
+                best = float("inf")
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    fn(100.0, horizon, paths, method=method, mu=0.1, sigma=0.3, returns=returns)
+                    best = min(best, time.perf_counter() - start)
+                results.append({'dtype': np.dtype(dtype).name, 'method': method, 'call': name, 'seconds': best})
+    return pd.DataFrame(results)
+
+
+if __name__ == "__main__":
+    # python -m utils.path_simulator
+    print(benchmark().to_string(index=False))
@@ -0,0 +1,300 @@
+import os
+import json
+import uuid
+import threading
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+
+def normalize_symbol(symbol):
+    """Upper-case a symbol and default to the NSE suffix (RELIANCE -> RELIANCE.NS)"""
+    symbol = symbol.strip().upper()
+    if symbol and "." not in symbol and not symbol.startswith("^"):
+        symbol = f"{symbol}.NS"
+    return symbol
+
+
+def _in_order(transactions):
+    return sorted(transactions, key=lambda txn: (txn["date"], txn["created_at"]))
+
+
+def uncovered_sell(transactions):
+    """First sell (in date order) exceeding the shares held at that point, or None"""
+    held = {}
+    for txn in _in_order(transactions):
+        change = txn["quantity"] if txn["side"] == "BUY" else -txn["quantity"]
+        held[txn["symbol"]] = held.get(txn["symbol"], 0) + change
+        if held[txn["symbol"]] < 0:
+            return txn
+    return None
+
+
+def fifo_lots(transactions):
+    """Open lots and realized P&L per symbol from a user's transactions
+
+    Sells close the oldest open lots first. Returns (lots, realized) where
+    lots is a list of (symbol, quantity, price) and realized maps symbol to
+    realized P&L.
+    """
+    open_lots = {}
+    realized = {}
+    for txn in _in_order(transactions):
+        symbol = txn["symbol"]
+        lots = open_lots.setdefault(symbol, [])
+        if txn["side"] == "BUY":
+            lots.append([txn["quantity"], txn["price"]])
+            continue
+
+        remaining = txn["quantity"]
+        while remaining > 0 and lots:
+            matched = min(remaining, lots[0][0])
+            realized[symbol] = realized.get(symbol, 0.0) + matched * (txn["price"] - lots[0][1])
+            lots[0][0] -= matched
+            remaining -= matched
+            if lots[0][0] == 0:
+                lots.pop(0)
+
+    lots = [(symbol, quantity, price) for symbol, lots in open_lots.items() for quantity, price in lots]
+    return lots, realized
+
+
+class PortfolioManager:
+    """Per-user transactions persisted to JSON, valued as NumPy arrays
+
+    Transactions are the source of truth. Open FIFO lots of every user are
+    kept in flat arrays (user, symbol, quantity, cost) that are rebuilt only
+    after a change, so revaluing is a gather of prices plus a few bincounts.
+    """
+
+    def __init__(self, portfolios_file="portfolios.json"):
+        self.portfolios_file = portfolios_file
+        self._lock = threading.RLock()
+        self._dirty = True
+        self.load_portfolios()
+
+    def load_portfolios(self):
+        """Load portfolios from JSON file"""
+        with self._lock:
+            if os.path.exists(self.portfolios_file):
+                with open(self.portfolios_file, 'r') as f:
+                    self.portfolios = json.load(f)
+            else:
+                self.portfolios = {}
+            self._dirty = True
+
+    def save_portfolios(self):
+        """Save portfolios to JSON file"""
+        with self._lock:
+            tmp_file = f"{self.portfolios_file}.tmp"
+            with open(tmp_file, 'w') as f:
+                json.dump(self.portfolios, f, indent=2)
+            os.replace(tmp_file, self.portfolios_file)
+
+    def transactions(self, username):
+        """A user's transactions, oldest first"""
+        with self._lock:
+            return list(self.portfolios.get(username, {}).get("transactions", []))
+
+    def add_transaction(self, username, symbol, side, quantity, price, date=None):
+        """Record a buy or sell; sells cannot exceed the quantity held"""
+        symbol = normalize_symbol(symbol)
+        side = side.upper()
+        if not symbol:
+            return False, "Enter a stock symbol"
+        if side not in ("BUY", "SELL"):
+            return False, f"Unknown transaction type: {side}"
+        if quantity <= 0 or price <= 0:
+            return False, "Quantity and price must be positive"
+
+        txn = {
+            "id": uuid.uuid4().hex,
+            "symbol": symbol,
+            "side": side,
+            "quantity": int(quantity),
+            "price": float(price),
+            "date": (date or datetime.now()).isoformat()[:10],
+            "created_at": datetime.now().isoformat()
+        }
+
+        with self._lock:
+            if side == "SELL" and uncovered_sell(self.transactions(username) + [txn]) is not None:
+                return False, f"Cannot sell {quantity} shares of {symbol} on {txn['date']}; not enough shares held"
+
+            user = self.portfolios.setdefault(username, {"transactions": []})
+            user["transactions"].append(txn)
+            self._dirty = True
+            self.save_portfolios()
+
+        verb = "Bought" if side == "BUY" else "Sold"
+        return True, f"{verb} {quantity} shares of {symbol} at ₹{price:,.2f}"
+
+    def delete_transaction(self, username, transaction_id):
+        """Remove a transaction (e.g. a typo); later sells must still be covered"""
+        with self._lock:
+            transactions = self.transactions(username)
+            remaining = [txn for txn in transactions if txn["id"] != transaction_id]
+            if len(remaining) == len(transactions):
+                return False, "Transaction not found"
+
+            uncovered = uncovered_sell(remaining)
+            if uncovered is not None:
+                return False, f"Removing it would leave a sell of {uncovered['symbol']} uncovered"
+
+            self.portfolios[username]["transactions"] = remaining
+            self._dirty = True
+            self.save_portfolios()
+        return True, "Transaction removed"
+
+    def holdings_quantity(self, username):
+        """Shares held per symbol"""
+        self._rebuild()
+        with self._lock:
+            user = self._users.get(username)
+            if user is None:
+                return {}
+            mask = self.lot_user == user
+            quantity = np.bincount(self.lot_symbol[mask], weights=self.lot_quantity[mask], minlength=len(self.symbols))
+            return {self.symbols[i]: int(quantity[i]) for i in np.flatnonzero(quantity)}
+
+    def symbols_held(self, username=None):
+        """Symbols with open lots for one user, or for everyone"""
+        self._rebuild()
+        with self._lock:
+            mask = np.ones(len(self.lot_user), dtype=bool) if username is None else self.lot_user == self._users.get(username, -1)
+            return [self.symbols[i] for i in np.unique(self.lot_symbol[mask])]
+
+    def _rebuild(self):
+        """Rebuild the flat lot arrays after a change"""
+        with self._lock:
+            if not self._dirty:
+                return
+
+            users, symbols = {}, {}
+            lot_user, lot_symbol, lot_quantity, lot_price = [], [], [], []
+            realized_user, realized_symbol, realized_value = [], [], []
+
+            for username, portfolio in self.portfolios.items():
+                user = users.setdefault(username, len(users))
+                lots, realized = fifo_lots(portfolio.get("transactions", []))
+                for symbol, quantity, price in lots:
+                    lot_user.append(user)
+                    lot_symbol.append(symbols.setdefault(symbol, len(symbols)))
+                    lot_quantity.append(quantity)
+                    lot_price.append(price)
+                for symbol, value in realized.items():
+                    realized_user.append(user)
+                    realized_symbol.append(symbols.setdefault(symbol, len(symbols)))
+                    realized_value.append(value)
+
+            self._users = users
+            self.usernames = list(users)
+            self.symbols = list(symbols)
+            self.lot_user = np.array(lot_user, dtype=np.int64)
+            self.lot_symbol = np.array(lot_symbol, dtype=np.int64)
+            self.lot_quantity = np.array(lot_quantity, dtype=np.float64)
+            self.lot_cost = np.array(lot_quantity, dtype=np.float64) * np.array(lot_price, dtype=np.float64)
+            self.realized_user = np.array(realized_user, dtype=np.int64)
+            self.realized_symbol = np.array(realized_symbol, dtype=np.int64)
+            self.realized_value = np.array(realized_value, dtype=np.float64)
+            self._dirty = False
+
+    def _prices(self, snapshot):
+        """Last and previous close for every known symbol, from one snapshot lookup"""
+        positions = snapshot.positions(self.symbols)
+        known = positions >= 0
+        last = np.full(len(self.symbols), np.nan)
+        prev = np.full(len(self.symbols), np.nan)
+        last[known] = snapshot.last[positions[known]]
+        prev[known] = snapshot.prev[positions[known]]
+        return last, prev
+
+    def value(self, username, snapshot):
+        """Value one user's holdings against a MarketSnapshot
+
+        Returns (holdings DataFrame, totals dict). Symbols without a quote
+        are valued at cost and their day change counts as 0.
+        """
+        self._rebuild()
+        with self._lock:
+            last, prev = self._prices(snapshot)
+            user = self._users.get(username, -1)
+            n = len(self.symbols)
+
+            mask = self.lot_user == user
+            symbols = self.lot_symbol[mask]
+            quantity = np.bincount(symbols, weights=self.lot_quantity[mask], minlength=n)
+            invested = np.bincount(symbols, weights=self.lot_cost[mask], minlength=n)
+            realized_mask = self.realized_user == user
+            realized = np.bincount(self.realized_symbol[realized_mask], weights=self.realized_value[realized_mask], minlength=n)
+
+        priced = ~np.isnan(last)
+        price = np.where(priced, last, np.divide(invested, quantity, out=np.zeros(n), where=quantity > 0))
+        market_value = quantity * price
+        day_change = np.where(priced & ~np.isnan(prev), quantity * (last - prev), 0.0)
+        unrealized = market_value - invested
+
+        total_value = market_value.sum()
+        total_invested = invested.sum()
+        previous_value = total_value - day_change.sum()
+
+        held = np.flatnonzero(quantity > 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            holdings = pd.DataFrame({
+                'symbol': [self.symbols[i] for i in held],
+                'quantity': quantity[held].astype(np.int64),
+                'avg_cost': invested[held] / quantity[held],
+                'price': price[held],
+                'invested': invested[held],
+                'market_value': market_value[held],
+                'unrealized_pnl': unrealized[held],
+                'unrealized_pct': unrealized[held] / invested[held] * 100,
+                'day_change': day_change[held],
+                'weight': market_value[held] / total_value * 100 if total_value else np.zeros(len(held)),
+                'realized_pnl': realized[held],
+                'priced': priced[held]
+            })
+
+        totals = {
+            'value': float(total_value),
+            'invested': float(total_invested),
+            'unrealized_pnl': float(unrealized[held].sum()),
+            'unrealized_pct': float((total_value - total_invested) / total_invested * 100) if total_invested else 0.0,
+            'realized_pnl': float(realized.sum()),
+            'day_change': float(day_change.sum()),
+            'day_change_pct': float(day_change.sum() / previous_value * 100) if previous_value else 0.0
+        }
+        return holdings, totals
+
+    def value_all(self, snapshot):
+        """Portfolio value, cost and day change for every user in one pass
+
+        Lots without a quote are valued at their own cost, as in value().
+        """
+        self._rebuild()
+        with self._lock:
+            last, prev = self._prices(snapshot)
+            lot_last = last[self.lot_symbol]
+            lot_value = np.where(np.isnan(lot_last), self.lot_cost, self.lot_quantity * lot_last)
+            lot_day = np.nan_to_num(self.lot_quantity * (last - prev)[self.lot_symbol])
+
+            n = len(self.usernames)
+            return pd.DataFrame({
+                'value': np.bincount(self.lot_user, weights=lot_value, minlength=n),
+                'invested': np.bincount(self.lot_user, weights=self.lot_cost, minlength=n),
+                'day_change': np.bincount(self.lot_user, weights=lot_day, minlength=n),
+                'realized_pnl': np.bincount(self.realized_user, weights=self.realized_value, minlength=n)
+            }, index=pd.Index(self.usernames, name='username'))
+
+
+_portfolio_manager = None
+_portfolio_manager_lock = threading.Lock()
+
+
+def get_portfolio_manager():
+    """Process-wide PortfolioManager shared by every session"""
+    global _portfolio_manager
+    with _portfolio_manager_lock:
+        if _portfolio_manager is None:
+            _portfolio_manager = PortfolioManager()
+        return _portfolio_manager
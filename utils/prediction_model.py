@@ -1,59 +1,101 @@
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import MinMaxScaler
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.linear_model import LinearRegression
-import tensorflow as tf
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import LSTM, Dense, Dropout
 from datetime import datetime, timedelta
+from utils.market_calendar import NSE_CALENDAR
+from utils.indicators import get_indicator_engine
+from utils.model_registry import get_model_registry
+from utils.shared_cache import data_fingerprint
+from utils.model_backends import create_model
+from utils.window_dataset import WindowDataset, lagged_windows
+from utils.job_queue import report_progress
+from utils.path_simulator import PathSimulator, log_returns
 import warnings
 warnings.filterwarnings('ignore')
 
+# Long-term drift and seasonality applied on top of the recursive forecast
+ANNUAL_TREND = 0.08
+SEASONAL_AMPLITUDE = 0.02
+
+
 class PredictionModel:
-    def __init__(self):
-        self.scaler = MinMaxScaler(feature_range=(0, 1))
+    def __init__(self, forecast_method="batched", registry=None):
+        # Models are built from their backends on first use, so constructing
+        # a PredictionModel imports neither sklearn nor TensorFlow
+        self._scaler = None
         self.lstm_model = None
-        self.rf_model = RandomForestRegressor(n_estimators=100, random_state=42)
-        self.linear_model = LinearRegression()
+        self._rf_model = None
+        self._linear_model = None
+        # "batched" walks the forest once per split interval; "recursive" calls predict per day
+        self.forecast_method = forecast_method
+        # Fitted models are reused across reruns until the training data changes
+        self.registry = registry if registry is not None else get_model_registry()
+        # Prediction bands come from seeded bootstrapped price paths
+        self.simulator = PathSimulator(seed=42, dtype=np.float32)
+        self.simulation_paths = 5_000
+    
+    @property
+    def scaler(self):
+        if self._scaler is None:
+            self._scaler = create_model('min_max_scaler', feature_range=(0, 1))
+        return self._scaler
+    
+    @scaler.setter
+    def scaler(self, value):
+        self._scaler = value
+    
+    @property
+    def rf_model(self):
+        if self._rf_model is None:
+            self._rf_model = create_model('random_forest', n_estimators=100, random_state=42)
+        return self._rf_model
+    
+    @rf_model.setter
+    def rf_model(self, value):
+        self._rf_model = value
+    
+    @property
+    def linear_model(self):
+        if self._linear_model is None:
+            self._linear_model = create_model('linear')
+        return self._linear_model
+    
+    @linear_model.setter
+    def linear_model(self, value):
+        self._linear_model = value
         
     def prepare_data_for_lstm(self, data, time_steps=60):
-        """Prepare data for LSTM model"""
-        scaled_data = self.scaler.fit_transform(data[['Close']].values)
+        """Prepare data for LSTM model
         
-        X, y = [], []
-        for i in range(time_steps, len(scaled_data)):
-            X.append(scaled_data[i-time_steps:i, 0])
-            y.append(scaled_data[i, 0])
+        X is a strided (samples, time_steps) view on the scaled closes, not a
+        copy; use WindowDataset for several symbols/features or long histories.
+        """
+        scaled_data = self.scaler.fit_transform(data[['Close']].values)
         
-        return np.array(X), np.array(y)
+        return lagged_windows(scaled_data[:, 0], time_steps)
     
     def create_lstm_model(self, input_shape):
-        """Create LSTM model architecture"""
-        model = Sequential([
-            LSTM(50, return_sequences=True, input_shape=input_shape),
-            Dropout(0.2),
-            LSTM(50, return_sequences=True),
-            Dropout(0.2),
-            LSTM(50),
-            Dropout(0.2),
-            Dense(25),
-            Dense(1)
-        ])
-        
-        model.compile(optimizer='adam', loss='mean_squared_error')
-        return model
+        """Create LSTM model architecture (imports TensorFlow on first use)"""
+        return create_model('lstm', input_shape=input_shape)
     
-    def train_lstm_model(self, X, y):
-        """Train LSTM model"""
-        # Reshape for LSTM
-        X = X.reshape((X.shape[0], X.shape[1], 1))
+    def train_lstm_model(self, X, y=None, epochs=10):
+        """Train LSTM model
+        
+        X is either a (samples, time_steps) array with targets y, or a
+        WindowDataset, which is fed batch by batch without stacking windows.
+        """
+        if isinstance(X, WindowDataset):
+            self.lstm_model = self.create_lstm_model(X.input_shape)
+            self.lstm_model.fit(X.batches(repeat=True), steps_per_epoch=len(X), epochs=epochs, verbose=0)
+            return self.lstm_model
+        
+        # Add the feature axis as a view; reshape would copy strided windows
+        X = np.asarray(X)[..., np.newaxis]
         
         # Create and train model
         self.lstm_model = self.create_lstm_model((X.shape[1], 1))
         
         # Train with reduced epochs for faster execution
-        self.lstm_model.fit(X, y, batch_size=32, epochs=10, verbose=0)
+        self.lstm_model.fit(X, y, batch_size=32, epochs=epochs, verbose=0)
         
         return self.lstm_model
     
@@ -68,28 +110,28 @@ class PredictionModel:
         features['Open'] = data['Open']
         features['Volume'] = data['Volume']
         
-        # Technical indicators
-        features['SMA_5'] = data['Close'].rolling(window=5).mean()
-        features['SMA_20'] = data['Close'].rolling(window=20).mean()
-        features['SMA_50'] = data['Close'].rolling(window=50).mean()
+        # Technical indicators (shared with the fetcher and UI via the indicator engine)
+        indicators = get_indicator_engine().compute(data, [
+            'SMA_5', 'SMA_20', 'SMA_50',
+            'RSI',
+            'BB_upper', 'BB_lower', 'BB_width', 'BB_position',
+            'Volume_SMA', 'Volatility'
+        ])
+        features['SMA_5'] = indicators['SMA_5']
+        features['SMA_20'] = indicators['SMA_20']
+        features['SMA_50'] = indicators['SMA_50']
         
         # RSI
-        delta = data['Close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        features['RSI'] = 100 - (100 / (1 + rs))
+        features['RSI'] = indicators['RSI']
         
         # Bollinger Bands
-        sma_20 = features['SMA_20']
-        std_20 = data['Close'].rolling(window=20).std()
-        features['BB_upper'] = sma_20 + (std_20 * 2)
-        features['BB_lower'] = sma_20 - (std_20 * 2)
-        features['BB_width'] = features['BB_upper'] - features['BB_lower']
-        features['BB_position'] = (data['Close'] - features['BB_lower']) / features['BB_width']
+        features['BB_upper'] = indicators['BB_upper']
+        features['BB_lower'] = indicators['BB_lower']
+        features['BB_width'] = indicators['BB_width']
+        features['BB_position'] = indicators['BB_position']
         
         # Volume features
-        features['Volume_SMA'] = data['Volume'].rolling(window=20).mean()
+        features['Volume_SMA'] = indicators['Volume_SMA']
         features['Volume_ratio'] = data['Volume'] / features['Volume_SMA']
         
         # Price change features
@@ -98,7 +140,7 @@ class PredictionModel:
         features['Price_change_20d'] = data['Close'].pct_change(20)
         
         # Volatility
-        features['Volatility'] = data['Close'].rolling(window=20).std()
+        features['Volatility'] = indicators['Volatility']
         
         # Date features
         features['DayOfWeek'] = data.index.dayofweek
@@ -118,13 +160,15 @@ class PredictionModel:
                 return self.simple_trend_prediction(historical_data, years_ahead)
             
             # Prepare features
+            report_progress(0.1, "Preparing features")
             features = self.prepare_features(historical_data)
             
             if len(features) < 50:
                 return self.simple_trend_prediction(historical_data, years_ahead)
             
             # Use multiple models for prediction
-            predictions = self.ensemble_prediction(features, years_ahead)
+            report_progress(0.3, "Fitting model and forecasting")
+            predictions = self.ensemble_prediction(features, years_ahead, symbol=symbol)
             
             return predictions
             
@@ -144,37 +188,38 @@ class PredictionModel:
         # Fit linear model
         self.linear_model.fit(x, y)
         
-        # Generate future dates
+        # Generate future NSE trading dates
         last_date = data.index[-1]
-        future_dates = pd.date_range(
-            start=last_date + timedelta(days=1),
-            periods=years_ahead * 252,  # 252 trading days per year
-            freq='B'  # Business days
+        future_dates = NSE_CALENDAR.trading_days(
+            after=last_date,
+            periods=years_ahead * 252  # 252 trading days per year
         )
         
         # Predict future values
         future_x = np.arange(len(recent_data), len(recent_data) + len(future_dates)).reshape(-1, 1)
         future_prices = self.linear_model.predict(future_x)
         
-        # Add some realistic volatility
-        volatility = data['Close'].pct_change().std() * np.sqrt(252)  # Annualized volatility
-        random_factor = np.random.normal(1, volatility/4, len(future_prices))
-        future_prices = future_prices * random_factor
-        
         # Ensure prices don't go negative
         future_prices = np.maximum(future_prices, data['Close'].iloc[-1] * 0.1)
         
+        # Uncertainty around the trend from simulated paths
+        lower_bound, upper_bound = self.simulated_bands(data['Close'], future_prices)
+        
         # Create prediction dataframe
         predictions = pd.DataFrame({
             'Predicted_Price': future_prices,
-            'Upper_Bound': future_prices * 1.2,
-            'Lower_Bound': future_prices * 0.8
+            'Upper_Bound': upper_bound,
+            'Lower_Bound': lower_bound
         }, index=future_dates)
         
         return predictions
     
-    def ensemble_prediction(self, features, years_ahead):
-        """Use ensemble of models for prediction"""
+    def ensemble_prediction(self, features, years_ahead, symbol=None):
+        """Use ensemble of models for prediction
+        
+        With a symbol the fitted forest comes from the model registry and is
+        only refit when the training rows or the hyperparameters change.
+        """
         # Prepare target variable (next day's closing price)
         target = features['Close'].shift(-1).dropna()
         features_aligned = features[:-1]  # Remove last row to align with target
@@ -191,17 +236,45 @@ class PredictionModel:
         X_test_numeric = X_test[numeric_features].fillna(X_train[numeric_features].mean())
         
         # Train Random Forest model
-        self.rf_model.fit(X_train_numeric, y_train)
+        if symbol is None:
+            self.rf_model.fit(X_train_numeric, y_train)
+        else:
+            from sklearn.base import clone
+            self.rf_model = self.registry.get_or_fit(
+                symbol,
+                'random_forest',
+                self.rf_model.get_params(),
+                data_fingerprint(X_train_numeric.index, np.column_stack([X_train_numeric.to_numpy(dtype=np.float64), y_train.to_numpy()])),
+                lambda: clone(self.rf_model).fit(X_train_numeric, y_train)
+            )
         
         # Generate future predictions
         last_features = X_test_numeric.iloc[-1:].copy()
         
-        future_dates = pd.date_range(
-            start=features.index[-1] + timedelta(days=1),
-            periods=years_ahead * 252,
-            freq='B'
+        future_dates = NSE_CALENDAR.trading_days(
+            after=features.index[-1],
+            periods=years_ahead * 252
         )
         
+        if self.forecast_method == "recursive":
+            predictions_array = self.recursive_forecast(last_features, future_dates)
+        else:
+            predictions_array = self.batched_forecast(last_features, future_dates)
+        
+        # Calculate confidence intervals
+        lower_bound, upper_bound = self.simulated_bands(features['Close'], predictions_array)
+        
+        # Create prediction dataframe
+        prediction_df = pd.DataFrame({
+            'Predicted_Price': predictions_array,
+            'Upper_Bound': upper_bound,
+            'Lower_Bound': lower_bound
+        }, index=future_dates)
+        
+        return prediction_df
+    
+    def recursive_forecast(self, last_features, future_dates):
+        """Reference forecast: one forest predict call per future day"""
         predictions = []
         current_features = last_features.copy()
         
@@ -217,31 +290,124 @@ class PredictionModel:
             # Add some trend and seasonality
             if i > 0:
                 # Add slight upward trend (assuming long-term growth)
-                trend_factor = 1 + (0.08 / 252)  # 8% annual growth rate
+                trend_factor = 1 + (ANNUAL_TREND / 252)  # 8% annual growth rate
                 next_price *= trend_factor
                 
                 # Add seasonal effects
                 month = future_dates[i].month
-                seasonal_factor = 1 + 0.02 * np.sin(2 * np.pi * month / 12)
+                seasonal_factor = 1 + SEASONAL_AMPLITUDE * np.sin(2 * np.pi * month / 12)
                 next_price *= seasonal_factor
             
             predictions[-1] = next_price
         
-        # Calculate confidence intervals
-        volatility = features['Close'].pct_change().std() * np.sqrt(252)
-        
-        predictions_array = np.array(predictions)
-        upper_bound = predictions_array * (1 + volatility)
-        lower_bound = predictions_array * (1 - volatility)
+        return np.array(predictions)
+    
+    def batched_forecast(self, last_features, future_dates):
+        """Same forecast as recursive_forecast without per-day predict calls
+        
+        Only Close changes between steps, so with the other features fixed
+        the forest is a step function of Close. Its reachable Close split
+        thresholds cut the line into intervals; the forest is evaluated once
+        on one representative per interval, and the recursion then becomes
+        integer lookups (searchsorted on float32 Close, as sklearn compares).
+        """
+        response = self._close_response(last_features)
+        if response is None:
+            return self.recursive_forecast(last_features, future_dates)
+        thresholds, values = response
+        
+        # Interval each forest output falls into for the next step
+        successor = np.searchsorted(thresholds, values.astype(np.float32).astype(np.float64), side='left')
+        
+        state = np.searchsorted(thresholds, np.float64(np.float32(last_features['Close'].iloc[0])), side='left')
+        states = np.empty(len(future_dates), dtype=np.int64)
+        for i in range(len(future_dates)):
+            states[i] = state
+            state = successor[state]
+        raw = values[states]
         
-        # Create prediction dataframe
-        prediction_df = pd.DataFrame({
-            'Predicted_Price': predictions_array,
-            'Upper_Bound': upper_bound,
-            'Lower_Bound': lower_bound
-        }, index=future_dates)
+        # Trend and seasonality, applied from the second day on
+        months = np.asarray(future_dates.month)
+        factors = (1 + (ANNUAL_TREND / 252)) * (1 + SEASONAL_AMPLITUDE * np.sin(2 * np.pi * months / 12))
+        if len(factors):
+            factors[0] = 1.0
         
-        return prediction_df
+        return raw * factors
+    
+    def _close_response(self, last_features):
+        """(sorted Close thresholds, forest output per interval), or None
+        
+        Walks each tree with every feature but Close fixed to its last value,
+        collecting the Close thresholds that can still be reached.
+        """
+        estimators = getattr(self.rf_model, 'estimators_', None)
+        if not estimators or 'Close' not in last_features.columns:
+            return None
+        
+        row = last_features.iloc[0].to_numpy(dtype=np.float32).astype(np.float64)
+        close_index = list(last_features.columns).index('Close')
+        
+        thresholds = []
+        for estimator in estimators:
+            tree = estimator.tree_
+            stack = [0]
+            while stack:
+                node = stack.pop()
+                left, right = tree.children_left[node], tree.children_right[node]
+                if left == -1:
+                    continue
+                feature = tree.feature[node]
+                if feature == close_index:
+                    thresholds.append(tree.threshold[node])
+                    stack.extend((left, right))
+                elif row[feature] <= tree.threshold[node]:
+                    stack.append(left)
+                else:
+                    stack.append(right)
+        
+        thresholds = np.unique(np.asarray(thresholds, dtype=np.float64))
+        
+        # One float32 point per interval: (-inf, t0], (t0, t1], ..., (t_last, inf)
+        points = np.empty(len(thresholds) + 1, dtype=np.float32)
+        for j in range(len(thresholds) + 1):
+            if j < len(thresholds):
+                point = np.float32(thresholds[j])
+                if point > thresholds[j]:
+                    point = np.nextafter(point, np.float32(-np.inf))
+            else:
+                point = np.float32(thresholds[-1]) if len(thresholds) else np.float32(row[close_index])
+                while len(thresholds) and point <= thresholds[-1]:
+                    point = np.nextafter(point, np.float32(np.inf))
+            points[j] = point
+        
+        # Each point must land in its own interval, else fall back to the loop
+        if not np.array_equal(np.searchsorted(thresholds, points.astype(np.float64), side='left'),
+                              np.arange(len(points))):
+            return None
+        
+        grid = pd.DataFrame(np.repeat(last_features.to_numpy(), len(points), axis=0), columns=last_features.columns)
+        grid['Close'] = points.astype(np.float64)
+        values = self.rf_model.predict(grid)
+        
+        return thresholds, values
+    
+    def simulated_bands(self, close, point_forecast, lower=0.05, upper=0.95):
+        """(lower, upper) price bands around a point forecast
+        
+        Bootstraps the series' demeaned daily log returns into paths (the
+        drift is the point forecast's), and scales the forecast by the
+        per-day `lower`/`upper` quantiles of the simulated growth.
+        """
+        point_forecast = np.asarray(point_forecast, dtype=np.float64)
+        returns = log_returns(close)
+        if len(returns) < 2:
+            return point_forecast * 0.8, point_forecast * 1.2
+        
+        bands, _ = self.simulator.bands(
+            1.0, len(point_forecast), self.simulation_paths,
+            method="bootstrap", returns=returns - returns.mean(), quantiles=(lower, upper)
+        )
+        return point_forecast * bands.iloc[:, 0].to_numpy(), point_forecast * bands.iloc[:, 1].to_numpy()
     
     def get_prediction_accuracy_metrics(self, actual, predicted):
         """Calculate prediction accuracy metrics"""
@@ -283,4 +449,64 @@ class PredictionModel:
             'risk_level': 'High' if predicted_volatility > 30 else 'Medium' if predicted_volatility > 15 else 'Low'
         }
         
-        return insights
\ No newline at end of file
+        return insights
+
+def forecast_job(historical_data, symbol, years_ahead=5):
+    """predict_future_prices as a picklable job for the background queue"""
+    return PredictionModel().predict_future_prices(historical_data, symbol, years_ahead=years_ahead)
+
+
+def benchmark_forecast(n_symbols=3, n_bars=750, years_ahead=5, seed=0):
+    """Per-symbol ensemble_prediction latency, recursive loop vs batched
+    
+    Runs both methods on synthetic random-walk OHLCV data (the forest fit is
+    included in both timings) and returns a dict with mean seconds per
+    symbol and the largest relative difference between the two forecasts.
+    """
+    import time
+    
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=n_bars)
+    timings = {'recursive': [], 'batched': []}
+    max_error = 0.0
+    
+    for _ in range(n_symbols):
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n_bars)))
+        data = pd.DataFrame({
+            'Open': close * (1 + rng.normal(0, 0.005, n_bars)),
+            'High': close * (1 + np.abs(rng.normal(0, 0.01, n_bars))),
+            'Low': close * (1 - np.abs(rng.normal(0, 0.01, n_bars))),
+            'Close': close,
+            'Volume': rng.integers(10_000, 1_000_000, n_bars).astype(np.float64)
+        }, index=index)
+        
+        results = {}
+        for method in timings:
+            model = PredictionModel(forecast_method=method)
+            features = model.prepare_features(data)
+            start = time.perf_counter()
+            results[method] = model.ensemble_prediction(features, years_ahead)['Predicted_Price'].to_numpy()
+            timings[method].append(time.perf_counter() - start)
+        
+        max_error = max(max_error, float(np.max(np.abs(results['batched'] - results['recursive']) / np.abs(results['recursive']))))
+    
+    recursive, batched = float(np.mean(timings['recursive'])), float(np.mean(timings['batched']))
+    return {
+        'symbols': n_symbols,
+        'horizon_days': years_ahead * 252,
+        'recursive_seconds_per_symbol': recursive,
+        'batched_seconds_per_symbol': batched,
+        'speedup': recursive / batched,
+        'max_relative_error': max_error
+    }
+
+
+if __name__ == "__main__":
+    # python -m utils.prediction_model
+    result = benchmark_forecast()
+    print(
+        f"{result['symbols']} symbols, {result['horizon_days']}-day horizon: "
+        f"recursive {result['recursive_seconds_per_symbol']:.2f} s/symbol, "
+        f"batched {result['batched_seconds_per_symbol']:.2f} s/symbol "
+        f"({result['speedup']:.1f}x, max rel. error {result['max_relative_error']:.2e})"
+    )
@@ -0,0 +1,195 @@
+import hashlib
+import threading
+import numpy as np
+from utils.correlation import daily_returns
+
+# NIFTY 50, the benchmark for beta
+BENCHMARK = "^NSEI"
+
+TRADING_DAYS = 252
+
+
+class CovarianceCache:
+    """Return covariance over the union of symbols requested so far
+
+    Holds centred returns for one window (same dates) and their
+    covariance. Requests for symbols already covered are served by slicing;
+    new symbols only add their own rows/columns to the matrix. New dates,
+    or a covered symbol whose returns changed (e.g. a revised last bar),
+    start the union again.
+    """
+
+    def __init__(self):
+        self.symbols = []
+        self.centred = None
+        self.mean = None
+        self.covariance = None
+        self.index = None
+        self.builds = 0  # Covariance products computed, for checking reuse
+        self._positions = {}
+        self._digests = {}  # symbol -> digest of the returns it was built from
+        self._lock = threading.Lock()
+
+    def get(self, returns):
+        """(mean, covariance) for the columns of a returns panel"""
+        symbols = list(returns.columns)
+        values = returns.to_numpy(dtype=np.float64)
+        digests = [hashlib.md5(np.ascontiguousarray(values[:, i]).tobytes()).hexdigest() for i in range(len(symbols))]
+        with self._lock:
+            if (self.index is None or not self.index.equals(returns.index) or
+                    any(self._digests.get(symbol, digest) != digest for symbol, digest in zip(symbols, digests))):
+                self._reset()
+                self.index = returns.index
+
+            new = [i for i, symbol in enumerate(symbols) if symbol not in self._positions]
+            if new:
+                self._add(values[:, new], [symbols[i] for i in new])
+                self._digests.update({symbols[i]: digests[i] for i in new})
+
+            positions = np.array([self._positions[symbol] for symbol in symbols])
+            return self.mean[positions], self.covariance[np.ix_(positions, positions)]
+
+    def _reset(self):
+        self.symbols = []
+        self._positions = {}
+        self._digests = {}
+        self.centred = None
+        self.mean = None
+        self.covariance = None
+
+    def _add(self, values, symbols):
+        mean = values.mean(axis=0)
+        centred = values - mean
+        denominator = max(len(values) - 1, 1)
+        self.builds += 1
+
+        if self.centred is None:
+            self.centred = centred
+            self.mean = mean
+            self.covariance = centred.T @ centred / denominator
+        else:
+            # Only the new rows/columns of the matrix are computed
+            cross = self.centred.T @ centred / denominator
+            own = centred.T @ centred / denominator
+            self.covariance = np.block([[self.covariance, cross], [cross.T, own]])
+            self.centred = np.hstack([self.centred, centred])
+            self.mean = np.concatenate([self.mean, mean])
+
+        start = len(self.symbols)
+        self.symbols.extend(symbols)
+        self._positions.update({symbol: start + i for i, symbol in enumerate(symbols)})
+
+
+def _tail(pnl, confidence):
+    """(VaR, CVaR) as positive losses from a vector of P&L scenarios"""
+    var = -np.quantile(pnl, 1 - confidence)
+    tail = pnl[pnl <= -var]
+    cvar = -tail.mean() if len(tail) else var
+    return var, cvar
+
+
+class RiskEngine:
+    """Portfolio risk from a close panel and per-symbol exposures
+
+    Historical simulation applies every past return row to today's
+    exposures; Monte Carlo draws correlated normal returns from the cached
+    covariance in chunks of scenarios. Both are plain matrix products over
+    (scenarios x assets), seeded, and can run in float32.
+
+    Both methods estimate one-day VaR/CVaR and scale it to a `horizon`-day
+    figure with the square-root-of-time rule (losses times sqrt(horizon)),
+    so the two are always on the same convention.
+    """
+
+    def __init__(self, covariance_cache=None, seed=42, dtype=np.float64, chunk_size=20_000):
+        self.covariance_cache = covariance_cache if covariance_cache is not None else get_covariance_cache()
+        self.seed = seed
+        self.dtype = dtype
+        self.chunk_size = chunk_size
+
+    def compute(self, close, exposures, confidence=0.95, horizon=1, simulations=10_000, lookback=250,
+                benchmark=BENCHMARK):
+        """Risk figures for a portfolio
+
+        `close` is a (date x symbol) panel holding every exposure symbol and
+        optionally the benchmark; `exposures` maps symbol -> market value.
+        Losses are in currency, scaled from one day to `horizon` days by
+        sqrt(horizon).
+        """
+        symbols = [symbol for symbol in exposures if symbol in close.columns]
+        returns = daily_returns(close).iloc[-lookback:]
+        if not symbols or len(returns) < 2:
+            return None
+
+        exposure = np.array([exposures[symbol] for symbol in symbols], dtype=self.dtype)
+        asset_returns = returns[symbols].to_numpy(dtype=self.dtype)
+        value = float(exposure.sum())
+        scale = np.sqrt(horizon)
+
+        # Historical simulation: (days x assets) @ (assets,)
+        pnl = asset_returns @ exposure
+        hist_var, hist_cvar = _tail(pnl, confidence)
+
+        daily_vol = float(np.std(pnl, ddof=1) / value) if value else 0.0
+
+        beta = None
+        if benchmark in returns.columns:
+            market = returns[benchmark].to_numpy(dtype=self.dtype)
+            market_var = np.var(market, ddof=1)
+            if market_var > 0 and value:
+                beta = float(np.cov(pnl / value, market)[0, 1] / market_var)
+
+        mc_var, mc_cvar = self.monte_carlo(returns[symbols], exposure, confidence, horizon, simulations)
+
+        return {
+            'value': value,
+            'confidence': confidence,
+            'horizon': horizon,
+            'observations': len(returns),
+            'historical_var': float(hist_var * scale),
+            'historical_cvar': float(hist_cvar * scale),
+            'monte_carlo_var': mc_var,
+            'monte_carlo_cvar': mc_cvar,
+            'daily_volatility': daily_vol,
+            'annual_volatility': float(daily_vol * np.sqrt(TRADING_DAYS)),
+            'beta': beta
+        }
+
+    def monte_carlo(self, returns, exposure, confidence=0.95, horizon=1, simulations=10_000):
+        """(VaR, CVaR) from one-day correlated normal scenarios, scaled by sqrt(horizon)"""
+        mean, covariance = self.covariance_cache.get(returns)
+        mean = mean.astype(self.dtype)
+        exposure = np.asarray(exposure, dtype=self.dtype)
+
+        # Cholesky factor, with a small ridge if the sample matrix is singular
+        ridge = 0.0
+        while True:
+            try:
+                factor = np.linalg.cholesky(covariance + ridge * np.eye(len(covariance))).astype(self.dtype)
+                break
+            except np.linalg.LinAlgError:
+                ridge = max(ridge * 10, 1e-12)
+
+        rng = np.random.default_rng(self.seed)
+        pnl = np.empty(simulations, dtype=self.dtype)
+        for start in range(0, simulations, self.chunk_size):
+            stop = min(start + self.chunk_size, simulations)
+            shocks = rng.standard_normal((stop - start, len(mean)), dtype=self.dtype)
+            pnl[start:stop] = (shocks @ factor.T + mean) @ exposure
+
+        var, cvar = _tail(pnl, confidence)
+        scale = np.sqrt(horizon)
+        return float(var * scale), float(cvar * scale)
+
+
+_covariance_cache = None
+_covariance_cache_lock = threading.Lock()
+
+
+def get_covariance_cache():
+    """Process-wide CovarianceCache shared by every user's risk figures"""
+    global _covariance_cache
+    with _covariance_cache_lock:
+        if _covariance_cache is None:
+            _covariance_cache = CovarianceCache()
+        return _covariance_cache
@@ -0,0 +1,223 @@
+import time
+import threading
+import numpy as np
+import pandas as pd
+from utils.indicator_kernels import compute_panel_indicators
+from utils.market_snapshot import SymbolRegistry
+from utils.sector_index import get_sector_index
+
+# Numeric screener columns, in display order
+SCREENER_COLUMNS = [
+    'price', 'change_pct', 'volume', 'avg_volume',
+    'rsi', 'sma_20', 'sma_50', 'macd', 'macd_histogram',
+    'bb_upper', 'bb_lower'
+]
+
+# Kernel indicator feeding each indicator column
+_INDICATOR_COLUMNS = {
+    'avg_volume': 'Volume_SMA',
+    'rsi': 'RSI',
+    'sma_20': 'SMA_20',
+    'sma_50': 'SMA_50',
+    'macd': 'MACD',
+    'macd_histogram': 'MACD_histogram',
+    'bb_upper': 'BB_upper',
+    'bb_lower': 'BB_lower'
+}
+
+# Filter operators; each maps (column array, value) to a boolean mask
+OPERATORS = {
+    '<': np.less,
+    '<=': np.less_equal,
+    '>': np.greater,
+    '>=': np.greater_equal,
+    '==': np.equal,
+    '!=': np.not_equal,
+    'in': lambda values, options: np.isin(values, list(options)),
+    'between': lambda values, bounds: (values >= bounds[0]) & (values <= bounds[1])
+}
+
+
+def right_align(values):
+    """Move each column's valid values to the bottom, keeping their order
+
+    Gaps (holidays, suspensions, late listings) then look like a shorter
+    history, so the last row holds what the per-symbol path would compute.
+    Returns (aligned values, row order) so other panels can follow.
+    """
+    order = np.argsort(~np.isnan(values), axis=0, kind='stable')
+    return np.take_along_axis(values, order, axis=0), order
+
+
+def compile_filters(filters):
+    """Turn (column, operator, value) specs into a function table -> mask
+
+    `value` may name another numeric column, e.g. ('price', '>', 'sma_50').
+    """
+    compiled = []
+    for column, operator, value in filters or []:
+        if operator not in OPERATORS:
+            raise ValueError(f"Unknown screener operator: {operator}")
+        compiled.append((column, OPERATORS[operator], value))
+
+    def mask(table):
+        result = np.ones(len(table), dtype=bool)
+        with np.errstate(invalid='ignore'):
+            for column, op, value in compiled:
+                if isinstance(value, str) and value in table.columns:
+                    value = table.columns[value]
+                result &= op(table.columns[column], value)
+        return result
+
+    return mask
+
+
+class ScreenerTable(SymbolRegistry):
+    """Per-symbol indicator table for a whole universe
+
+    Holds trailing close/volume panels of `lookback_bars` rows and one NumPy
+    array per screener column, indexed by symbol position. New bars are
+    merged into the panels and only the affected symbols are recomputed
+    with the batched kernels, so a screen is just a few vectorized masks.
+    """
+
+    def __init__(self, lookback_bars=250, sectors=None):
+        self.lookback_bars = lookback_bars
+        self.sector_of = {}
+        for sector, symbols in (sectors or {}).items():
+            for symbol in symbols:
+                self.sector_of.setdefault(symbol, sector)
+
+        self.columns = {name: np.array([], dtype=np.float64) for name in SCREENER_COLUMNS}
+        self.columns['sector'] = np.array([], dtype=object)
+        self.close = pd.DataFrame()
+        self.volume = pd.DataFrame()
+        # Reentrant: update_bars adds symbols while holding the lock
+        super().__init__(lock=threading.RLock())
+
+    def _grow(self, new):
+        for name in SCREENER_COLUMNS:
+            self.columns[name] = np.concatenate([self.columns[name], np.full(len(new), np.nan)])
+        sectors = np.array([self.sector_of.get(symbol, "Other") for symbol in new], dtype=object)
+        self.columns['sector'] = np.concatenate([self.columns['sector'], sectors])
+
+    def loaded_symbols(self):
+        """Symbols whose history is held in the panels"""
+        return set(self.close.columns)
+
+    def last_dates(self, symbols):
+        """{symbol: date of its last held close} (None if nothing is held)"""
+        with self._lock:
+            held = [symbol for symbol in symbols if symbol in self.close.columns]
+            dates = dict.fromkeys(symbols)
+            if held and len(self.close):
+                valid = ~np.isnan(self.close[held].to_numpy(dtype=np.float64))
+                last_rows = len(valid) - 1 - np.argmax(valid[::-1], axis=0)
+                for symbol, row, any_valid in zip(held, last_rows, valid.any(axis=0)):
+                    if any_valid:
+                        dates[symbol] = self.close.index[row]
+            return dates
+
+    def update_bars(self, close, volume=None, ttl=None):
+        """Merge new (date x symbol) bars and recompute only those symbols
+
+        Bars for dates already held replace the old values, so a refreshed
+        last session overwrites its earlier partial bar.
+        """
+        if close is None or close.empty:
+            return
+
+        with self._lock:
+            updated = list(close.columns)
+            self.add_symbols(updated)
+            volume = volume if volume is not None else pd.DataFrame(np.nan, index=close.index, columns=close.columns)
+
+            self.close = self._merge(self.close, close)
+            self.volume = self._merge(self.volume, volume.reindex(columns=close.columns))
+            self._recompute(updated)
+
+            if ttl is not None:
+                self.expires[self.positions(updated)] = time.time() + ttl
+
+    def _merge(self, held, new):
+        if held.empty:
+            merged = new.sort_index()
+        else:
+            # Align once and merge as arrays; new non-NaN values win
+            index = held.index.union(new.index)
+            columns = held.columns.append(new.columns.difference(held.columns))
+            base = held.reindex(index=index, columns=columns).to_numpy(dtype=np.float64)
+            update = new.reindex(index=index, columns=columns).to_numpy(dtype=np.float64)
+            merged = pd.DataFrame(np.where(np.isnan(update), base, update), index=index, columns=columns)
+        return merged.iloc[-self.lookback_bars:]
+
+    def _recompute(self, symbols):
+        close = self.close[symbols].to_numpy(dtype=np.float64)
+        volume = self.volume.reindex(index=self.close.index, columns=symbols).to_numpy(dtype=np.float64)
+
+        close, order = right_align(close)
+        volume = np.take_along_axis(volume, order, axis=0)
+        indicators = compute_panel_indicators(close, volume)
+
+        positions = self.positions(symbols)
+        last = close[-1] if len(close) else np.full(len(symbols), np.nan)
+        prev = close[-2] if len(close) > 1 else np.full(len(symbols), np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            change = (last - prev) / prev * 100
+
+        self.columns['price'][positions] = last
+        self.columns['change_pct'][positions] = change
+        self.columns['volume'][positions] = volume[-1] if len(volume) else np.nan
+        for name, indicator in _INDICATOR_COLUMNS.items():
+            values = indicators[indicator]
+            self.columns[name][positions] = values[-1] if len(values) else np.nan
+
+    def screen(self, filters=None, sort_by='change_pct', ascending=False, page=0, page_size=25):
+        """Rows matching every filter, sorted and paged
+
+        Returns (page DataFrame, total matches). Symbols without data never
+        match, and NaN sort keys go last.
+        """
+        with self._lock:
+            mask = compile_filters(filters)(self) & ~np.isnan(self.columns['price'])
+            matches = np.flatnonzero(mask)
+
+            if sort_by is not None and len(matches):
+                keys = self.columns[sort_by][matches]
+                if keys.dtype == object:
+                    order = np.argsort(keys.astype(str), kind='stable')
+                    order = order[::-1] if not ascending else order
+                else:
+                    keys = keys if ascending else -keys
+                    order = np.argsort(np.where(np.isnan(keys), np.inf, keys), kind='stable')
+                matches = matches[order]
+
+            rows = matches[page * page_size:(page + 1) * page_size]
+            return self._frame(rows), len(matches)
+
+    def frame(self):
+        """The whole table as a DataFrame"""
+        with self._lock:
+            return self._frame(np.arange(len(self.symbols)))
+
+    def _frame(self, rows):
+        data = {'symbol': self.symbols[rows], 'name': [symbol.replace('.NS', '') for symbol in self.symbols[rows]]}
+        data['sector'] = self.columns['sector'][rows]
+        data.update({name: self.columns[name][rows] for name in SCREENER_COLUMNS})
+        return pd.DataFrame(data)
+
+
+_screener_table = None
+_screener_table_lock = threading.Lock()
+
+
+def get_screener_table():
+    """Process-wide ScreenerTable with NSE sector labels"""
+    global _screener_table
+    with _screener_table_lock:
+        if _screener_table is None:
+            sector_index = get_sector_index()
+            _screener_table = ScreenerTable(sectors={
+                name: list(basket) for name, basket in sector_index.baskets.items()
+            })
+        return _screener_table
@@ -0,0 +1,120 @@
+import os
+import threading
+import numpy as np
+import pandas as pd
+
+# Constituents used for the sector performance chart
+NSE_SECTORS = {
+    "Banking": ["HDFCBANK.NS", "ICICIBANK.NS", "SBIN.NS", "KOTAKBANK.NS", "AXISBANK.NS"],
+    "IT": ["TCS.NS", "INFY.NS", "WIPRO.NS", "HCLTECH.NS", "TECHM.NS"],
+    "Auto": ["MARUTI.NS", "M&M.NS", "TATAMOTORS.NS", "BAJAJ-AUTO.NS", "HEROMOTOCO.NS"],
+    "Pharma": ["SUNPHARMA.NS", "DRREDDY.NS", "CIPLA.NS", "DIVISLAB.NS", "LUPIN.NS"],
+    "FMCG": ["HINDUNILVR.NS", "ITC.NS", "NESTLEIND.NS", "BRITANNIA.NS", "DABUR.NS"]
+}
+
+
+def load_weights(path=None):
+    """Optional symbol -> weight map (market cap or free-float market cap)
+
+    Reads a CSV with SYMBOL and WEIGHT columns from `path`, the
+    SECTOR_WEIGHTS_FILE environment variable or data/sector_weights.csv.
+    Returns None (equal weights) when no file is found.
+    """
+    path = path or os.environ.get("SECTOR_WEIGHTS_FILE", os.path.join("data", "sector_weights.csv"))
+    if not os.path.exists(path):
+        return None
+
+    try:
+        weights = pd.read_csv(path)
+        weights.columns = [column.strip().upper() for column in weights.columns]
+        return dict(zip(weights["SYMBOL"].str.strip(), weights["WEIGHT"].astype(float)))
+    except Exception as e:
+        print(f"Error reading sector weights {path}: {str(e)}")
+        return None
+
+
+class SectorIndex:
+    """Weighted sector and custom-basket indices over a shared MarketSnapshot
+
+    Baskets are rows of a membership/weight matrix aligned with the
+    snapshot's symbol positions, so every basket is computed in one matrix
+    product against the snapshot's change vector. Constituents without a
+    quote are dropped and the remaining weights renormalized.
+    """
+
+    def __init__(self, sectors=None, weights=None):
+        self.weights = weights or {}
+        self.baskets = {}
+        self._matrix = None
+        self._matrix_key = None
+        self._lock = threading.Lock()
+
+        for name, symbols in (NSE_SECTORS if sectors is None else sectors).items():
+            self.add_basket(name, symbols)
+
+    def add_basket(self, name, symbols, weights=None):
+        """Add or replace a basket; weights default to the index-wide weight map, else equal"""
+        if weights is None:
+            weights = [self.weights.get(symbol, 1.0) for symbol in symbols]
+        elif isinstance(weights, dict):
+            weights = [weights.get(symbol, 0.0) for symbol in symbols]
+
+        with self._lock:
+            self.baskets[name] = dict(zip(symbols, np.asarray(weights, dtype=np.float64)))
+            self._matrix = None
+
+    def remove_basket(self, name):
+        with self._lock:
+            self.baskets.pop(name, None)
+            self._matrix = None
+
+    def symbols(self):
+        """Every constituent across all baskets"""
+        return list(dict.fromkeys(symbol for basket in self.baskets.values() for symbol in basket))
+
+    def matrix(self, snapshot):
+        """(baskets x snapshot symbols) weight matrix, rebuilt only when either side changes"""
+        with self._lock:
+            key = (id(snapshot), len(snapshot))
+            if self._matrix is None or self._matrix_key != key:
+                snapshot.add_symbols(self.symbols())
+                matrix = np.zeros((len(self.baskets), len(snapshot)))
+                for row, basket in enumerate(self.baskets.values()):
+                    matrix[row, snapshot.positions(list(basket))] = list(basket.values())
+                self._matrix = matrix
+                self._matrix_key = (id(snapshot), len(snapshot))
+            return self._matrix
+
+    def compute(self, snapshot):
+        """Weighted change % per basket (baskets without any quote are omitted)"""
+        matrix = self.matrix(snapshot)
+        change = snapshot.change_pct()
+        # Symbols are only ever appended, so the common prefix lines up even
+        # if another session grew the snapshot in between
+        n = min(matrix.shape[1], len(change))
+        matrix, change = matrix[:, :n], change[:n]
+        valid = ~np.isnan(change)
+
+        # Weighted sum and weight coverage in one product
+        totals = matrix @ np.column_stack([np.where(valid, change, 0.0), valid])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            performance = totals[:, 0] / totals[:, 1]
+
+        return {
+            name: performance[row]
+            for row, name in enumerate(self.baskets)
+            if totals[row, 1] > 0
+        }
+
+
+_sector_index = None
+_sector_index_lock = threading.Lock()
+
+
+def get_sector_index():
+    """Process-wide SectorIndex over NSE_SECTORS with optional file weights"""
+    global _sector_index
+    with _sector_index_lock:
+        if _sector_index is None:
+            _sector_index = SectorIndex(weights=load_weights())
+        return _sector_index
@@ -0,0 +1,202 @@
+import sys
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+
+def estimate_size(value):
+    """Rough in-memory size of a cached value in bytes"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+def data_fingerprint(index, values):
+    """Identify a dataset by its last bar, length and a digest of its values"""
+    if len(index) == 0:
+        return "empty"
+    digest = hashlib.md5(np.ascontiguousarray(values, dtype=np.float64).tobytes()).hexdigest()[:16]
+    return f"{index[-1].isoformat()}:{len(index)}:{digest}"
+
+
+class _Flight:
+    """A load in progress that other callers can wait on"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SharedCache:
+    """Thread-safe TTL cache shared by every session in the process
+
+    Entries are evicted least-recently-used first once either the entry count
+    or the estimated byte size goes over its bound. Concurrent loads of the
+    same key are collapsed into a single call (single-flight).
+    """
+
+    def __init__(self, max_entries=512, max_bytes=256 * 1024 * 1024, default_ttl=300):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()  # key -> (value, expires_at, size)
+        self._inflight = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Return a fresh cached value, or None"""
+        with self._lock:
+            value = self._lookup(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return value
+
+    def get_stale(self, key):
+        """Return a cached value even if its TTL has expired, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[0] if entry is not None else None
+
+    def set(self, key, value, ttl=None):
+        """Store a value; values larger than the whole byte budget are skipped"""
+        ttl = self.default_ttl if ttl is None else ttl
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[2]
+
+            self._entries[key] = (value, time.time() + ttl, size)
+            self._bytes += size
+            self._evict()
+
+    def invalidate(self, key):
+        """Drop a single key"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry[2]
+
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def single_flight(self, key, loader):
+        """Run `loader` once for all concurrent callers asking for `key`
+
+        The first caller runs the loader; everyone else arriving before it
+        finishes waits and receives the same result (or exception).
+        """
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._inflight[key] = flight
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = loader()
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.event.set()
+
+        return flight.result
+
+    def get_or_load(self, key, loader, ttl=None):
+        """Return the cached value for `key`, loading it once if missing
+
+        A loader returning None is treated as "no data" and is not cached.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        def load_and_store():
+            # Another flight may have filled the entry while we queued
+            with self._lock:
+                cached = self._lookup(key)
+            if cached is not None:
+                return cached
+
+            self.loads += 1
+            result = loader()
+            if result is not None:
+                self.set(key, result, ttl)
+            return result
+
+        return self.single_flight(key, load_and_store)
+
+    def stats(self):
+        """Counters for monitoring cache behaviour"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'loads': self.loads,
+                'evictions': self.evictions,
+                'inflight': len(self._inflight)
+            }
+
+    def _lookup(self, key):
+        # Caller holds the lock
+        entry = self._entries.get(key)
+        if entry is None or entry[1] <= time.time():
+            return None
+
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def _evict(self):
+        # Caller holds the lock
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, (_, _, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_shared_cache():
+    """Process-wide SharedCache instance"""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = SharedCache()
+        return _shared_cache
@@ -1,69 +1,223 @@
-import yfinance as yf
 import pandas as pd
 import requests
 import streamlit as st
 from datetime import datetime, timedelta
 import time
+import hashlib
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from utils.ohlcv_store import get_default_store, period_start, slice_period, PERIOD_BARS
+from utils.shared_cache import get_shared_cache
+from utils.market_calendar import NSE_CALENDAR
+from utils.intraday_buffer import get_intraday_buffer
+from utils.streaming_indicators import get_live_indicator_book
+from utils.upstream_gateway import get_gateway
+from utils.data_providers import get_provider, align_timezones
+from utils.market_snapshot import get_market_snapshot, load_nse_universe
+from utils.sector_index import get_sector_index
+from utils.screener import get_screener_table
+from utils.correlation import get_correlation_engine, daily_returns, top_correlated
+from utils.portfolio import get_portfolio_manager
+from utils.risk import RiskEngine, BENCHMARK
+from utils.backtester import run_strategy, sweep
+from utils.walk_forward import walk_forward
+from utils.indicators import get_indicator_engine
 
 class StockDataFetcher:
-    def __init__(self):
-        self.cache_duration = 300  # 5 minutes cache
-        self.last_fetch = {}
-        self.cached_data = {}
-    
-    def get_stock_data(self, symbol, period="1mo"):
-        """Fetch stock data with caching"""
-        cache_key = f"{symbol}_{period}"
-        current_time = time.time()
-        
-        # Check if we have cached data that's still fresh
-        if (cache_key in self.cached_data and 
-            cache_key in self.last_fetch and 
-            current_time - self.last_fetch[cache_key] < self.cache_duration):
-            return self.cached_data[cache_key]
+    def __init__(self, max_workers=8, store=None, cache=None, calendar=None, gateway=None, provider=None,
+                 intraday=None):
+        self.cache_duration = 300  # 5 minutes cache while the market is open
+        self.max_workers = max_workers  # Thread pool size for batch fetches
+        # Batches larger than this are cached as one entry, not one per symbol,
+        # so a universe-wide refresh cannot flush every other cached value
+        self.batch_cache_threshold = 64
+        # Screener symbols idle longer than this are reloaded, not topped up
+        self.screener_top_up_days = 14
+        self.store = store if store is not None else get_default_store()
+        # Process-wide cache, shared by every fetcher and every session
+        self.cache = cache if cache is not None else get_shared_cache()
+        # Session calendar decides how long fetched data stays valid
+        self.calendar = calendar if calendar is not None else NSE_CALENDAR
+        # Today's minute bars, topped up incrementally for live quotes
+        self.intraday = intraday if intraday is not None else get_intraday_buffer()
+        # Rate limiting, retries and circuit breaking for every upstream call
+        self.gateway = gateway if gateway is not None else get_gateway()
+        # Backend serving the data (yfinance, or record/replay for offline runs)
+        self.provider = provider if provider is not None else get_provider()
+    
+    def get_stock_data(self, symbol, period="1mo", interval="1d"):
+        """Fetch stock data with caching
+        
+        Full history is kept in the local OHLCV store, so only bars newer
+        than the last stored one are requested from upstream. The cache holds
+        the widest range loaded per symbol/interval and serves any narrower
+        period as a slice of it.
+        """
+        history_key = self._history_key(symbol, interval)
+        required_start = period_start(period, pd.Timestamp.now(tz="Asia/Kolkata"))
+        
+        def load():
+            history, covered_from = self._load_history(symbol, period, interval, time.time())
+            if history is None or history.empty:
+                return None
+            # Lets the indicator engine memoize on slices of this frame
+            history.attrs['symbol'] = symbol
+            history.attrs['interval'] = interval
+            return history, covered_from
         
         try:
-            # Create ticker object
-            ticker = yf.Ticker(symbol)
+            entry = self.cache.get(history_key)
             
-            # Fetch historical data
-            data = ticker.history(period=period)
+            # Only go upstream when the period reaches past the cached range
+            if entry is None or entry[1] is None or entry[1] > required_start:
+                entry = self.cache.single_flight((history_key, period), load)
+                if entry is not None:
+                    self._publish_history(history_key, entry)
             
-            if data.empty:
+            if entry is None:
                 st.error(f"No data found for symbol: {symbol}")
                 return None
             
-            # Cache the data
-            self.cached_data[cache_key] = data
-            self.last_fetch[cache_key] = current_time
-            
-            return data
+            return slice_period(entry[0], period)
             
         except Exception as e:
             st.error(f"Error fetching data for {symbol}: {str(e)}")
             return None
     
+    def _publish_history(self, history_key, entry):
+        """Cache a loaded history unless a wider one is already cached"""
+        cached = self.cache.get_stale(history_key)
+        if (cached is not None and cached[1] is not None and
+            (entry[1] is None or cached[1] < entry[1]) and
+            cached[0].index[-1] >= entry[0].index[-1]):
+            return
+        self.cache.set(history_key, entry, ttl=self.calendar.cache_ttl(self.cache_duration))
+    
+    def _load_history(self, symbol, period, interval, current_time):
+        """Return (history, covered_from) for a symbol, topping it up from upstream
+        
+        Backfills when the store does not reach back far enough for `period`,
+        otherwise fetches only the bars after the last stored timestamp.
+        Falls back to the stored bars if upstream is unavailable.
+        """
+        now = pd.Timestamp.now(tz="Asia/Kolkata")
+        required_start = period_start(period, now)
+        
+        stored = self.store.load(symbol, interval)
+        meta = self.store.load_meta(symbol, interval)
+        covered_from = meta.get('covered_from')
+        
+        if stored is None or stored.empty or covered_from is None or covered_from > required_start:
+            # Not enough local history - fetch the whole range once
+            fetch_period = "1mo" if period in PERIOD_BARS else period
+            data = self._fetch_history(symbol, fetch_period, interval)
+            if data is None or data.empty:
+                return stored, covered_from
+            
+            fetched_from = period_start(fetch_period, now)
+            if covered_from is not None:
+                fetched_from = min(fetched_from, covered_from)
+            history = self.store.append(symbol, interval, data, covered_from=fetched_from, updated_at=current_time)
+            return history, fetched_from
+        
+        # Nothing to fetch if no session has traded since the last refresh
+        updated_at = meta.get('updated_at') or 0
+        if (current_time - updated_at < self.cache_duration or
+            not self.calendar.has_new_data_since(updated_at)):
+            return stored, covered_from
+        
+        # Incremental top-up: only bars from the last stored one onwards
+        try:
+            new_data = self.gateway.call(
+                symbol, self.provider.history, symbol, start=stored.index[-1], interval=interval
+            )
+        except Exception as e:
+            print(f"Serving stored data for {symbol}, refresh failed: {str(e)}")
+            return stored, covered_from
+        
+        history = self.store.append(symbol, interval, new_data, updated_at=current_time)
+        return history, covered_from
+    
     def get_real_time_price(self, symbol):
         """Get real-time price for a stock"""
         try:
-            ticker = yf.Ticker(symbol)
-            data = ticker.history(period="1d", interval="1m")
-            
-            if not data.empty:
-                return data['Close'].iloc[-1]
-            else:
-                return None
-                
+            # Only bars after the last buffered one are fetched
+            self.intraday.refresh(symbol, self._fetch_intraday)
         except Exception as e:
-            st.error(f"Error fetching real-time price for {symbol}: {str(e)}")
+            if self.intraday.latest_quote(symbol) is None:
+                st.error(f"Error fetching real-time price for {symbol}: {str(e)}")
+                return None
+        
+        # Falls back to the last buffered quote when the refresh failed
+        quote = self.intraday.latest_quote(symbol)
+        
+        if quote is not None:
+            return quote['price']
+        else:
             return None
     
+    def get_real_time_prices(self, symbols):
+        """Get real-time prices for a watchlist with one grouped request"""
+        try:
+            self.intraday.refresh_many(symbols, self._fetch_intraday_many)
+        except Exception as e:
+            st.warning(f"Could not refresh real-time prices: {str(e)}")
+        
+        prices = {}
+        for symbol in symbols:
+            quote = self.intraday.latest_quote(symbol)
+            if quote is not None:
+                prices[symbol] = quote['price']
+        
+        return prices
+    
+    def get_live_indicators(self, symbols):
+        """Minute-bar indicators per symbol, advanced incrementally
+        
+        Only completed bars are fed to the streaming state, so each refresh
+        costs O(new bars) per symbol instead of a full recomputation.
+        """
+        try:
+            self.intraday.refresh_many(symbols, self._fetch_intraday_many)
+        except Exception as e:
+            st.warning(f"Could not refresh live indicators: {str(e)}")
+        
+        book = get_live_indicator_book()
+        indicators = {}
+        for symbol in symbols:
+            bars = self.intraday.get_bars(symbol)
+            if bars is None or len(bars) < 2:
+                continue
+            # The last bar is still forming
+            indicators[symbol] = book.update(symbol, bars.iloc[:-1])
+        
+        return indicators
+    
+    def get_latest_quote(self, symbol):
+        """Latest buffered quote (price, time, day OHLC, volume) without fetching"""
+        return self.intraday.latest_quote(symbol)
+    
+    def _fetch_intraday(self, symbol, start):
+        """Minute bars from `start`, or the whole latest session"""
+        if start is None:
+            return self.gateway.call(symbol, self.provider.history, symbol, period="1d", interval="1m")
+        return self.gateway.call(symbol, self.provider.history, symbol, start=start, interval="1m")
+    
+    def _fetch_intraday_many(self, symbols, start):
+        """Grouped minute bars from `start`, or the whole latest session"""
+        if start is None:
+            return self._download_grouped(symbols, "1d", "1m")
+        return self._download_grouped(symbols, interval="1m", start=start)
+    
     def get_stock_info(self, symbol):
         """Get detailed stock information"""
+        info = self.cache.get(f"{symbol}_info")
+        if info is not None:
+            return info
+        
         try:
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
+            info = self.gateway.call(symbol, self.provider.info, symbol, stale_key=f"{symbol}_info")
+            self.cache.set(f"{symbol}_info", info, ttl=self.calendar.cache_ttl(self.cache_duration))
             return info
         except Exception as e:
             st.error(f"Error fetching stock info for {symbol}: {str(e)}")
@@ -71,14 +225,203 @@ class StockDataFetcher:
     
     def get_multiple_stocks_data(self, symbols, period="1mo"):
         """Fetch data for multiple stocks"""
+        stocks_data, failures = self.get_batch_stock_data(symbols, period)
+        
+        if failures:
+            st.warning(f"Could not fetch data for: {', '.join(failures)}")
+        
+        return stocks_data
+    
+    def get_batch_stock_data(self, symbols, period="1mo", interval="1d"):
+        """Fetch data for many symbols in one batch
+        
+        Symbols are resolved with a single grouped download first; anything the
+        grouped call misses is retried concurrently on a bounded thread pool.
+        Returns a tuple of (data, failures) where data maps symbol -> DataFrame
+        and failures maps symbol -> error message. A failing symbol never
+        aborts the rest of the batch.
+        """
+        symbols = list(dict.fromkeys(symbols))
         stocks_data = {}
+        failures = {}
+        
+        if len(symbols) > self.batch_cache_threshold:
+            return self._get_large_batch(symbols, period, interval)
         
+        # Serve whatever is still fresh from the shared cache
+        pending = []
         for symbol in symbols:
-            data = self.get_stock_data(symbol, period)
+            data = self.cache.get(self._cache_key(symbol, period, interval))
             if data is not None:
                 stocks_data[symbol] = data
+            else:
+                pending.append(symbol)
         
-        return stocks_data
+        if pending:
+            # Identical batches from concurrent sessions share one fetch
+            flight_key = ("batch", period, interval, tuple(pending))
+            fetched, failures = self.cache.single_flight(
+                flight_key, lambda: self._fetch_batch(pending, period, interval)
+            )
+            stocks_data.update(fetched)
+        
+        # Keep the caller's symbol order (cached and fresh frames may differ in timezone)
+        stocks_data = align_timezones({symbol: stocks_data[symbol] for symbol in symbols if symbol in stocks_data})
+        
+        return stocks_data, failures
+    
+    def _get_large_batch(self, symbols, period, interval):
+        """Universe-sized batch, cached as one entry instead of one per symbol
+        
+        Only complete batches are cached, so failed symbols are retried on
+        the next call.
+        """
+        digest = hashlib.md5("|".join(symbols).encode()).hexdigest()
+        batch_key = ("batch", period, interval, len(symbols), digest)
+        
+        stocks_data = self.cache.get(batch_key)
+        if stocks_data is not None:
+            return stocks_data, {}
+        
+        def load():
+            fetched, failures = self._fetch_batch(symbols, period, interval, cache_symbols=False)
+            if not failures:
+                self.cache.set(batch_key, fetched, ttl=self.calendar.cache_ttl(self.cache_duration))
+            return fetched, failures
+        
+        stocks_data, failures = self.cache.single_flight(batch_key, load)
+        return {symbol: stocks_data[symbol] for symbol in symbols if symbol in stocks_data}, failures
+    
+    def _fetch_batch(self, symbols, period, interval, cache_symbols=True, start=None):
+        """Fetch symbols from upstream and publish them to the shared cache
+        
+        With `start`, bars from that date onwards are fetched instead of
+        `period`; such windows are not cached.
+        """
+        cache_symbols = cache_symbols and start is None
+        stocks_data = {}
+        failures = {}
+        
+        # Symbols with an open circuit are not sent upstream at all
+        blocked = [symbol for symbol in symbols if self.gateway.is_blocked(symbol)]
+        for symbol in blocked:
+            stale = self.cache.get_stale(self._cache_key(symbol, period, interval))
+            if stale is not None:
+                stocks_data[symbol] = stale
+            else:
+                failures[symbol] = "Upstream circuit open"
+        symbols = [symbol for symbol in symbols if symbol not in blocked]
+        
+        # One grouped round-trip for every symbol
+        try:
+            grouped = self._download_grouped(symbols, period, interval, start=start) if symbols else {}
+        except Exception as e:
+            grouped = {}
+            failures.update({symbol: str(e) for symbol in symbols})
+        
+        stocks_data.update(grouped)
+        missing = [symbol for symbol in symbols if symbol not in grouped]
+        
+        # Retry the stragglers individually, in parallel
+        if missing:
+            workers = max(1, min(self.max_workers, len(missing)))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    executor.submit(
+                        self._fetch_history, symbol, period, interval,
+                        stale_key=self._cache_key(symbol, period, interval) if start is None else None,
+                        start=start
+                    ): symbol
+                    for symbol in missing
+                }
+                for future in as_completed(futures):
+                    symbol = futures[future]
+                    try:
+                        data = future.result()
+                    except Exception as e:
+                        failures[symbol] = str(e)
+                        continue
+                    
+                    if data is None or data.empty:
+                        failures[symbol] = "No data found"
+                    else:
+                        stocks_data[symbol] = data
+                        failures.pop(symbol, None)
+        
+        # Grouped and retried frames must share a timezone to form panels
+        stocks_data = align_timezones(stocks_data)
+        
+        if cache_symbols:
+            ttl = self.calendar.cache_ttl(self.cache_duration)
+            for symbol, data in stocks_data.items():
+                if symbol not in blocked:
+                    self.cache.set(self._cache_key(symbol, period, interval), data, ttl=ttl)
+        
+        return stocks_data, failures
+    
+    def get_close_panel(self, symbols, period="1mo", interval="1d"):
+        """Fetch closing prices for many symbols as a wide (date x symbol) DataFrame
+        
+        Returns a tuple of (panel, failures) like get_batch_stock_data.
+        """
+        panels, failures = self.get_ohlcv_panels(symbols, period, interval, columns=("Close",))
+        
+        return panels["Close"], failures
+    
+    def get_ohlcv_panels(self, symbols, period="1mo", interval="1d", columns=("Close", "Volume")):
+        """Fetch several OHLCV columns as wide (date x symbol) DataFrames
+        
+        Returns a tuple of ({column: panel}, failures) from a single batch.
+        """
+        stocks_data, failures = self.get_batch_stock_data(symbols, period, interval)
+        
+        if not stocks_data:
+            return {column: pd.DataFrame() for column in columns}, failures
+        
+        panels = {
+            column: pd.DataFrame({symbol: data[column] for symbol, data in stocks_data.items()})
+            for column in columns
+        }
+        
+        return panels, failures
+    
+    def _history_key(self, symbol, interval="1d"):
+        """Cache key for the widest history loaded for a symbol/interval"""
+        return f"{symbol}_{interval}_history"
+    
+    def _cache_key(self, symbol, period, interval="1d"):
+        """Build the cache key for a symbol/period/interval combination"""
+        if interval == "1d":
+            return f"{symbol}_{period}"
+        return f"{symbol}_{period}_{interval}"
+    
+    def _fetch_history(self, symbol, period, interval="1d", stale_key=None, start=None):
+        """Fetch history for a single symbol without touching the UI"""
+        if start is not None:
+            return self.gateway.call(
+                symbol, self.provider.history, symbol, start=start, interval=interval, stale_key=stale_key
+            )
+        return self.gateway.call(
+            symbol, self.provider.history, symbol, period=period, interval=interval, stale_key=stale_key
+        )
+    
+    def _download_grouped(self, symbols, period=None, interval="1d", start=None):
+        """Download several symbols in one grouped request and split per symbol
+        
+        The breaker key is the endpoint plus the symbol group, so one failing
+        group does not short-circuit every other grouped download.
+        """
+        group = hashlib.md5("|".join(sorted(symbols)).encode()).hexdigest()[:12]
+        return self.gateway.call(
+            f"download:{group}", self.provider.download, symbols, period=period, interval=interval, start=start
+        )
+    
+    def get_feed_stats(self):
+        """Upstream gateway and shared cache counters"""
+        return {
+            'gateway': self.gateway.stats(),
+            'cache': self.cache.stats()
+        }
     
     def get_indian_market_indices(self):
         """Get major Indian market indices"""
@@ -92,97 +435,230 @@ class StockDataFetcher:
         
         indices_data = {}
         
+        index_data, failures = self.get_batch_stock_data(list(indices.values()), period="1d")
+        
         for name, symbol in indices.items():
-            try:
-                ticker = yf.Ticker(symbol)
-                data = ticker.history(period="1d")
-                if not data.empty:
-                    current_price = data['Close'].iloc[-1]
-                    prev_close = data['Close'].iloc[-2] if len(data) > 1 else current_price
-                    change = current_price - prev_close
-                    change_pct = (change / prev_close) * 100 if prev_close != 0 else 0
-                    
-                    indices_data[name] = {
-                        'price': current_price,
-                        'change': change,
-                        'change_pct': change_pct
-                    }
-            except Exception as e:
-                st.warning(f"Could not fetch data for {name}: {str(e)}")
+            if symbol in failures:
+                st.warning(f"Could not fetch data for {name}: {failures[symbol]}")
+                continue
+            
+            data = index_data.get(symbol)
+            if data is not None and not data.empty:
+                current_price = data['Close'].iloc[-1]
+                prev_close = data['Close'].iloc[-2] if len(data) > 1 else current_price
+                change = current_price - prev_close
+                change_pct = (change / prev_close) * 100 if prev_close != 0 else 0
+                
+                indices_data[name] = {
+                    'price': current_price,
+                    'change': change,
+                    'change_pct': change_pct
+                }
         
         return indices_data
     
-    def get_top_gainers_losers(self):
-        """Get top gainers and losers from Indian market"""
-        # Popular Indian stocks for analysis
-        indian_stocks = [
-            "RELIANCE.NS", "TCS.NS", "HDFCBANK.NS", "INFY.NS", "ICICIBANK.NS",
-            "SBIN.NS", "BHARTIARTL.NS", "ITC.NS", "KOTAKBANK.NS", "HINDUNILVR.NS",
-            "LT.NS", "AXISBANK.NS", "MARUTI.NS", "ASIANPAINT.NS", "WIPRO.NS"
-        ]
+    def default_universe(self):
+        """NSE equity universe plus every sector constituent, refreshed together"""
+        return list(dict.fromkeys(load_nse_universe() + get_sector_index().symbols()))
+    
+    def get_market_snapshot(self, universe=None):
+        """Shared cross-sectional quote snapshot, refreshing only expired symbols"""
+        universe = self.default_universe() if universe is None else list(universe)
+        snapshot = get_market_snapshot()
+        snapshot.add_symbols(universe)
         
-        stocks_performance = []
+        stale = snapshot.stale_symbols(universe)
+        if stale:
+            ttl = self.calendar.cache_ttl(self.cache_duration)
+            # "5d" so the previous close survives weekends and holidays
+            panel, failures = self.get_close_panel(stale, period="5d")
+            snapshot.update_from_panel(panel, ttl=ttl)
+            if failures:
+                snapshot.touch(list(failures), ttl=self.cache_duration)
         
-        for symbol in indian_stocks:
-            try:
-                ticker = yf.Ticker(symbol)
-                data = ticker.history(period="2d")
-                
-                if len(data) >= 2:
-                    current_price = data['Close'].iloc[-1]
-                    prev_price = data['Close'].iloc[-2]
-                    change_pct = ((current_price - prev_price) / prev_price) * 100
-                    
-                    stocks_performance.append({
-                        'symbol': symbol,
-                        'name': symbol.replace('.NS', ''),
-                        'current_price': current_price,
-                        'change_pct': change_pct
-                    })
-            except:
-                continue
+        return snapshot
+    
+    def get_top_gainers_losers(self, n=5, universe=None):
+        """Get top gainers and losers from Indian market
         
-        # Sort by performance
-        stocks_performance.sort(key=lambda x: x['change_pct'], reverse=True)
+        Covers the full NSE equity list when one is available locally
+        (see load_nse_universe), otherwise a set of popular large caps.
+        """
+        if universe is None:
+            # Refresh sector constituents in the same batch for get_sector_performance
+            snapshot = self.get_market_snapshot()
+            universe = load_nse_universe()
+        else:
+            universe = list(universe)
+            snapshot = self.get_market_snapshot(universe)
         
-        gainers = stocks_performance[:5]  # Top 5 gainers
-        losers = stocks_performance[-5:]  # Top 5 losers
+        gainers, losers = snapshot.top_movers(n, symbols=universe)
         
         return gainers, losers
     
-    def get_sector_performance(self):
-        """Get sector-wise performance"""
-        sectors = {
-            "Banking": ["HDFCBANK.NS", "ICICIBANK.NS", "SBIN.NS", "KOTAKBANK.NS", "AXISBANK.NS"],
-            "IT": ["TCS.NS", "INFY.NS", "WIPRO.NS", "HCLTECH.NS", "TECHM.NS"],
-            "Auto": ["MARUTI.NS", "M&M.NS", "TATAMOTORS.NS", "BAJAJ-AUTO.NS", "HEROMOTOCO.NS"],
-            "Pharma": ["SUNPHARMA.NS", "DRREDDY.NS", "CIPLA.NS", "DIVISLAB.NS", "LUPIN.NS"],
-            "FMCG": ["HINDUNILVR.NS", "ITC.NS", "NESTLEIND.NS", "BRITANNIA.NS", "DABUR.NS"]
-        }
+    def get_screener_table(self, universe=None):
+        """Shared per-symbol indicator table, refreshing only expired symbols
         
-        sector_performance = {}
+        Symbols seen for the first time load a year of history; afterwards
+        each symbol is topped up from the last date it holds, and just those
+        symbols are recomputed. A symbol whose last held bar is older than
+        `screener_top_up_days` is reloaded in full instead, so a long gap
+        never leaves a hole in its panel.
+        """
+        universe = self.default_universe() if universe is None else list(universe)
+        table = get_screener_table()
+        table.add_symbols(universe)
         
-        for sector, stocks in sectors.items():
-            sector_changes = []
+        stale = table.stale_symbols(universe)
+        if stale:
+            ttl = self.calendar.cache_ttl(self.cache_duration)
+            reload = []
+            top_ups = {}  # Start date -> symbols topped up from it
+            for symbol, last in table.last_dates(stale).items():
+                if last is None or pd.Timestamp.now(tz=last.tz) - last > pd.Timedelta(days=self.screener_top_up_days):
+                    reload.append(symbol)
+                else:
+                    top_ups.setdefault(last.normalize(), []).append(symbol)
             
-            for stock in stocks:
-                try:
-                    ticker = yf.Ticker(stock)
-                    data = ticker.history(period="2d")
-                    
-                    if len(data) >= 2:
-                        current_price = data['Close'].iloc[-1]
-                        prev_price = data['Close'].iloc[-2]
-                        change_pct = ((current_price - prev_price) / prev_price) * 100
-                        sector_changes.append(change_pct)
-                except:
+            batches = [(reload, "1y", None)] + [(symbols, None, start) for start, symbols in top_ups.items()]
+            for symbols, period, start in batches:
+                if not symbols:
                     continue
-            
-            if sector_changes:
-                avg_change = np.mean(sector_changes)
-                sector_performance[sector] = avg_change
+                if start is None:
+                    stocks_data, failures = self.get_batch_stock_data(symbols, period)
+                else:
+                    stocks_data, failures = self._fetch_batch(symbols, None, "1d", start=start)
+                if stocks_data:
+                    table.update_bars(
+                        pd.DataFrame({symbol: data["Close"] for symbol, data in stocks_data.items()}),
+                        pd.DataFrame({symbol: data["Volume"] for symbol, data in stocks_data.items()}),
+                        ttl=ttl
+                    )
+                if failures:
+                    table.touch(list(failures), ttl=self.cache_duration)
         
-        return sector_performance
+        return table
+    
+    def get_correlation_matrix(self, symbols, window=60):
+        """Correlation of daily returns over the last `window` sessions
+        
+        Built from cached closes; repeated calls for the same universe only
+        slide the rolling window over bars that arrived since.
+        """
+        panel, failures = self.get_close_panel(symbols, self._correlation_period(window))
+        if failures:
+            st.warning(f"Could not fetch data for: {', '.join(failures)}")
+        
+        if panel.empty:
+            return pd.DataFrame()
+        
+        ttl = self.calendar.cache_ttl(self.cache_duration)
+        return get_correlation_engine().matrix(panel, window, ttl=ttl)
+    
+    def get_correlated_pairs(self, symbol, universe=None, k=5, window=60):
+        """Most and least correlated symbols for one symbol, without the full matrix
+        
+        The pairs come from one matrix-vector product over the universe's
+        last `window` returns; for the default universe those returns are
+        cached per session (see get_universe_returns).
+        """
+        if universe is None:
+            returns = self.get_universe_returns(window)
+            if symbol not in returns.columns:
+                return [], []
+            return top_correlated(returns, symbol, k)
+        
+        universe = list(dict.fromkeys([symbol] + list(universe)))
+        panel, failures = self.get_close_panel(universe, self._correlation_period(window))
+        
+        if panel.empty:
+            return [], []
+        
+        return get_correlation_engine().top_pairs(panel, symbol, k, window)
+    
+    def get_universe_returns(self, window=60):
+        """Last `window` daily returns of the default universe, cached per (window, last session date)"""
+        session = self.calendar.last_close().date()
+        ttl = self.calendar.cache_ttl(self.cache_duration)
+        
+        def load():
+            panel, failures = self.get_close_panel(self.default_universe(), self._correlation_period(window))
+            returns = daily_returns(panel).iloc[-window:] if not panel.empty else None
+            # Nothing fetched is not cached
+            return returns if returns is not None and not returns.empty else None
+        
+        returns = self.cache.get_or_load(("universe_returns", window, session), load, ttl=ttl)
+        return returns if returns is not None else pd.DataFrame()
+    
+    def _correlation_period(self, window):
+        """Shortest history period holding `window` daily returns"""
+        if window <= 100:
+            return "6mo"
+        if window <= 220:
+            return "1y"
+        return "2y"
+    
+    def get_portfolio_valuation(self, username, manager=None):
+        """Value a user's portfolio with one batched quote lookup
+        
+        Returns (holdings DataFrame, totals dict); see PortfolioManager.value.
+        """
+        manager = manager if manager is not None else get_portfolio_manager()
+        snapshot = self.get_market_snapshot(manager.symbols_held(username))
+        
+        return manager.value(username, snapshot)
+    
+    def get_portfolio_risk(self, username, confidence=0.95, horizon=1, simulations=10000,
+                           manager=None, dtype=np.float64):
+        """VaR/CVaR, volatility and beta to NIFTY 50 for a user's holdings
+        
+        Returns a dict (see RiskEngine.compute), or None without holdings.
+        """
+        holdings, totals = self.get_portfolio_valuation(username, manager)
+        if holdings.empty:
+            return None
+        
+        exposures = dict(zip(holdings['symbol'], holdings['market_value']))
+        panel, failures = self.get_close_panel(list(exposures) + [BENCHMARK], "1y")
+        if panel.empty:
+            return None
+        
+        return RiskEngine(dtype=dtype).compute(panel, exposures, confidence, horizon, simulations)
+    
+    def run_backtest(self, symbols, strategy, params=None, period="10y", cost_bps=10.0, slippage_bps=5.0):
+        """Backtest a signal strategy on cached closes; returns (metrics, equity curve)"""
+        panel, failures = self.get_close_panel(symbols, period)
+        if panel.empty:
+            return None, None
+        
+        return run_strategy(panel, strategy, params, cost_bps, slippage_bps)
+    
+    def run_parameter_sweep(self, symbols, strategy, grid, period="10y", cost_bps=10.0, slippage_bps=5.0,
+                            workers=None):
+        """Backtest every combination of `grid` across a process pool, best Sharpe first"""
+        panel, failures = self.get_close_panel(symbols, period)
+        if panel.empty:
+            return pd.DataFrame()
+        
+        return sweep(panel, strategy, grid, cost_bps, slippage_bps, workers=workers)
+    
+    def run_walk_forward(self, symbols, models=None, period="5y", n_folds=5, mode="expanding", workers=None):
+        """Walk-forward accuracy and fit/predict time of each forecaster, one row per symbol/model/fold"""
+        frames = {symbol: self.get_stock_data(symbol, period) for symbol in symbols}
+        
+        return walk_forward(frames, models, n_folds=n_folds, mode=mode, workers=workers)
+    
+    def get_sector_performance(self, sector_index=None):
+        """Get sector-wise performance
+        
+        Weighted sector (and custom basket) changes computed in one pass over
+        the shared market snapshot, so constituents already quoted for the
+        gainers/losers view are not fetched again.
+        """
+        sector_index = sector_index if sector_index is not None else get_sector_index()
+        snapshot = self.get_market_snapshot(sector_index.symbols())
+        
+        return sector_index.compute(snapshot)
     
     def get_market_news(self):
         """Get latest market news (placeholder - would need news API)"""
@@ -212,33 +688,14 @@ class StockDataFetcher:
         if data.empty:
             return {}
         
-        indicators = {}
-        
-        # Moving Averages
-        indicators['SMA_20'] = data['Close'].rolling(window=20).mean()
-        indicators['SMA_50'] = data['Close'].rolling(window=50).mean()
-        indicators['EMA_12'] = data['Close'].ewm(span=12).mean()
-        indicators['EMA_26'] = data['Close'].ewm(span=26).mean()
-        
-        # RSI
-        delta = data['Close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        indicators['RSI'] = 100 - (100 / (1 + rs))
-        
-        # MACD
-        indicators['MACD'] = indicators['EMA_12'] - indicators['EMA_26']
-        indicators['MACD_signal'] = indicators['MACD'].ewm(span=9).mean()
-        indicators['MACD_histogram'] = indicators['MACD'] - indicators['MACD_signal']
-        
-        # Bollinger Bands
-        sma_20 = indicators['SMA_20']
-        std_20 = data['Close'].rolling(window=20).std()
-        indicators['BB_upper'] = sma_20 + (std_20 * 2)
-        indicators['BB_lower'] = sma_20 - (std_20 * 2)
-        
-        # Volume indicators
-        indicators['Volume_SMA'] = data['Volume'].rolling(window=20).mean()
+        # Shared intermediates (diff, rolling mean/std, EMAs) are computed once
+        # and memoized for the UI and prediction model
+        indicators = get_indicator_engine().compute(data, [
+            'SMA_20', 'SMA_50', 'EMA_12', 'EMA_26',
+            'RSI',
+            'MACD', 'MACD_signal', 'MACD_histogram',
+            'BB_upper', 'BB_lower',
+            'Volume_SMA'
+        ])
         
         return indicators
\ No newline at end of file
@@ -0,0 +1,389 @@
+import math
+import threading
+from collections import deque
+import numpy as np
+import pandas as pd
+
+# Default tolerance for agreement with the batch (pandas) indicators
+DEFAULT_TOLERANCE = 1e-8
+
+
+class RollingMean:
+    """O(1) rolling mean over a fixed window (running sum)"""
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.total = 0.0
+        self._updates = 0
+
+    def seed(self, values):
+        self.values = deque(np.asarray(values, dtype=np.float64)[-self.window:], maxlen=self.window)
+        self.total = float(np.sum(self.values))
+        return self.value
+
+    def update(self, x):
+        if len(self.values) == self.window:
+            self.total -= self.values[0]
+        self.values.append(x)
+        self.total += x
+
+        # Re-sum now and then so floating-point drift can't accumulate
+        self._updates += 1
+        if self._updates % (self.window * 64) == 0:
+            self.total = math.fsum(self.values)
+        return self.value
+
+    @property
+    def value(self):
+        if len(self.values) < self.window:
+            return np.nan
+        return self.total / self.window
+
+
+class RollingStd:
+    """O(1) rolling sample standard deviation (windowed Welford update)"""
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def seed(self, values):
+        self.values = deque(np.asarray(values, dtype=np.float64)[-self.window:], maxlen=self.window)
+        window = np.asarray(self.values)
+        self.mean = float(window.mean()) if len(window) else 0.0
+        self.m2 = float(((window - self.mean) ** 2).sum()) if len(window) else 0.0
+        return self.value
+
+    def update(self, x):
+        if len(self.values) == self.window:
+            # Replace the oldest value in one step
+            old = self.values[0]
+            self.values.append(x)
+            new_mean = self.mean + (x - old) / self.window
+            self.m2 += (x - old) * (x - new_mean + old - self.mean)
+            self.mean = new_mean
+        else:
+            self.values.append(x)
+            delta = x - self.mean
+            self.mean += delta / len(self.values)
+            self.m2 += delta * (x - self.mean)
+        return self.value
+
+    @property
+    def value(self):
+        if len(self.values) < self.window:
+            return np.nan
+        return math.sqrt(max(self.m2, 0.0) / (self.window - 1))
+
+
+class EMA:
+    """O(1) exponential moving average matching pandas ewm(span=...).mean()
+
+    With adjust=True (the pandas default) the weighted numerator and
+    denominator are carried separately, which reproduces pandas exactly.
+    """
+
+    def __init__(self, span, adjust=True):
+        self.alpha = 2 / (span + 1)
+        self.adjust = adjust
+        self.numerator = 0.0
+        self.denominator = 0.0
+        self.ema = np.nan
+
+    def seed(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            return self.value
+        self.ema = pd.Series(values).ewm(alpha=self.alpha, adjust=self.adjust).mean().iloc[-1]
+        decay = 1 - self.alpha
+        self.denominator = (1 - decay ** len(values)) / self.alpha
+        self.numerator = self.ema * self.denominator
+        return self.value
+
+    def update(self, x):
+        decay = 1 - self.alpha
+        if self.adjust:
+            self.numerator = x + decay * self.numerator
+            self.denominator = 1 + decay * self.denominator
+            self.ema = self.numerator / self.denominator
+        elif np.isnan(self.ema):
+            self.ema = x
+        else:
+            self.ema = self.alpha * x + decay * self.ema
+        return self.value
+
+    @property
+    def value(self):
+        return self.ema
+
+
+class RSI:
+    """O(1) RSI from close prices
+
+    method="sma" matches the dashboard's batch RSI (simple rolling mean of
+    gains/losses); method="wilder" uses Wilder's smoothing seeded with the
+    first simple average.
+    """
+
+    def __init__(self, period=14, method="sma"):
+        if method not in ("sma", "wilder"):
+            raise ValueError(f"Unknown RSI method: {method}")
+        self.period = period
+        self.method = method
+        self.prev_close = np.nan
+        self.gains = RollingMean(period)
+        self.losses = RollingMean(period)
+        self.avg_gain = np.nan
+        self.avg_loss = np.nan
+
+    def seed(self, closes):
+        closes = np.asarray(closes, dtype=np.float64)
+        if len(closes) == 0:
+            return self.value
+        self.prev_close = closes[-1]
+        delta = np.diff(closes)
+        gains = np.where(delta > 0, delta, 0.0)
+        losses = np.where(delta < 0, -delta, 0.0)
+
+        if self.method == "sma":
+            self.gains.seed(gains)
+            self.losses.seed(losses)
+        elif len(delta) >= self.period:
+            self.avg_gain = self._wilder_seed(gains)
+            self.avg_loss = self._wilder_seed(losses)
+        else:
+            self.gains.seed(gains)
+            self.losses.seed(losses)
+        return self.value
+
+    def update(self, close):
+        if np.isnan(self.prev_close):
+            self.prev_close = close
+            return self.value
+
+        delta = close - self.prev_close
+        self.prev_close = close
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+
+        if self.method == "sma":
+            self.gains.update(gain)
+            self.losses.update(loss)
+        elif np.isnan(self.avg_gain):
+            self.gains.update(gain)
+            self.losses.update(loss)
+            if len(self.gains.values) == self.period:
+                self.avg_gain = self.gains.value
+                self.avg_loss = self.losses.value
+        else:
+            self.avg_gain = (self.avg_gain * (self.period - 1) + gain) / self.period
+            self.avg_loss = (self.avg_loss * (self.period - 1) + loss) / self.period
+        return self.value
+
+    @property
+    def value(self):
+        if self.method == "sma":
+            gain, loss = self.gains.value, self.losses.value
+        else:
+            gain, loss = self.avg_gain, self.avg_loss
+        if np.isnan(gain) or np.isnan(loss):
+            return np.nan
+        if loss == 0:
+            return 100.0 if gain > 0 else np.nan
+        return 100 - (100 / (1 + gain / loss))
+
+    def _wilder_seed(self, values):
+        first = values[:self.period].mean()
+        rest = values[self.period:]
+        smoothed = pd.Series(np.r_[first, rest]).ewm(alpha=1 / self.period, adjust=False).mean()
+        return smoothed.iloc[-1]
+
+
+class MACD:
+    """O(1) MACD line, signal and histogram (12/26/9 by default)"""
+
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.fast = EMA(fast)
+        self.slow = EMA(slow)
+        self.signal = EMA(signal)
+
+    def seed(self, closes):
+        closes = pd.Series(np.asarray(closes, dtype=np.float64))
+        if closes.empty:
+            return self.value
+        self.fast.seed(closes)
+        self.slow.seed(closes)
+        macd = closes.ewm(alpha=self.fast.alpha).mean() - closes.ewm(alpha=self.slow.alpha).mean()
+        self.signal.seed(macd)
+        return self.value
+
+    def update(self, close):
+        macd = self.fast.update(close) - self.slow.update(close)
+        self.signal.update(macd)
+        return self.value
+
+    @property
+    def value(self):
+        macd = self.fast.value - self.slow.value
+        return macd, self.signal.value, macd - self.signal.value
+
+
+class BollingerBands:
+    """O(1) Bollinger Bands (rolling mean +/- k rolling std)"""
+
+    def __init__(self, window=20, k=2):
+        self.k = k
+        self.mean = RollingMean(window)
+        self.std = RollingStd(window)
+
+    def seed(self, closes):
+        self.mean.seed(closes)
+        self.std.seed(closes)
+        return self.value
+
+    def update(self, close):
+        self.mean.update(close)
+        self.std.update(close)
+        return self.value
+
+    @property
+    def value(self):
+        mean, std = self.mean.value, self.std.value
+        return mean + (std * self.k), mean - (std * self.k)
+
+
+class StreamingIndicatorSet:
+    """Incremental counterpart of StockDataFetcher.calculate_technical_indicators
+
+    Seed once from history, then feed bars one at a time; every update is
+    O(1) regardless of how much history sits behind it. Inputs are expected
+    to be free of NaNs.
+    """
+
+    def __init__(self):
+        self.sma_20 = RollingMean(20)
+        self.sma_50 = RollingMean(50)
+        self.rsi = RSI(14)
+        self.macd = MACD(12, 26, 9)
+        self.bollinger = BollingerBands(20, 2)
+        self.volume_sma = RollingMean(20)
+        self.last_timestamp = None
+
+    def seed(self, data):
+        """Initialise state from a history frame (Close and Volume columns)"""
+        closes = data['Close'].to_numpy(dtype=np.float64)
+        volumes = data['Volume'].to_numpy(dtype=np.float64)
+        self.sma_20.seed(closes)
+        self.sma_50.seed(closes)
+        self.rsi.seed(closes)
+        self.macd.seed(closes)
+        self.bollinger.seed(closes)
+        self.volume_sma.seed(volumes)
+        self.last_timestamp = data.index[-1] if len(data) else None
+        return self.values()
+
+    def update(self, close, volume, timestamp=None):
+        """Feed one new bar and return the latest indicator values"""
+        self.sma_20.update(close)
+        self.sma_50.update(close)
+        self.rsi.update(close)
+        self.macd.update(close)
+        self.bollinger.update(close)
+        self.volume_sma.update(volume)
+        if timestamp is not None:
+            self.last_timestamp = timestamp
+        return self.values()
+
+    def update_bars(self, bars):
+        """Feed only the bars newer than the last one seen"""
+        if self.last_timestamp is not None:
+            bars = bars.iloc[bars.index.searchsorted(self.last_timestamp, side='right'):]
+        for timestamp, close, volume in zip(bars.index, bars['Close'].to_numpy(), bars['Volume'].to_numpy()):
+            self.update(close, volume, timestamp)
+        return self.values()
+
+    def values(self):
+        """Latest value of every indicator, keyed like calculate_technical_indicators"""
+        macd, signal, histogram = self.macd.value
+        upper, lower = self.bollinger.value
+        return {
+            'SMA_20': self.sma_20.value,
+            'SMA_50': self.sma_50.value,
+            'EMA_12': self.macd.fast.value,
+            'EMA_26': self.macd.slow.value,
+            'RSI': self.rsi.value,
+            'MACD': macd,
+            'MACD_signal': signal,
+            'MACD_histogram': histogram,
+            'BB_upper': upper,
+            'BB_lower': lower,
+            'Volume_SMA': self.volume_sma.value
+        }
+
+
+def verify_against_batch(data, batch_indicators, seed_bars=None, tolerance=DEFAULT_TOLERANCE):
+    """Check streaming results against batch indicators bar by bar
+
+    Seeds from the first `seed_bars` rows (default: half), streams the rest
+    and compares every streamed value with `batch_indicators` (the dict
+    returned by calculate_technical_indicators for the same frame), using a
+    relative tolerance. Returns (ok, max_relative_error_per_indicator).
+    """
+    seed_bars = len(data) // 2 if seed_bars is None else seed_bars
+    state = StreamingIndicatorSet()
+    state.seed(data.iloc[:seed_bars])
+
+    errors = {name: 0.0 for name in batch_indicators}
+    closes = data['Close'].to_numpy(dtype=np.float64)
+    volumes = data['Volume'].to_numpy(dtype=np.float64)
+
+    for i in range(seed_bars, len(data)):
+        values = state.update(closes[i], volumes[i])
+        for name, series in batch_indicators.items():
+            expected = series.iloc[i]
+            actual = values[name]
+            if np.isnan(expected) and np.isnan(actual):
+                continue
+            scale = max(1.0, abs(expected))
+            errors[name] = max(errors[name], abs(actual - expected) / scale)
+
+    return all(error <= tolerance for error in errors.values()), errors
+
+
+class LiveIndicatorBook:
+    """Process-wide streaming indicator state per (symbol, interval)"""
+
+    def __init__(self):
+        self._states = {}
+        self._lock = threading.Lock()
+
+    def update(self, symbol, bars, interval="1m"):
+        """Advance a symbol's state with completed bars, seeding it on first use"""
+        if bars is None or bars.empty:
+            return None
+
+        bars = bars.dropna(subset=['Close', 'Volume'])
+        key = (symbol, interval)
+        with self._lock:
+            state = self._states.get(key)
+            if state is None:
+                state = StreamingIndicatorSet()
+                self._states[key] = state
+                return state.seed(bars)
+            return state.update_bars(bars)
+
+
+_live_indicator_book = None
+_live_indicator_book_lock = threading.Lock()
+
+
+def get_live_indicator_book():
+    """Process-wide LiveIndicatorBook instance"""
+    global _live_indicator_book
+    with _live_indicator_book_lock:
+        if _live_indicator_book is None:
+            _live_indicator_book = LiveIndicatorBook()
+        return _live_indicator_book
@@ -0,0 +1,244 @@
+import re
+import time
+import random
+import socket
+import threading
+from utils.shared_cache import get_shared_cache
+
+
+class CircuitOpenError(Exception):
+    """Raised when a symbol's circuit is open and nothing stale can be served"""
+
+
+def is_throttle_error(error):
+    """Whether an upstream exception means we are being rate limited"""
+    message = str(error)
+    return (type(error).__name__ == "YFRateLimitError" or
+            "Too Many Requests" in message or
+            "429" in message)
+
+
+# Exception class names (anywhere in the MRO) of network failures worth
+# retrying, so requests/curl_cffi errors match without importing them
+_TRANSIENT_ERROR_NAMES = {"Timeout", "ConnectTimeout", "ReadTimeout", "ConnectionError", "ChunkedEncodingError"}
+_SERVER_ERROR_PATTERN = re.compile(r"(HTTP|status)\D{0,12}5\d\d\b", re.IGNORECASE)
+
+
+def is_transient_error(error):
+    """Whether an upstream exception is worth retrying
+
+    Throttling, HTTP 5xx responses, timeouts and connection errors are
+    transient; anything else (bad symbol, parse error, 4xx) will fail the
+    same way again.
+    """
+    if is_throttle_error(error):
+        return True
+    if isinstance(error, (TimeoutError, ConnectionError, socket.timeout)):
+        return True
+    if any(cls.__name__ in _TRANSIENT_ERROR_NAMES for cls in type(error).__mro__):
+        return True
+
+    status = getattr(getattr(error, 'response', None), 'status_code', None)
+    if isinstance(status, int):
+        return status == 429 or 500 <= status < 600
+    return bool(_SERVER_ERROR_PATTERN.search(str(error)))
+
+
+class TokenBucket:
+    """Token-bucket rate limiter with multiplicative slow-down on throttling"""
+
+    def __init__(self, rate=2.0, capacity=10, min_rate=0.2):
+        self.base_rate = rate
+        self.rate = rate
+        self.min_rate = min_rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout=None):
+        """Take one token, waiting for it if needed; False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) / self.rate
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+    def penalize(self):
+        """Halve the refill rate after upstream throttles us"""
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+
+    def reward(self):
+        """Creep the refill rate back towards its base after a success"""
+        with self._lock:
+            self.rate = min(self.base_rate, self.rate + self.base_rate * 0.05)
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+
+class CircuitBreaker:
+    """Per-key circuit breaker: closed -> open after repeated failures -> half-open"""
+
+    def __init__(self, failure_threshold=3, reset_timeout=60):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = {}
+        self._opened_at = {}
+        self._lock = threading.Lock()
+
+    def state(self, key):
+        """'closed', 'open' or 'half_open'"""
+        with self._lock:
+            opened_at = self._opened_at.get(key)
+            if opened_at is None:
+                return "closed"
+            if time.monotonic() - opened_at >= self.reset_timeout:
+                return "half_open"
+            return "open"
+
+    def allow(self, key):
+        """Whether a call for `key` may go upstream (half-open lets one probe through)"""
+        with self._lock:
+            opened_at = self._opened_at.get(key)
+            if opened_at is None:
+                return True
+            if time.monotonic() - opened_at >= self.reset_timeout:
+                # Re-arm so concurrent callers keep short-circuiting while we probe
+                self._opened_at[key] = time.monotonic()
+                return True
+            return False
+
+    def record_success(self, key):
+        with self._lock:
+            self._failures.pop(key, None)
+            self._opened_at.pop(key, None)
+
+    def record_failure(self, key):
+        with self._lock:
+            self._failures[key] = self._failures.get(key, 0) + 1
+            if self._failures[key] >= self.failure_threshold:
+                self._opened_at[key] = time.monotonic()
+
+    def open_keys(self):
+        with self._lock:
+            return [key for key in self._opened_at]
+
+
+class UpstreamGateway:
+    """Single choke point for upstream market-data calls
+
+    Every call is rate limited by a token bucket, retried with jittered
+    exponential backoff when the error is transient (other errors fail on
+    the first attempt), and guarded by a per-key circuit breaker. When a
+    call ultimately fails, the last cached value (even if expired) is
+    served instead of an error where one exists.
+    """
+
+    def __init__(self, rate=2.0, burst=10, max_retries=3, base_delay=0.5, max_delay=8.0,
+                 failure_threshold=3, reset_timeout=60, cache=None):
+        self.bucket = TokenBucket(rate=rate, capacity=burst)
+        self.breaker = CircuitBreaker(failure_threshold=failure_threshold, reset_timeout=reset_timeout)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.cache = cache if cache is not None else get_shared_cache()
+        self._counters = {
+            'calls': 0,
+            'successes': 0,
+            'failures': 0,
+            'retries': 0,
+            'throttled': 0,
+            'short_circuited': 0,
+            'stale_served': 0
+        }
+        self._lock = threading.Lock()
+
+    def call(self, key, fn, *args, stale_key=None, **kwargs):
+        """Run `fn(*args, **kwargs)` for `key` through the limiter, retries and breaker"""
+        if not self.breaker.allow(key):
+            self._count('short_circuited')
+            return self._serve_stale(stale_key, CircuitOpenError(f"Upstream circuit open for {key}"))
+
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            self._count('calls')
+
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                last_error = e
+                self._count('failures')
+
+                if is_throttle_error(e):
+                    self._count('throttled')
+                    self.bucket.penalize()
+
+                if attempt == self.max_retries or not is_transient_error(e):
+                    break
+
+                # Full jitter keeps many sessions from retrying in lockstep
+                delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+                self._count('retries')
+                time.sleep(random.uniform(0, delay))
+                continue
+
+            self._count('successes')
+            self.bucket.reward()
+            self.breaker.record_success(key)
+            return result
+
+        self.breaker.record_failure(key)
+        return self._serve_stale(stale_key, last_error)
+
+    def is_blocked(self, key):
+        """Whether `key`'s circuit is currently open"""
+        return self.breaker.state(key) == "open"
+
+    def stats(self):
+        """Counters plus limiter/breaker state, for monitoring throttling live"""
+        with self._lock:
+            stats = dict(self._counters)
+        stats['rate_limit'] = round(self.bucket.rate, 3)
+        stats['open_circuits'] = self.breaker.open_keys()
+        return stats
+
+    def _serve_stale(self, stale_key, error):
+        if stale_key is not None:
+            stale = self.cache.get_stale(stale_key)
+            if stale is not None:
+                self._count('stale_served')
+                return stale
+        raise error
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway():
+    """Process-wide UpstreamGateway instance"""
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            _gateway = UpstreamGateway()
+        return _gateway
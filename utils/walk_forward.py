@@ -0,0 +1,185 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+from utils.model_backends import create_model, backend_available
+from utils.prediction_model import PredictionModel
+from utils.job_queue import spawn_pool
+
+# Models compared by default: (backend, parameters)
+WALK_FORWARD_MODELS = {
+    "last_close": ("last_close", {}),
+    "linear": ("linear", {}),
+    "random_forest": ("random_forest", {'n_estimators': 100, 'random_state': 42})
+}
+
+METRICS = ['MSE', 'RMSE', 'MAE', 'MAPE']
+
+
+def walk_forward_folds(n_rows, n_folds=5, test_size=None, mode="expanding", train_size=None, min_train=50):
+    """(train slice, test slice) pairs over `n_rows` time-ordered rows
+
+    The last n_folds * test_size rows are split into consecutive test
+    blocks. "expanding" trains on every row before a block; "rolling"
+    trains on the `train_size` rows just before it (default: the rows
+    before the first block). Folds with fewer than `min_train` training
+    rows are skipped.
+    """
+    if mode not in ("expanding", "rolling"):
+        raise ValueError(f"Unknown walk-forward mode: {mode}")
+
+    test_size = test_size or n_rows // (n_folds + 1)
+    first_test = n_rows - n_folds * test_size
+    train_size = train_size or first_test
+
+    folds = []
+    for k in range(n_folds):
+        test_start = first_test + k * test_size
+        train_start = 0 if mode == "expanding" else max(0, test_start - train_size)
+        if test_start - train_start >= min_train and test_size > 0:
+            folds.append((slice(train_start, test_start), slice(test_start, test_start + test_size)))
+    return folds
+
+
+def supervised_frame(data):
+    """(features, next-day close) for one symbol, as in PredictionModel.ensemble_prediction"""
+    features = PredictionModel().prepare_features(data)
+    numeric = features.select_dtypes(include=[np.number])
+    target = numeric['Close'].shift(-1).iloc[:-1]
+    return numeric.iloc[:-1], target
+
+
+# Per-worker state: every symbol's features, and fold matrices built from them
+_worker_data = {}
+_worker_folds = {}
+
+
+def _init_worker(data):
+    global _worker_data, _worker_folds
+    _worker_data = data
+    _worker_folds = {}
+
+
+def _fold_matrices(symbol, fold):
+    """(X_train, y_train, X_test, y_test) for a symbol's fold, built once per worker
+
+    Missing values are filled with the training means, as in
+    ensemble_prediction, so no test information leaks into training.
+    """
+    key = (symbol, fold)
+    if key not in _worker_folds:
+        X, y, folds = _worker_data[symbol]
+        train, test = folds[fold]
+        means = np.nanmean(X[train], axis=0)
+        X_train = np.where(np.isnan(X[train]), means, X[train])
+        X_test = np.where(np.isnan(X[test]), means, X[test])
+        _worker_folds[key] = (X_train, y[train], X_test, y[test])
+    return _worker_folds[key]
+
+
+def _evaluate(symbol, model_name, backend, params):
+    metrics_model = PredictionModel()
+    rows = []
+    for fold in range(len(_worker_data[symbol][2])):
+        X_train, y_train, X_test, y_test = _fold_matrices(symbol, fold)
+        model = create_model(backend, **params)
+
+        # CPU time of this worker, so the figures do not depend on pool contention
+        start = time.process_time()
+        model.fit(X_train, y_train)
+        fit_seconds = time.process_time() - start
+
+        start = time.process_time()
+        predicted = np.asarray(model.predict(X_test), dtype=np.float64).ravel()
+        predict_seconds = time.process_time() - start
+
+        metrics = metrics_model.get_prediction_accuracy_metrics(y_test, predicted)
+        rows.append({
+            'symbol': symbol,
+            'model': model_name,
+            'fold': fold,
+            'train_rows': len(y_train),
+            'test_rows': len(y_test),
+            **{name: float(metrics[name]) for name in METRICS},
+            'fit_seconds': fit_seconds,
+            'predict_seconds': predict_seconds
+        })
+    return rows
+
+
+def walk_forward(frames, models=None, n_folds=5, test_size=None, mode="expanding", train_size=None, workers=None):
+    """Walk-forward one-day-ahead evaluation of each model on each symbol
+
+    `frames` maps symbol -> OHLCV DataFrame; `models` maps a name to
+    (backend, params) (default WALK_FORWARD_MODELS). Features are built
+    once per symbol in this process; every (symbol, model) pair is one task
+    on the process pool, and each worker caches fold matrices so models
+    sharing a symbol reuse them. Returns one row per (symbol, model, fold)
+    with MSE/RMSE/MAE/MAPE and fit/predict CPU seconds.
+    """
+    models = models or WALK_FORWARD_MODELS
+    models = {name: spec for name, spec in models.items() if backend_available(spec[0])}
+
+    data = {}
+    for symbol, frame in frames.items():
+        if frame is None or frame.empty:
+            continue
+        X, y = supervised_frame(frame)
+        folds = walk_forward_folds(len(y), n_folds, test_size, mode, train_size)
+        if folds:
+            data[symbol] = (X.to_numpy(dtype=np.float64), y.to_numpy(dtype=np.float64), folds)
+
+    tasks = [(symbol, name, backend, params) for symbol in data for name, (backend, params) in models.items()]
+    if not tasks:
+        return pd.DataFrame()
+
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if workers == 1:
+        _init_worker(data)
+        rows = [row for task in tasks for row in _evaluate(*task)]
+    else:
+        with spawn_pool(workers, initializer=_init_worker, initargs=(data,)) as executor:
+            results = executor.map(_evaluate, *zip(*tasks))
+            rows = [row for chunk in results for row in chunk]
+
+    return pd.DataFrame(rows)
+
+
+def summarize(results):
+    """Per-model averages over symbols and folds, with total CPU seconds
+
+    Sorted by RMSE; `rmse_x_seconds` (RMSE times CPU seconds per fold)
+    ranks models on accuracy per unit of compute.
+    """
+    if results.empty:
+        return results
+
+    results = results.assign(cpu_seconds=results['fit_seconds'] + results['predict_seconds'])
+    summary = results.groupby('model').agg(
+        folds=('fold', 'count'),
+        **{name: (name, 'mean') for name in METRICS},
+        fit_seconds=('fit_seconds', 'sum'),
+        predict_seconds=('predict_seconds', 'sum'),
+        cpu_seconds=('cpu_seconds', 'sum')
+    )
+    summary['rmse_x_seconds'] = summary['RMSE'] * summary['cpu_seconds'] / summary['folds']
+    return summary.sort_values('RMSE')
+
+
+if __name__ == "__main__":
+    # python -m utils.walk_forward: synthetic random walks, all cores
+    rng = np.random.default_rng(0)
+    index = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=1250)
+    frames = {}
+    for i in range(4):
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, len(index))))
+        frames[f"SYM{i}.NS"] = pd.DataFrame({
+            'Open': close, 'High': close * 1.01, 'Low': close * 0.99, 'Close': close,
+            'Volume': rng.integers(10_000, 1_000_000, len(index)).astype(np.float64)
+        }, index=index)
+
+    for mode in ("expanding", "rolling"):
+        start = time.perf_counter()
+        summary = summarize(walk_forward(frames, mode=mode))
+        print(f"{mode} folds ({time.perf_counter() - start:.1f} s wall):")
+        print(summary.round(4).to_string())
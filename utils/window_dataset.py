@@ -0,0 +1,159 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def lagged_windows(values, time_steps):
+    """(samples, time_steps) view of a 1-D series and the value after each window
+
+    Equivalent to stacking values[i - time_steps:i] for every i, without
+    copying: the windows are a strided view on `values`.
+    """
+    values = np.asarray(values)
+    if len(values) <= time_steps:
+        return np.empty((0, time_steps), dtype=values.dtype), np.empty(0, dtype=values.dtype)
+    return sliding_window_view(values, time_steps)[:-1], values[time_steps:]
+
+
+class WindowDataset:
+    """Sliding-window samples over one or more (time x feature) series
+
+    Every series is min-max scaled per feature and stored end to end in one
+    float32 array. A sample is just the row where its window starts, so
+    memory stays at the size of the series rather than samples x time_steps
+    x features; only the batch being trained on is gathered into a 3D
+    array. The target is the target column `horizon` rows after the window,
+    and windows never cross from one series into the next.
+    """
+
+    def __init__(self, series, time_steps=60, target_column=0, horizon=1, batch_size=32,
+                 shuffle=True, seed=42, dtype=np.float32, scale=True):
+        self.time_steps = time_steps
+        self.target_column = target_column
+        self.horizon = horizon
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.dtype = dtype
+        self._rng = np.random.default_rng(seed)
+        self._offsets = np.arange(time_steps)
+
+        self.feature_columns = None
+        self.names = []
+        self.minimums = []
+        self.ranges = []
+        parts = []
+        counts = []
+
+        for name, values in self._named(series):
+            values = np.asarray(values, dtype=np.float64)
+            if values.ndim == 1:
+                values = values.reshape(-1, 1)
+
+            minimum = np.nanmin(values, axis=0) if scale and len(values) else np.zeros(values.shape[1])
+            span = np.nanmax(values, axis=0) - minimum if scale and len(values) else np.ones(values.shape[1])
+            span = np.where(span > 0, span, 1.0)
+            scaled = ((values - minimum) / span).astype(dtype)
+
+            self.names.append(name)
+            self.minimums.append(minimum)
+            self.ranges.append(span)
+            parts.append(scaled)
+            counts.append(max(len(scaled) - time_steps - horizon + 1, 0))
+
+        self._data = np.concatenate(parts) if parts else np.empty((0, 0), dtype=dtype)
+        lengths = np.array([len(part) for part in parts], dtype=np.int64)
+        self._bounds = np.concatenate([[0], np.cumsum(lengths)])
+
+        # Sample i -> row of self._data where its window starts
+        self.counts = np.array(counts, dtype=np.int64)
+        self._starts = np.concatenate(
+            [self._bounds[i] + np.arange(count) for i, count in enumerate(counts)]
+        ) if counts else np.empty(0, dtype=np.int64)
+
+    @classmethod
+    def from_frames(cls, frames, feature_columns=('Close',), target_column='Close', **kwargs):
+        """Build from {symbol: DataFrame}, using `feature_columns` as features"""
+        feature_columns = list(feature_columns)
+        if target_column not in feature_columns:
+            feature_columns.append(target_column)
+        series = {
+            symbol: frame[feature_columns].dropna().to_numpy(dtype=np.float64)
+            for symbol, frame in frames.items()
+        }
+        dataset = cls(series, target_column=feature_columns.index(target_column), **kwargs)
+        dataset.feature_columns = feature_columns
+        return dataset
+
+    @staticmethod
+    def _named(series):
+        if isinstance(series, dict):
+            return list(series.items())
+        if isinstance(series, (list, tuple)):
+            return list(enumerate(series))
+        return [(0, series)]
+
+    @property
+    def n_samples(self):
+        return len(self._starts)
+
+    @property
+    def n_features(self):
+        return self._data.shape[1] if self._data.ndim == 2 else 0
+
+    @property
+    def input_shape(self):
+        """(time_steps, features), the LSTM input shape"""
+        return (self.time_steps, self.n_features)
+
+    @property
+    def materialized_nbytes(self):
+        """Bytes a fully stacked (samples, time_steps, features) tensor would take"""
+        return self.n_samples * self.time_steps * self.n_features * np.dtype(self.dtype).itemsize
+
+    @property
+    def nbytes(self):
+        """Bytes actually held: the scaled series plus the sample index"""
+        return self._data.nbytes + self._starts.nbytes
+
+    def __len__(self):
+        """Batches per epoch"""
+        return -(-self.n_samples // self.batch_size)
+
+    def batch(self, samples):
+        """(X, y) for an array of global sample numbers; X is (batch, time_steps, features)"""
+        starts = self._starts[samples]
+        X = self._data[starts[:, np.newaxis] + self._offsets]
+        y = self._data[starts + self.time_steps + self.horizon - 1, self.target_column]
+        return X, y
+
+    def batches(self, repeat=False):
+        """Yield (X, y) batches covering every sample once per epoch
+
+        With `repeat` the generator cycles forever (reshuffling each epoch),
+        as Keras expects when given steps_per_epoch.
+        """
+        while True:
+            order = self._rng.permutation(self.n_samples) if self.shuffle else np.arange(self.n_samples)
+            for start in range(0, self.n_samples, self.batch_size):
+                yield self.batch(order[start:start + self.batch_size])
+            if not repeat:
+                return
+
+    def series(self, series=0):
+        """Scaled (time x features) values of one series (a view)"""
+        return self._data[self._bounds[series]:self._bounds[series + 1]]
+
+    def windows(self, series=0):
+        """(samples, time_steps, features) strided view of one series' windows, no copy"""
+        samples = self.counts[series]
+        if not samples:
+            return np.empty((0, self.time_steps, self.n_features), dtype=self.dtype)
+        return sliding_window_view(self.series(series), self.time_steps, axis=0).transpose(0, 2, 1)[:samples]
+
+    def last_window(self, series=0):
+        """Most recent full window of a series, shaped (1, time_steps, features)"""
+        return self.series(series)[-self.time_steps:][np.newaxis]
+
+    def inverse_target(self, values, series=0):
+        """Map scaled target values of a series back to prices"""
+        column = self.target_column
+        return np.asarray(values, dtype=np.float64) * self.ranges[series][column] + self.minimums[series][column]